@@ -15,12 +15,14 @@ from schemas.request.add_cart_item import AddCartItemRequestDto
 from schemas.request.update_cart_item import UpdateCartItemRequestDto
 from schemas.request.delete_cart_item import DeleteCartItemRequestDto
 from schemas.request.clear_cart import ClearCartRequestDto
+from schemas.request.bulk_add_cart_items import BulkAddCartItemsRequestDto
 
 from schemas.response.get_cart import GetCartResponseDto
 from schemas.response.add_cart_item import AddCartItemResponseDto
 from schemas.response.update_cart_item import UpdateCartItemResponseDto
 from schemas.response.delete_cart_item import DeleteCartItemResponseDto
 from schemas.response.clear_cart import ClearCartResponseDto
+from schemas.response.bulk_add_cart_items import BulkAddCartItemsResponseDto
 
 # Common schemas
 from schemas.common import (
@@ -49,6 +51,7 @@ from .func.try_add_cart_item import try_add_cart_item
 from .func.try_update_cart_item import try_update_cart_item
 from .func.try_delete_cart_item import try_delete_cart_item
 from .func.try_clear_cart import try_clear_cart
+from .func.try_bulk_add_cart_items import try_bulk_add_cart_items
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
@@ -168,6 +171,29 @@ async def add_cart_item(request: AddCartItemRequestDto):
         return create_unknown_error_result(e)
 
 
+@router.post("/items/bulk", response_model=ResultDto, status_code=status.HTTP_201_CREATED)
+async def bulk_add_cart_items(request: BulkAddCartItemsRequestDto):
+    """
+    장바구니 메뉴 일괄 추가 API
+
+    재주문 / 장바구니 복원 시 여러 메뉴를 한 번에 담을 때 호출됩니다.
+    replace=true 면 기존 장바구니 아이템을 모두 교체합니다. 하나라도 잘못되면 아무것도 담지 않습니다.
+    """
+    try:
+        result = await try_bulk_add_cart_items(request)
+        return result
+    except CartValidationException as e:
+        return create_error_result(e)
+    except RestaurantMismatchException as e:
+        return create_error_result(e)
+    except CartItemValidationException as e:
+        return create_error_result(e)
+    except AuthenticationException as e:
+        return create_error_result(e)
+    except Exception as e:
+        return create_unknown_error_result(e)
+
+
 @router.patch("/items/{item_id}", response_model=ResultDto)
 async def update_cart_item(item_id: UUID, request: UpdateCartItemRequestDto):
     """
@@ -1,6 +1,6 @@
 from schemas.request.add_cart_item import AddCartItemRequestDto
 from schemas.response.add_cart_item import AddCartItemResponseDto
-from schemas.response.get_cart import CartItemDto, CartItemOptionDto
+from schemas.response.get_cart import CartDto, CartItemDto, CartItemOptionDto
 from schemas.common import (
     create_success_result,
     create_error_result,
@@ -12,18 +12,16 @@ from model.exception import (
     RestaurantMismatchException,
     CartItemValidationException,
 )
-from model.cart import Cart, CartItem, CartItemOption
-from utility.db import get_db
+from utility.cart_store import cart_store, utcnow
+from utility.cart_line import line_key
+from datetime import datetime
+from typing import Dict, List, Optional
 from uuid import uuid4, UUID
 
 
 async def try_add_cart_item(request: AddCartItemRequestDto):
     print(f"[CART_SERVICE] Starting try_add_cart_item with request: {request}")
 
-    # Create database session
-    db_generator = get_db()
-    session = next(db_generator)
-
     try:
         if not request.user_id:
             raise AuthenticationException("사용자 ID가 필요합니다.")
@@ -31,6 +29,9 @@ async def try_add_cart_item(request: AddCartItemRequestDto):
             raise CartItemValidationException("수량은 1 이상이어야 합니다.")
         if request.price < 0:
             raise CartItemValidationException("가격은 0 이상이어야 합니다.")
+        for option in request.options or []:
+            if option.price < 0:
+                raise CartItemValidationException("옵션 가격은 0 이상이어야 합니다.")
 
         # Convert string IDs to UUID
         print(f"[CART_SERVICE] Converting UUIDs: user_id={request.user_id}, restaurant_id={request.restaurant_id}, menu_id={request.menu_id}")
@@ -43,122 +44,87 @@ async def try_add_cart_item(request: AddCartItemRequestDto):
             print(f"[CART_SERVICE] UUID conversion failed: {e}")
             raise CartItemValidationException(f"잘못된 UUID 형식: {e}")
 
-        # Find or create cart
-        print(f"[CART_SERVICE] Searching for existing cart for user: {user_uuid}")
-        existing_cart = (
-            session.query(Cart)
-            .filter(Cart.user_id == user_uuid, Cart.is_deleted == False)
-            .first()
-        )
-        print(f"[CART_SERVICE] Existing cart found: {existing_cart is not None}")
-
-        # 기존 장바구니가 있는 경우, 활성 아이템이 있는지 확인
-        if existing_cart:
-            active_items = session.query(CartItem).filter(
-                CartItem.cart_id == existing_cart.uuid,
-                CartItem.is_deleted == False
-            ).count()
-
-            print(f"[CART_SERVICE] Active items in existing cart: {active_items}")
-
-            # 활성 아이템이 있는 경우에만 레스토랑 일치 확인
-            if active_items > 0 and existing_cart.restaurant_id != restaurant_uuid:
+        # hot cart store 에서 수정 (DB 반영은 write-behind)
+        async with cart_store.edit(user_uuid) as state:
+            existing_cart = state.cart
+            print(f"[CART_SERVICE] Existing cart found: {existing_cart is not None}")
+
+            # 기존 장바구니가 있는 경우, 활성 아이템이 있을 때만 레스토랑 일치 확인
+            if existing_cart and existing_cart.items and existing_cart.restaurant_id != restaurant_uuid:
                 raise RestaurantMismatchException("다른 매장의 메뉴는 장바구니에 추가할 수 없습니다.")
 
-            # 활성 아이템이 없는 경우 레스토랑 ID 업데이트
-            if active_items == 0:
-                print(f"[CART_SERVICE] No active items, updating restaurant_id from {existing_cart.restaurant_id} to {restaurant_uuid}")
-                existing_cart.restaurant_id = restaurant_uuid
-
-        if not existing_cart:
-            print(f"[CART_SERVICE] Creating new cart")
-            cart = Cart(uuid=uuid4(), user_id=user_uuid, restaurant_id=restaurant_uuid)
-            session.add(cart)
-            session.flush()
-            print(f"[CART_SERVICE] New cart created with ID: {cart.uuid}")
-        else:
-            print(f"[CART_SERVICE] Using existing cart with ID: {existing_cart.uuid}")
-            cart = existing_cart
-
-        # Create cart item with menu information
-        print(f"[CART_SERVICE] Creating cart item")
-        cart_item = CartItem(
-            uuid=uuid4(),
-            cart_id=cart.uuid,
-            menu_id=menu_uuid,
-            menu_name=request.menu_name,
-            quantity=request.quantity,
-            price=request.price,
-        )
-        session.add(cart_item)
-        session.flush()
-        print(f"[CART_SERVICE] Cart item created with ID: {cart_item.uuid}")
-
-        # Create cart item options if provided
-        if request.options:
-            print(f"[CART_SERVICE] Creating {len(request.options)} options")
-            for option in request.options:
-                if option.price < 0:
-                    raise CartItemValidationException("옵션 가격은 0 이상이어야 합니다.")
-                cart_item_option = CartItemOption(
-                    uuid=uuid4(),
-                    cart_item_id=cart_item.uuid,
-                    menu_option_id=None,  # ID 연동 전: 이름만 저장
-                    menu_option_name=option.menu_option_name,
-                    price=option.price,
-                )
-                session.add(cart_item_option)
-            print(f"[CART_SERVICE] Options created")
-
-        print(f"[CART_SERVICE] Committing transaction")
-        session.commit()
-        print(f"[CART_SERVICE] Transaction committed successfully")
-
-        # Build response DTO
-        options = (
-            session.query(CartItemOption)
-            .filter(CartItemOption.cart_item_id == cart_item.uuid, CartItemOption.is_deleted == False)
-            .all()
-        )
-        option_dtos = [
-            CartItemOptionDto(
-                uuid=o.uuid,
-                menu_option_id=o.menu_option_id,
-                menu_option_name=o.menu_option_name,
-                price=o.price,
-                created_at=o.created_at,
-                updated_at=o.updated_at,
-            )
-            for o in options
-        ]
-
-        item_dto = CartItemDto(
-            uuid=cart_item.uuid,
-            menu_id=cart_item.menu_id,
-            menu_name=cart_item.menu_name,
-            quantity=cart_item.quantity,
-            price=cart_item.price,
-            created_at=cart_item.created_at,
-            updated_at=cart_item.updated_at,
-            options=option_dtos if option_dtos else None,
-        )
-
-        response = AddCartItemResponseDto(cart_item=item_dto)
+            now = utcnow()
+            if not existing_cart:
+                print(f"[CART_SERVICE] Creating new cart")
+                cart = CartDto(uuid=uuid4(), user_id=user_uuid, restaurant_id=restaurant_uuid, created_at=now, updated_at=now, items=[])
+                state.cart = cart
+            else:
+                cart = existing_cart
+                # 활성 아이템이 없는 경우 레스토랑 ID 업데이트
+                if not cart.items and cart.restaurant_id != restaurant_uuid:
+                    print(f"[CART_SERVICE] No active items, updating restaurant_id from {cart.restaurant_id} to {restaurant_uuid}")
+                    cart.restaurant_id = restaurant_uuid
+                cart.updated_at = now
+
+            # 같은 메뉴 + 같은 옵션 구성이 이미 있으면 수량 합산, 없으면 새 라인
+            item_dto = add_line(cart, lines_by_key(cart), menu_uuid, request.menu_name, request.quantity, request.price, request.options, now)
+            state.touch_items([item_dto])
+            print(f"[CART_SERVICE] Cart item added to line: {item_dto.uuid} (quantity={item_dto.quantity})")
+
+        response = AddCartItemResponseDto(cart_item=item_dto.model_copy(deep=True))
         return create_success_result(response)
 
     except (AuthenticationException, CartValidationException, RestaurantMismatchException, CartItemValidationException) as e:
-        session.rollback()
         return create_error_result(e)
     except Exception as e:
         print(f"[CART_SERVICE] Exception occurred: {e}")
-        session.rollback()
         return create_unknown_error_result(e)
-    finally:
-        print(f"[CART_SERVICE] Closing database session")
-        session.close()
-        # Close the generator
-        try:
-            next(db_generator)
-        except StopIteration:
-            pass
 
+
+def new_cart_item(menu_id: UUID, menu_name: str, quantity: int, price: int, options: Optional[List], now: datetime) -> CartItemDto:
+    """요청 내용으로 새 장바구니 아이템 생성 (options: 요청의 옵션 DTO 목록)"""
+    return CartItemDto(
+        uuid=uuid4(),
+        menu_id=menu_id,
+        menu_name=menu_name,
+        quantity=quantity,
+        price=price,
+        created_at=now,
+        updated_at=now,
+        options=[
+            CartItemOptionDto(
+                uuid=uuid4(),
+                menu_option_id=None,  # ID 연동 전: 이름만 저장
+                menu_option_name=option.menu_option_name,
+                price=option.price,
+                created_at=now,
+                updated_at=now,
+            )
+            for option in options or []
+        ] or None,
+    )
+
+
+def lines_by_key(cart: CartDto) -> Dict[str, CartItemDto]:
+    """장바구니 활성 라인을 line_key 로 색인"""
+    return {line_key(item.menu_id, item.options): item for item in cart.items or []}
+
+
+def add_line(cart: CartDto, lines: Dict[str, CartItemDto], menu_id: UUID, menu_name: str, quantity: int, price: int, options: Optional[List], now: datetime) -> CartItemDto:
+    """
+    장바구니에 담기: 같은 구성의 라인이 있으면 quantity += quantity, 없으면 새 라인 추가
+
+    cart_store.edit() 안(장바구니 lock)에서 호출하므로 합산은 원자적입니다.
+    lines 는 lines_by_key(cart) 결과이며 새 라인도 함께 등록됩니다.
+    """
+    key = line_key(menu_id, options)
+    item = lines.get(key)
+    if item:
+        item.quantity += quantity
+        item.updated_at = now
+        return item
+
+    item = new_cart_item(menu_id, menu_name, quantity, price, options, now)
+    cart.items = (cart.items or []) + [item]
+    lines[key] = item
+    return item
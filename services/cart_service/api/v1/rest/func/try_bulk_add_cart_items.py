@@ -0,0 +1,82 @@
+from schemas.request.bulk_add_cart_items import BulkAddCartItemsRequestDto
+from schemas.response.bulk_add_cart_items import BulkAddCartItemsResponseDto
+from schemas.response.get_cart import CartDto
+from schemas.common import (
+    create_success_result,
+    create_error_result,
+    create_unknown_error_result,
+)
+from model.exception import (
+    AuthenticationException,
+    CartValidationException,
+    RestaurantMismatchException,
+    CartItemValidationException,
+)
+from utility.cart_store import cart_store, utcnow
+from .try_add_cart_item import add_line, lines_by_key
+from uuid import uuid4, UUID
+
+
+async def try_bulk_add_cart_items(request: BulkAddCartItemsRequestDto):
+    """
+    장바구니 아이템 일괄 추가/교체 (재주문, 장바구니 복원)
+
+    모든 아이템을 먼저 검증하고 하나라도 잘못되면 아무것도 반영하지 않습니다.
+    장바구니 조회/수정/journal 기록은 요청당 한 번이고, DB 에는 write-behind 가
+    아이템/옵션을 테이블별 multi-row INSERT 로 한 트랜잭션에 반영합니다.
+    """
+    try:
+        if not request.user_id:
+            raise AuthenticationException("사용자 ID가 필요합니다.")
+
+        try:
+            user_uuid = UUID(request.user_id)
+            restaurant_uuid = UUID(request.restaurant_id)
+            menu_uuids = [UUID(item.menu_id) for item in request.items]
+        except ValueError as e:
+            raise CartItemValidationException(f"잘못된 UUID 형식: {e}")
+
+        # 전체 검증 (all-or-nothing)
+        for index, item in enumerate(request.items):
+            if item.quantity <= 0:
+                raise CartItemValidationException(f"{index + 1}번째 항목: 수량은 1 이상이어야 합니다.")
+            if item.price < 0:
+                raise CartItemValidationException(f"{index + 1}번째 항목: 가격은 0 이상이어야 합니다.")
+            for option in item.options or []:
+                if option.price < 0:
+                    raise CartItemValidationException(f"{index + 1}번째 항목: 옵션 가격은 0 이상이어야 합니다.")
+
+        # hot cart store 에서 한 번에 수정 (DB 반영은 write-behind)
+        async with cart_store.edit(user_uuid) as state:
+            cart = state.cart
+
+            # 교체가 아니면 활성 아이템이 있을 때 레스토랑 일치 확인
+            if not request.replace and cart and cart.items and cart.restaurant_id != restaurant_uuid:
+                raise RestaurantMismatchException("다른 매장의 메뉴는 장바구니에 추가할 수 없습니다.")
+
+            now = utcnow()
+            if not cart:
+                cart = state.cart = CartDto(uuid=uuid4(), user_id=user_uuid, restaurant_id=restaurant_uuid, created_at=now, updated_at=now, items=[])
+            elif request.replace or not cart.items:
+                # 기존 아이템 제거 (DB soft delete 는 write-behind), 매장 변경 허용
+                cart.items = []
+                state.pricing.clear()
+                cart.restaurant_id = restaurant_uuid
+            cart.updated_at = now
+
+            # 같은 구성(요청 안 중복 포함)은 한 라인으로 합산
+            lines = lines_by_key(cart)
+            added_items = [
+                add_line(cart, lines, menu_uuid, item.menu_name, item.quantity, item.price, item.options, now)
+                for menu_uuid, item in zip(menu_uuids, request.items)
+            ]
+            state.touch_items(added_items)
+
+        response = BulkAddCartItemsResponseDto(cart_items=[item.model_copy(deep=True) for item in added_items])
+        return create_success_result(response)
+
+    except (AuthenticationException, CartValidationException, RestaurantMismatchException, CartItemValidationException) as e:
+        return create_error_result(e)
+    except Exception as e:
+        print(f"[CART_SERVICE] Exception occurred: {e}")
+        return create_unknown_error_result(e)
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from schemas.request.delete_cart_item import DeleteCartItemRequestDto
 from schemas.response.delete_cart_item import DeleteCartItemResponseDto
 from schemas.common import create_success_result, create_error_result, create_unknown_error_result
@@ -7,15 +7,13 @@ from model.exception import (
     CartItemNotFoundException,
     AuthorizationException
 )
-from model.cart import Cart, CartItem, CartItemOption
-from utility.db import get_db
+from model.cart import CartItem
+from utility.cart_store import cart_store, utcnow
+from utility.db import AsyncSessionLocal
 from uuid import UUID
-from datetime import datetime
 
 
 async def try_delete_cart_item(item_id: UUID, request: DeleteCartItemRequestDto):
-    session = next(get_db())
-
     try:
         print(f"[DELETE_CART_ITEM] Starting deletion - item_id: {item_id}, user_id: {request.user_id}")
 
@@ -23,57 +21,32 @@ async def try_delete_cart_item(item_id: UUID, request: DeleteCartItemRequestDto)
             print("[DELETE_CART_ITEM] Error: Missing user_id")
             raise AuthenticationException("사용자 ID가 필요합니다.")
 
-        # 장바구니 아이템 조회
-        cart_item = session.query(CartItem).filter(
-            CartItem.uuid == item_id,
-            CartItem.is_deleted == False
-        ).first()
-
-        if not cart_item:
-            print(f"[DELETE_CART_ITEM] Error: Cart item not found - item_id: {item_id}")
-            raise CartItemNotFoundException("장바구니 항목을 찾을 수 없습니다.")
-
-        print(f"[DELETE_CART_ITEM] Cart item found - cart_id: {cart_item.cart_id}")
-
-        # 사용자 권한 확인
-        cart = session.query(Cart).filter(
-            Cart.uuid == cart_item.cart_id,
-            Cart.is_deleted == False
-        ).first()
-
-        if not cart or cart.user_id != request.user_id:
-            print(f"[DELETE_CART_ITEM] Error: Authorization failed - cart.user_id: {cart.user_id if cart else None}, request.user_id: {request.user_id}")
-            raise AuthorizationException("해당 장바구니 항목을 삭제할 권한이 없습니다.")
-
-        # 장바구니 아이템 옵션 soft delete
-        cart_item_options = session.query(CartItemOption).filter(
-            CartItemOption.cart_item_id == cart_item.uuid,
-            CartItemOption.is_deleted == False
-        ).all()
-
-        print(f"[DELETE_CART_ITEM] Found {len(cart_item_options)} options to delete")
-
-        deleted_time = datetime.utcnow()
-        for option in cart_item_options:
-            option.is_deleted = True
-            option.updated_at = deleted_time
-
-        # 장바구니 아이템 soft delete
-        cart_item.is_deleted = True
-        cart_item.updated_at = deleted_time
-
-        print(f"[DELETE_CART_ITEM] Committing deletion")
-        session.commit()
+        # hot cart store 에서 삭제 (DB soft delete 는 write-behind)
+        async with cart_store.edit(request.user_id) as state:
+            cart = state.cart
+            items = (cart.items if cart else None) or []
+            if not any(item.uuid == item_id for item in items):
+                async with AsyncSessionLocal() as session:
+                    exists = await session.scalar(
+                        select(CartItem.uuid).where(CartItem.uuid == item_id, CartItem.is_deleted == False).limit(1)
+                    )
+                if exists:
+                    print(f"[DELETE_CART_ITEM] Error: Authorization failed - item_id: {item_id}, request.user_id: {request.user_id}")
+                    raise AuthorizationException("해당 장바구니 항목을 삭제할 권한이 없습니다.")
+                print(f"[DELETE_CART_ITEM] Error: Cart item not found - item_id: {item_id}")
+                raise CartItemNotFoundException("장바구니 항목을 찾을 수 없습니다.")
+
+            # 장바구니 아이템과 옵션 삭제
+            deleted_time = utcnow()
+            cart.items = [item for item in items if item.uuid != item_id]
+            state.pricing.remove_line(item_id)
+            cart.updated_at = deleted_time
 
         print(f"[DELETE_CART_ITEM] Deletion successful - item_id: {item_id}")
         response = DeleteCartItemResponseDto(item_id=item_id, deleted_at=deleted_time)
         return create_success_result(response)
         
     except (AuthenticationException, CartItemNotFoundException, AuthorizationException) as e:
-        session.rollback()
         return create_error_result(e)
     except Exception as e:
-        session.rollback()
         return create_unknown_error_result(e)
-    finally:
-        session.close()
@@ -1,65 +1,83 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
 from schemas.request.get_cart import GetCartRequestDto
 from schemas.response.get_cart import GetCartResponseDto, CartDto, CartItemDto, CartItemOptionDto
 from schemas.common import create_success_result, create_error_result, create_unknown_error_result
 from model.exception import AuthenticationException
 from model.cart import Cart, CartItem, CartItemOption
-from utility.db import get_db
+from utility.cart_store import cart_store
+from utility.pricing import quote
+from utility.restaurant_terms import restaurant_terms
 from uuid import UUID
 from typing import Optional, List
 
 
 async def try_get_cart(request: GetCartRequestDto):
-    session = next(get_db())
-    
     try:
         if not request.user_id:
             raise AuthenticationException("사용자 ID가 필요합니다.")
 
-        # 사용자의 장바구니 조회
-        cart = session.query(Cart).filter(
-            Cart.user_id == request.user_id,
-            Cart.is_deleted == False
-        ).first()
-        
+        # hot cart store 에서 조회 (없으면 DB 에서 한 번 읽어 올림)
+        state = await cart_store.get(request.user_id)
+        cart = state.active_cart
+
+        # 장바구니가 없거나 활성 아이템이 없는 경우 Cart를 null로 반환
         if not cart:
             return create_success_result(GetCartResponseDto(cart=None))
 
-        # 장바구니 아이템 조회
-        cart_items = session.query(CartItem).filter(
-            CartItem.cart_id == cart.uuid,
-            CartItem.is_deleted == False
-        ).all()
+        # 라인 금액/subtotal 은 수정 시점에 계산돼 있음. 매장 조건만 (캐시에서) 적용
+        cart, subtotal = cart.model_copy(deep=True), state.pricing.subtotal
+        terms = await restaurant_terms.get(cart.restaurant_id)
+        response = GetCartResponseDto(cart=cart, pricing=quote(subtotal, terms))
+        return create_success_result(response)
 
-        # 활성 아이템이 없는 경우 Cart를 null로 반환
-        if not cart_items:
-            print(f"[GET_CART] No active items found for cart {cart.uuid}, returning null cart")
-            return create_success_result(GetCartResponseDto(cart=None))
+    except AuthenticationException as e:
+        return create_error_result(e)
+    except Exception as e:
+        return create_unknown_error_result(e)
 
-        # 응답 DTO 생성
-        items = []
-        for item in cart_items:
-            # 아이템 옵션 조회
-            item_options = session.query(CartItemOption).filter(
-                CartItemOption.cart_item_id == item.uuid,
-                CartItemOption.is_deleted == False
-            ).all()
 
-            option_dtos = []
-            for option in item_options:
-                # 저장된 옵션 이름 사용
-                option_dtos.append(CartItemOptionDto(
-                    uuid=option.uuid,
-                    menu_option_id=option.menu_option_id,
-                    menu_option_name=option.menu_option_name,  # DB에 저장된 이름 사용
-                    price=option.price,
-                    created_at=option.created_at,
-                    updated_at=option.updated_at,
-                ))
+async def load_cart(session: AsyncSession, user_id: UUID, include_empty: bool = False) -> Optional[CartDto]:
+    """
+    장바구니 + 활성 아이템 + 활성 옵션을 쿼리 한 번으로 조회
 
+    cart 에 item, item 에 option 을 soft delete 조건과 함께 LEFT JOIN 한 행들을
+    Python 에서 cart > items > options 로 접습니다. (아이템 수와 관계없이 DB 왕복 1회)
+    활성 아이템이 없으면 None. include_empty=True 면 아이템이 없는 장바구니도 (items=[]) 반환.
+    """
+    # 사용자의 활성 장바구니 하나
+    cart_id = (
+        select(Cart.uuid)
+        .where(Cart.user_id == user_id, Cart.is_deleted == False)
+        .limit(1)
+        .scalar_subquery()
+    )
+    rows = (await session.execute(
+        select(Cart, CartItem, CartItemOption)
+        .outerjoin(CartItem, and_(CartItem.cart_id == Cart.uuid, CartItem.is_deleted == False))
+        .outerjoin(CartItemOption, and_(
+            CartItemOption.cart_item_id == CartItem.uuid,
+            CartItemOption.is_deleted == False,
+        ))
+        .where(Cart.uuid == cart_id)
+        .order_by(CartItem.created_at, CartItem.uuid, CartItemOption.created_at, CartItemOption.uuid)
+    )).all()
+
+    if not rows:
+        return None
+
+    cart = rows[0][0]
+    if rows[0][1] is None and not include_empty:
+        return None
+    items: List[CartItemDto] = []
+    options_by_item = {}
+    for _, item, option in rows:
+        if item is None:
+            continue
+        if item.uuid not in options_by_item:
+            options_by_item[item.uuid] = []
             # 저장된 메뉴 정보를 평면화하여 직접 포함
-            item_dto = CartItemDto(
+            items.append(CartItemDto(
                 uuid=item.uuid,
                 menu_id=item.menu_id,
                 menu_name=item.menu_name,
@@ -69,25 +87,25 @@ async def try_get_cart(request: GetCartRequestDto):
                 price=item.price,
                 created_at=item.created_at,
                 updated_at=item.updated_at,
-                options=option_dtos if option_dtos else None
-            )
-            items.append(item_dto)
+            ))
+        if option is not None:
+            options_by_item[item.uuid].append(CartItemOptionDto(
+                uuid=option.uuid,
+                menu_option_id=option.menu_option_id,
+                menu_option_name=option.menu_option_name,  # DB에 저장된 이름 사용
+                price=option.price,
+                created_at=option.created_at,
+                updated_at=option.updated_at,
+            ))
 
-        cart_dto = CartDto(
-            uuid=cart.uuid,
-            user_id=cart.user_id,
-            restaurant_id=cart.restaurant_id,
-            created_at=cart.created_at,
-            updated_at=cart.updated_at,
-            items=items if items else None
-        )
+    for item_dto in items:
+        item_dto.options = options_by_item[item_dto.uuid] or None
 
-        response = GetCartResponseDto(cart=cart_dto)
-        return create_success_result(response)
-        
-    except AuthenticationException as e:
-        return create_error_result(e)
-    except Exception as e:
-        return create_unknown_error_result(e)
-    finally:
-        session.close()
+    return CartDto(
+        uuid=cart.uuid,
+        user_id=cart.user_id,
+        restaurant_id=cart.restaurant_id,
+        created_at=cart.created_at,
+        updated_at=cart.updated_at,
+        items=items
+    )
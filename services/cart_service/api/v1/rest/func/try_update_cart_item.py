@@ -1,6 +1,7 @@
+from sqlalchemy import select
 from schemas.request.update_cart_item import UpdateCartItemRequestDto
 from schemas.response.update_cart_item import UpdateCartItemResponseDto
-from schemas.response.get_cart import CartItemDto, CartItemOptionDto
+from schemas.response.get_cart import CartItemOptionDto
 from schemas.common import create_success_result, create_error_result, create_unknown_error_result
 from model.exception import (
     AuthenticationException,
@@ -8,15 +9,14 @@ from model.exception import (
     CartItemValidationException,
     AuthorizationException,
 )
-from model.cart import Cart, CartItem, CartItemOption
-from utility.db import get_db
+from model.cart import CartItem
+from utility.cart_store import cart_store, utcnow
+from utility.cart_line import line_key
+from utility.db import AsyncSessionLocal
 from uuid import UUID, uuid4
-from datetime import datetime
 
 
 async def try_update_cart_item(item_id: UUID, request: UpdateCartItemRequestDto):
-    session = next(get_db())
-
     try:
         if not request.user_id:
             raise AuthenticationException("사용자 ID가 필요합니다.")
@@ -27,102 +27,77 @@ async def try_update_cart_item(item_id: UUID, request: UpdateCartItemRequestDto)
         if request.price < 0:
             raise CartItemValidationException("가격은 0 이상이어야 합니다.")
 
-        # Load cart item
-        cart_item = (
-            session.query(CartItem)
-            .filter(CartItem.uuid == item_id, CartItem.is_deleted == False)
-            .first()
-        )
-
-        if not cart_item:
-            raise CartItemNotFoundException("장바구니 상품을 찾을 수 없습니다.")
-
-        # Ownership check
-        cart = (
-            session.query(Cart)
-            .filter(Cart.uuid == cart_item.cart_id, Cart.is_deleted == False)
-            .first()
-        )
-
-        if not cart or cart.user_id != request.user_id:
-            raise AuthorizationException("해당 장바구니 상품에 대한 권한이 없습니다.")
-
-        # Soft delete existing options
-        existing_options = (
-            session.query(CartItemOption)
-            .filter(CartItemOption.cart_item_id == cart_item.uuid, CartItemOption.is_deleted == False)
-            .all()
-        )
-
-        for option in existing_options:
-            option.is_deleted = True
-            option.updated_at = datetime.utcnow()
-
-        # Update cart item including menu info if provided
-        cart_item.quantity = request.quantity
-        cart_item.price = request.price
-        if request.menu_name:
-            cart_item.menu_name = request.menu_name
-        if request.menu_description is not None:
-            cart_item.menu_description = request.menu_description
-        if request.menu_image_url is not None:
-            cart_item.menu_image_url = request.menu_image_url
-        cart_item.updated_at = datetime.utcnow()
-
-        # Add new options
-        if request.options:
-            for option in request.options:
-                if option.price < 0:
-                    raise CartItemValidationException("옵션 가격은 0 이상이어야 합니다.")
-
-                cart_item_option = CartItemOption(
-                    uuid=uuid4(),
-                    cart_item_id=cart_item.uuid,
-                    menu_option_id=None,  # ID 연동 전: 이름만 저장
-                    menu_option_name=option.menu_option_name,
-                    price=option.price,
+        for option in request.options or []:
+            if option.price < 0:
+                raise CartItemValidationException("옵션 가격은 0 이상이어야 합니다.")
+
+        try:
+            user_uuid = UUID(request.user_id)
+        except ValueError as e:
+            raise CartItemValidationException(f"잘못된 UUID 형식: {e}")
+
+        # hot cart store 에서 수정 (DB 반영은 write-behind)
+        async with cart_store.edit(user_uuid) as state:
+            cart = state.cart
+            cart_item = next((item for item in (cart.items if cart else None) or [] if item.uuid == item_id), None)
+            if not cart_item:
+                await _raise_not_found_or_forbidden(item_id)
+
+            now = utcnow()
+            # 옵션 구성이 바뀐 경우에만 새 옵션으로 교체 (수량만 바뀐 경우 옵션 행은 그대로)
+            requested = [(option.menu_option_name, option.price) for option in request.options or []]
+            current = [(option.menu_option_name, option.price) for option in cart_item.options or []]
+            same_line = None
+            if requested != current:
+                cart_item.options = [
+                    CartItemOptionDto(
+                        uuid=uuid4(),
+                        menu_option_id=None,  # ID 연동 전: 이름만 저장
+                        menu_option_name=name,
+                        price=price,
+                        created_at=now,
+                        updated_at=now,
+                    )
+                    for name, price in requested
+                ] or None
+                # 바꾼 구성이 다른 라인과 같으면 그 라인에 수량을 합산
+                key = line_key(cart_item.menu_id, cart_item.options)
+                same_line = next(
+                    (item for item in cart.items if item.uuid != cart_item.uuid and line_key(item.menu_id, item.options) == key),
+                    None,
                 )
-                session.add(cart_item_option)
-
-        session.commit()
-
-        # Build updated item dto
-        options = (
-            session.query(CartItemOption)
-            .filter(CartItemOption.cart_item_id == cart_item.uuid, CartItemOption.is_deleted == False)
-            .all()
-        )
 
-        option_dtos = [
-            CartItemOptionDto(
-                uuid=o.uuid,
-                menu_option_id=o.menu_option_id,
-                price=o.price,
-                created_at=o.created_at,
-                updated_at=o.updated_at,
-            )
-            for o in options
-        ]
-
-        item_dto = CartItemDto(
-            uuid=cart_item.uuid,
-            menu_id=cart_item.menu_id,
-            quantity=cart_item.quantity,
-            price=cart_item.price,
-            created_at=cart_item.created_at,
-            updated_at=cart_item.updated_at,
-            options=option_dtos if option_dtos else None,
-        )
-
-        response = UpdateCartItemResponseDto(cart_item=item_dto)
+            if same_line:
+                same_line.quantity += request.quantity
+                same_line.updated_at = now
+                cart.items = [item for item in cart.items if item.uuid != cart_item.uuid]
+                state.pricing.remove_line(cart_item.uuid)
+                cart_item = same_line
+            else:
+                # Update cart item including menu info if provided
+                cart_item.quantity = request.quantity
+                cart_item.price = request.price
+                if request.menu_name:
+                    cart_item.menu_name = request.menu_name
+                cart_item.updated_at = now
+            cart.updated_at = now
+            state.touch_items([cart_item])
+
+        response = UpdateCartItemResponseDto(cart_item=cart_item.model_copy(deep=True))
         return create_success_result(response)
 
     except (AuthenticationException, CartItemNotFoundException, CartItemValidationException, AuthorizationException) as e:
-        session.rollback()
         return create_error_result(e)
     except Exception as e:
-        session.rollback()
         return create_unknown_error_result(e)
-    finally:
-        session.close()
 
+
+async def _raise_not_found_or_forbidden(item_id: UUID):
+    """사용자의 장바구니에 없는 상품: 다른 사용자의 상품이면 권한 오류, 아니면 없음"""
+    async with AsyncSessionLocal() as session:
+        exists = await session.scalar(
+            select(CartItem.uuid).where(CartItem.uuid == item_id, CartItem.is_deleted == False).limit(1)
+        )
+    if exists:
+        raise AuthorizationException("해당 장바구니 상품에 대한 권한이 없습니다.")
+    raise CartItemNotFoundException("장바구니 상품을 찾을 수 없습니다.")
@@ -8,13 +8,16 @@ import json
 print("[STARTUP] Starting cart service import process...")
 
 try:
-    from utility.db import Base, engine
+    from utility.db import Base, engine, async_engine
+    from utility.cart_store import cart_store
+    from utility.restaurant_terms import restaurant_terms
     print("[STARTUP] Database utilities imported successfully")
 except Exception as e:
     print(f"[STARTUP] Database import failed: {e}")
 
 try:
     from utility.logger import logger
+    from utility.tracing import tracing_middleware
     print("[STARTUP] Logger imported successfully")
 except Exception as e:
     print(f"[STARTUP] Logger import failed: {e}")
@@ -75,6 +78,9 @@ def main():
 
         return response
 
+    # 요청 추적 (traceparent / x-request-id, handler span) - 가장 바깥쪽
+    app.middleware("http")(tracing_middleware)
+
     # Custom exception handler for validation errors
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -128,6 +134,18 @@ def main():
     # API 라우터 등록
     app.include_router(cart_router, prefix="/api/v1/rest")
 
+    # hot cart store: journal 복구 후 write-behind 시작
+    @app.on_event("startup")
+    async def start_cart_store():
+        await cart_store.start()
+
+    # 종료 시 남은 장바구니 변경을 DB 에 반영한 뒤 비동기 커넥션 풀 정리
+    @app.on_event("shutdown")
+    async def dispose_async_engine():
+        await cart_store.close()
+        await restaurant_terms.close()
+        await async_engine.dispose()
+
     # Create database tables
     try:
         Base.metadata.create_all(bind=engine)
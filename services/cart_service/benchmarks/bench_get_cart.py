@@ -0,0 +1,193 @@
+"""
+Benchmark: DB round trips and latency of the cart read
+
+Run from services/cart_service against a database with the cart_service
+schema (SQLALCHEMY_DATABASE_URL / ASYNC_SQLALCHEMY_DATABASE_URL, as for the
+service itself):
+
+    python -m benchmarks.bench_get_cart [--items 1,10,50] [--options-per-item 2]
+                                        [--iterations 200] [--output cart_read.json]
+
+For each cart size a cart is seeded for a fresh user. It is then read
+--iterations times two ways:
+- joined: load_cart, the query used by try_get_cart
+- per_item: the previous shape (cart, items, then one option query per item)
+
+The report has, per size and variant, the statements executed per read
+(counted on the engine) and p50/p95/p99 latency. Seeded rows are deleted
+afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, event, select
+
+from api.v1.rest.func.try_get_cart import load_cart
+from model.cart import Cart, CartItem, CartItemOption
+from utility.db import AsyncSessionLocal, async_engine
+
+
+class StatementCounter:
+    """Statements sent over the async engine (one per DB round trip)"""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+async def load_cart_per_item(session, user_id: UUID) -> Optional[list]:
+    """The read as it was before: cart, items, then options item by item"""
+    cart = await session.scalar(
+        select(Cart).where(Cart.user_id == user_id, Cart.is_deleted == False).limit(1)
+    )
+    if not cart:
+        return None
+    items = (await session.scalars(
+        select(CartItem).where(CartItem.cart_id == cart.uuid, CartItem.is_deleted == False)
+    )).all()
+    return [
+        (item, (await session.scalars(
+            select(CartItemOption).where(CartItemOption.cart_item_id == item.uuid, CartItemOption.is_deleted == False)
+        )).all())
+        for item in items
+    ]
+
+
+async def seed_cart(item_count: int, options_per_item: int) -> UUID:
+    user_id = uuid4()
+    async with AsyncSessionLocal() as session:
+        cart = Cart(uuid=uuid4(), user_id=user_id, restaurant_id=uuid4())
+        session.add(cart)
+        for index in range(item_count):
+            item = CartItem(uuid=uuid4(), cart_id=cart.uuid, menu_id=uuid4(), menu_name=f"menu {index}", quantity=1, price=10_000)
+            session.add(item)
+            for option in range(options_per_item):
+                session.add(CartItemOption(uuid=uuid4(), cart_item_id=item.uuid, menu_option_name=f"option {option}", price=500))
+            # Soft-deleted rows must be filtered out, not just absent
+            session.add(CartItemOption(uuid=uuid4(), cart_item_id=item.uuid, menu_option_name="removed", price=500, is_deleted=True))
+        session.add(CartItem(uuid=uuid4(), cart_id=cart.uuid, menu_id=uuid4(), menu_name="removed", quantity=1, price=10_000, is_deleted=True))
+        await session.commit()
+    return user_id
+
+
+async def delete_seeded(user_ids: List[UUID]):
+    async with AsyncSessionLocal() as session:
+        cart_ids = select(Cart.uuid).where(Cart.user_id.in_(user_ids))
+        item_ids = select(CartItem.uuid).where(CartItem.cart_id.in_(cart_ids))
+        await session.execute(delete(CartItemOption).where(CartItemOption.cart_item_id.in_(item_ids)))
+        await session.execute(delete(CartItem).where(CartItem.cart_id.in_(cart_ids)))
+        await session.execute(delete(Cart).where(Cart.user_id.in_(user_ids)))
+        await session.commit()
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, round(fraction * len(ordered) + 0.5))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def measure(read, user_id: UUID, counter: StatementCounter, iterations: int, warmup: int) -> dict:
+    latencies = []
+    statements = 0
+    for iteration in range(warmup + iterations):
+        async with AsyncSessionLocal() as session:
+            # Check out the connection first: pool pre-ping is not part of the read
+            await session.connection()
+            before = counter.count
+            started = time.perf_counter()
+            await read(session, user_id)
+            elapsed = time.perf_counter() - started
+            if iteration >= warmup:
+                latencies.append(elapsed)
+                statements = counter.count - before
+    latencies.sort()
+    return {
+        "round_trips": statements,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+        },
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    counter = StatementCounter()
+    sizes = [int(size) for size in args.items.split(",") if size.strip()]
+    results, user_ids = {}, []
+    try:
+        for size in sizes:
+            user_id = await seed_cart(size, args.options_per_item)
+            user_ids.append(user_id)
+            cart = await _read_once(user_id)
+            assert cart is not None and len(cart.items) == size, "joined read returned the wrong items"
+            assert all(len(item.options or []) == args.options_per_item for item in cart.items)
+            results[str(size)] = {
+                "joined": await measure(load_cart, user_id, counter, args.iterations, args.warmup),
+                "per_item": await measure(load_cart_per_item, user_id, counter, args.iterations, args.warmup),
+            }
+            print(f"{size} items: {results[str(size)]['joined']['round_trips']} vs "
+                  f"{results[str(size)]['per_item']['round_trips']} round trips", file=sys.stderr)
+    finally:
+        if user_ids:
+            await delete_seeded(user_ids)
+        await async_engine.dispose()
+    return results
+
+
+async def _read_once(user_id: UUID):
+    async with AsyncSessionLocal() as session:
+        return await load_cart(session, user_id)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", default="1,10,50", help="cart sizes to measure")
+    parser.add_argument("--options-per-item", type=int, default=2)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "cart_read",
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "database": async_engine.dialect.name,
+        "settings": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": asyncio.run(run(args)),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
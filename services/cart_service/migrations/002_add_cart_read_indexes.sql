@@ -0,0 +1,19 @@
+-- Migration: Add indexes for the cart read path
+-- Date: 2026-10-18
+-- Description: The cart read joins cart -> active items -> active options in one query.
+--              Partial indexes keep these lookups on live (is_deleted = false) rows only.
+
+-- Active cart of a user
+CREATE INDEX IF NOT EXISTS idx_cart_user_active
+ON cart_service.cart(user_id)
+WHERE is_deleted = false;
+
+-- Active items of a cart
+CREATE INDEX IF NOT EXISTS idx_cart_item_cart_active
+ON cart_service.cart_item(cart_id)
+WHERE is_deleted = false;
+
+-- Active options of an item
+CREATE INDEX IF NOT EXISTS idx_cart_item_option_item_active
+ON cart_service.cart_item_option(cart_item_id)
+WHERE is_deleted = false;
@@ -0,0 +1,62 @@
+-- Migration: Identify cart lines by menu + option configuration
+-- Date: 2026-10-18
+-- Description: Adding the same menu with the same options merges into the existing line
+--              (quantity is summed) instead of inserting a duplicate row.
+--              line_key = sha256("{menu_id}|{option}|{option}...") in hex, where each option is
+--              "{menu_option_id}:{menu_option_name}" (empty string for NULL) sorted by byte order.
+--              Must stay in sync with utility/cart_line.py.
+
+-- 1. Column
+ALTER TABLE cart_service.cart_item
+ADD COLUMN IF NOT EXISTS line_key VARCHAR(64);
+
+-- 2. Backfill active lines
+UPDATE cart_service.cart_item AS ci
+SET line_key = encode(sha256(convert_to(
+        ci.menu_id::text || '|' || COALESCE((
+            SELECT string_agg(opt.part, '|' ORDER BY opt.part COLLATE "C")
+            FROM (
+                SELECT COALESCE(o.menu_option_id::text, '') || ':' || COALESCE(o.menu_option_name, '') AS part
+                FROM cart_service.cart_item_option AS o
+                WHERE o.cart_item_id = ci.uuid AND o.is_deleted = false
+            ) AS opt
+        ), ''),
+    'UTF8')), 'hex')
+WHERE ci.is_deleted = false AND ci.line_key IS NULL;
+
+-- 3. Merge existing duplicates into the oldest line of each (cart, line_key)
+WITH ranked AS (
+    SELECT uuid,
+           first_value(uuid) OVER w AS keeper,
+           sum(quantity) OVER (PARTITION BY cart_id, line_key) AS total_quantity
+    FROM cart_service.cart_item
+    WHERE is_deleted = false AND line_key IS NOT NULL
+    WINDOW w AS (PARTITION BY cart_id, line_key ORDER BY created_at, uuid)
+)
+UPDATE cart_service.cart_item AS ci
+SET quantity = ranked.total_quantity, updated_at = now()
+FROM ranked
+WHERE ci.uuid = ranked.uuid AND ranked.uuid = ranked.keeper AND ci.quantity <> ranked.total_quantity;
+
+WITH duplicates AS (
+    SELECT uuid
+    FROM (
+        SELECT uuid, first_value(uuid) OVER (PARTITION BY cart_id, line_key ORDER BY created_at, uuid) AS keeper
+        FROM cart_service.cart_item
+        WHERE is_deleted = false AND line_key IS NOT NULL
+    ) AS ranked
+    WHERE uuid <> keeper
+),
+deleted_options AS (
+    UPDATE cart_service.cart_item_option
+    SET is_deleted = true, updated_at = now()
+    WHERE cart_item_id IN (SELECT uuid FROM duplicates) AND is_deleted = false
+)
+UPDATE cart_service.cart_item
+SET is_deleted = true, updated_at = now()
+WHERE uuid IN (SELECT uuid FROM duplicates);
+
+-- 4. One active line per configuration in a cart
+CREATE UNIQUE INDEX IF NOT EXISTS uq_cart_item_cart_line_active
+ON cart_service.cart_item(cart_id, line_key)
+WHERE is_deleted = false;
@@ -32,6 +32,8 @@ class CartItem(Base):
     menu_image_url = Column(String, nullable=True)    # 메뉴 이미지 URL
     quantity = Column(Integer, nullable=False)
     price = Column(Integer, nullable=False)
+    # 메뉴 + 옵션 구성 해시 (utility/cart_line.py). 활성 라인은 장바구니 안에서 유일
+    line_key = Column(String(64), nullable=True)
 
     created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
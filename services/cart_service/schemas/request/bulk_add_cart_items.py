@@ -0,0 +1,23 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from .add_cart_item import CartItemOptionDto
+
+# 한 요청에 담을 수 있는 최대 아이템 수
+MAX_BULK_ITEMS = 100
+
+
+class BulkCartItemDto(BaseModel):
+    """일괄 추가할 장바구니 아이템"""
+    menu_id: str = Field(..., description="메뉴 ID")
+    menu_name: str = Field(..., description="메뉴 이름")
+    quantity: int = Field(..., description="수량")
+    price: int = Field(..., description="메뉴 가격")
+    options: Optional[List[CartItemOptionDto]] = Field(None, description="선택 옵션 목록")
+
+
+class BulkAddCartItemsRequestDto(BaseModel):
+    """장바구니 아이템 일괄 추가/교체 요청 (재주문, 장바구니 복원)"""
+    user_id: str = Field(..., description="사용자 ID")
+    restaurant_id: str = Field(..., description="매장 ID")
+    replace: bool = Field(False, description="true 면 기존 아이템을 모두 지우고 items 로 교체")
+    items: List[BulkCartItemDto] = Field(..., description="추가할 아이템 목록", min_length=1, max_length=MAX_BULK_ITEMS)
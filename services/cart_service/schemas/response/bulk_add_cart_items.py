@@ -0,0 +1,8 @@
+from typing import List
+from pydantic import BaseModel, Field
+from .get_cart import CartItemDto
+
+
+class BulkAddCartItemsResponseDto(BaseModel):
+    """Bulk add cart items response"""
+    cart_items: List[CartItemDto] = Field(..., description="Created cart items, in request order")
@@ -26,6 +26,7 @@ class CartItemDto(BaseModel):
     created_at: datetime = Field(..., description="Created at")
     updated_at: datetime = Field(..., description="Updated at")
     options: Optional[List[CartItemOptionDto]] = Field(None, description="Selected options")
+    line_total: Optional[int] = Field(None, description="(Menu price + option prices) x quantity")
 
 
 class CartDto(BaseModel):
@@ -37,6 +38,16 @@ class CartDto(BaseModel):
     items: Optional[List[CartItemDto]] = Field(None, description="Cart items")
 
 
+class CartPricingDto(BaseModel):
+    subtotal: int = Field(..., description="Sum of line totals")
+    delivery_fee: Optional[int] = Field(None, description="Delivery fee for this subtotal")
+    min_order_amount: Optional[int] = Field(None, description="Restaurant minimum order amount")
+    min_order_shortfall: Optional[int] = Field(None, description="Amount missing to reach the minimum order")
+    total: Optional[int] = Field(None, description="Subtotal + delivery fee")
+    orderable: Optional[bool] = Field(None, description="Minimum order amount reached")
+
+
 class GetCartResponseDto(BaseModel):
     cart: Optional[CartDto] = Field(None, description="Cart")
+    pricing: Optional[CartPricingDto] = Field(None, description="Cart pricing (null when the cart is empty)")
 
@@ -0,0 +1 @@
+# Tests package for cart service
\ No newline at end of file
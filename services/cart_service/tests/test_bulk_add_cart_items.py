@@ -0,0 +1,111 @@
+"""
+Test cases for bulk add/replace cart items
+"""
+
+from uuid import UUID, uuid4
+
+import pytest
+
+from api.v1.rest.func.try_bulk_add_cart_items import try_bulk_add_cart_items
+from api.v1.rest.func.try_get_cart import load_cart
+from schemas.request.bulk_add_cart_items import BulkAddCartItemsRequestDto
+
+
+def bulk_items(count: int) -> list:
+    return [
+        {"menu_id": str(uuid4()), "menu_name": f"메뉴{index}", "quantity": 1, "price": 1000, "options": [{"menu_option_name": "곱빼기", "price": 500}]}
+        for index in range(count)
+    ]
+
+
+class TestBulkAddCartItems:
+    """Test cases for try_bulk_add_cart_items"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_add_success(self, store, db_session_factory, user_id, restaurant_id):
+        """All items are added in one edit and written in one flush"""
+        # When: 15개 일괄 추가
+        result = await try_bulk_add_cart_items(BulkAddCartItemsRequestDto(user_id=user_id, restaurant_id=restaurant_id, items=bulk_items(15)))
+
+        # Then
+        assert result.error is None
+        assert len(result.data.cart_items) == 15
+        state = await store.get(UUID(user_id))
+        assert state.version == 1
+        assert state.pricing.subtotal == 15 * 1500
+
+        await store.flush()
+        async with db_session_factory() as session:
+            cart = await load_cart(session, UUID(user_id))
+        assert len(cart.items) == 15
+
+    @pytest.mark.asyncio
+    async def test_bulk_add_is_all_or_nothing(self, store, user_id, restaurant_id):
+        """One invalid item rejects the whole request"""
+        # Given: 기존 장바구니
+        items = bulk_items(3)
+        await try_bulk_add_cart_items(BulkAddCartItemsRequestDto(user_id=user_id, restaurant_id=restaurant_id, items=items[:1]))
+
+        # When: 마지막 항목의 수량이 0
+        invalid = items[1:] + [{**items[0], "quantity": 0}]
+        result = await try_bulk_add_cart_items(BulkAddCartItemsRequestDto(user_id=user_id, restaurant_id=restaurant_id, items=invalid))
+
+        # Then: 오류, 장바구니는 그대로
+        assert result.error is not None
+        assert "3번째 항목" in result.error.message
+        state = await store.get(UUID(user_id))
+        assert [(item.menu_id, item.quantity) for item in state.cart.items] == [(UUID(items[0]["menu_id"]), 1)]
+
+    @pytest.mark.asyncio
+    async def test_bulk_add_other_restaurant_rejected(self, store, user_id, restaurant_id):
+        """Without replace, items from another restaurant are rejected"""
+        # Given
+        await try_bulk_add_cart_items(BulkAddCartItemsRequestDto(user_id=user_id, restaurant_id=restaurant_id, items=bulk_items(1)))
+
+        # When
+        result = await try_bulk_add_cart_items(BulkAddCartItemsRequestDto(user_id=user_id, restaurant_id=str(uuid4()), items=bulk_items(1)))
+
+        # Then
+        assert result.error.name == "RestaurantMismatchException"
+
+    @pytest.mark.asyncio
+    async def test_bulk_replace_switches_restaurant(self, store, db_session_factory, user_id, restaurant_id):
+        """replace=True drops the old lines and moves the cart to the new restaurant"""
+        # Given: 기존 매장 장바구니가 DB 에 반영됨
+        await try_bulk_add_cart_items(BulkAddCartItemsRequestDto(user_id=user_id, restaurant_id=restaurant_id, items=bulk_items(3)))
+        await store.flush()
+
+        # When: 다른 매장 아이템으로 교체
+        other_restaurant_id = str(uuid4())
+        items = bulk_items(2)
+        result = await try_bulk_add_cart_items(BulkAddCartItemsRequestDto(
+            user_id=user_id, restaurant_id=other_restaurant_id, replace=True, items=items,
+        ))
+
+        # Then: 메모리와 DB 모두 새 매장 아이템만
+        assert result.error is None
+        state = await store.get(UUID(user_id))
+        assert state.cart.restaurant_id == UUID(other_restaurant_id)
+        assert state.pricing.subtotal == 2 * 1500
+
+        await store.flush()
+        async with db_session_factory() as session:
+            cart = await load_cart(session, UUID(user_id))
+        assert cart.restaurant_id == UUID(other_restaurant_id)
+        assert sorted(str(item.menu_id) for item in cart.items) == sorted(item["menu_id"] for item in items)
+
+    @pytest.mark.asyncio
+    async def test_bulk_add_merges_duplicates_in_request(self, store, user_id, restaurant_id):
+        """The same configuration twice in one request becomes one line"""
+        # Given
+        item = bulk_items(1)[0]
+
+        # When
+        result = await try_bulk_add_cart_items(BulkAddCartItemsRequestDto(
+            user_id=user_id, restaurant_id=restaurant_id, items=[item, {**item, "quantity": 2}],
+        ))
+
+        # Then
+        assert result.error is None
+        state = await store.get(UUID(user_id))
+        assert [item.quantity for item in state.cart.items] == [3]
@@ -0,0 +1,89 @@
+"""
+Test cases for the cart change journal
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from utility.cart_journal import CartJournal
+
+
+class TestCartJournal:
+    """Test cases for CartJournal"""
+
+    @pytest.mark.asyncio
+    async def test_replay_keeps_last_record_per_user(self, tmp_path):
+        """Replay returns each user's latest snapshot"""
+        # Given
+        journal = CartJournal(str(tmp_path / "journal.jsonl"), fsync=False)
+        journal.open()
+        await journal.append({"user_id": "a", "cart": None, "cleared_cart_ids": [], "n": 1})
+        await journal.append({"user_id": "b", "cart": None, "cleared_cart_ids": [], "n": 1})
+        await journal.append({"user_id": "a", "cart": None, "cleared_cart_ids": [], "n": 2})
+        journal.close()
+
+        # When
+        records = journal.replay()
+
+        # Then
+        assert {user_id: record["n"] for user_id, record in records.items()} == {"a": 2, "b": 1}
+
+    def test_replay_skips_truncated_last_line(self, tmp_path):
+        """A line cut short by a crash is skipped; earlier records survive"""
+        # Given: 마지막 줄이 잘린 journal
+        path = tmp_path / "journal.jsonl"
+        complete = json.dumps({"user_id": "a", "cart": None, "cleared_cart_ids": []})
+        truncated = json.dumps({"user_id": "b", "cart": None, "cleared_cart_ids": []})[:20]
+        path.write_text(complete + "\n" + truncated, encoding="utf-8")
+
+        # When
+        records = CartJournal(str(path)).replay()
+
+        # Then
+        assert list(records) == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_rewrite_replaces_contents(self, tmp_path):
+        """Rewrite keeps only the given records and later appends go to the new file"""
+        # Given
+        journal = CartJournal(str(tmp_path / "journal.jsonl"), fsync=False)
+        journal.open()
+        await journal.append({"user_id": "a", "cart": None, "cleared_cart_ids": []})
+
+        # When: b 만 남기고 교체 후 추가 기록
+        await journal.rewrite(lambda: [{"user_id": "b", "cart": None, "cleared_cart_ids": []}])
+        await journal.append({"user_id": "c", "cart": None, "cleared_cart_ids": []})
+        journal.close()
+
+        # Then
+        assert sorted(journal.replay()) == ["b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_rewrite_waits_for_pending_append(self, tmp_path):
+        """A record still waiting for its fsync is not dropped by a concurrent rewrite"""
+        # Given: fsync 를 기다리는 기록 (기록이 끝나면 장바구니 상태에 반영)
+        journal = CartJournal(str(tmp_path / "journal.jsonl"), fsync=True)
+        journal.open()
+        committed = {}
+        record = {"user_id": "a", "cart": None, "cleared_cart_ids": []}
+
+        async def edit():
+            await journal.append(record)
+            committed[record["user_id"]] = record
+
+        task = asyncio.create_task(edit())
+        await asyncio.sleep(0)
+
+        # When: 그 사이 반영된 상태로 교체
+        await journal.rewrite(lambda: list(committed.values()))
+        await task
+        journal.close()
+
+        # Then: 기록이 남아 있음
+        assert list(journal.replay()) == ["a"]
+
+    def test_replay_without_file(self, tmp_path):
+        """No journal yet means nothing to recover"""
+        assert CartJournal(str(tmp_path / "missing.jsonl")).replay() == {}
@@ -0,0 +1,143 @@
+"""
+Test cases for merging identical cart lines
+"""
+
+from uuid import UUID, uuid4
+
+import pytest
+
+from api.v1.rest.func.try_add_cart_item import try_add_cart_item
+from api.v1.rest.func.try_delete_cart_item import try_delete_cart_item
+from api.v1.rest.func.try_get_cart import load_cart
+from api.v1.rest.func.try_update_cart_item import try_update_cart_item
+from schemas.request.add_cart_item import AddCartItemRequestDto, CartItemOptionDto
+from schemas.request.delete_cart_item import DeleteCartItemRequestDto
+from schemas.request.update_cart_item import UpdateCartItemRequestDto
+from utility.cart_line import line_key
+
+
+async def add_item(user_id: str, restaurant_id: str, menu_id: str, quantity: int = 1, options: list = None):
+    result = await try_add_cart_item(AddCartItemRequestDto(
+        user_id=user_id, restaurant_id=restaurant_id, menu_id=menu_id, menu_name="김치찌개", quantity=quantity, price=9000, options=options,
+    ))
+    assert result.error is None, result.error
+    return result.data.cart_item
+
+
+class TestLineKey:
+    """Test cases for line_key"""
+
+    def test_option_order_does_not_matter(self):
+        """The same options in another order are the same line"""
+        menu_id = uuid4()
+        first = [CartItemOptionDto(menu_option_name="곱빼기", price=1000), CartItemOptionDto(menu_option_name="계란", price=500)]
+
+        assert line_key(menu_id, first) == line_key(menu_id, list(reversed(first)))
+
+    def test_different_configurations(self):
+        """Different options or no options are different lines"""
+        menu_id = uuid4()
+
+        keys = {
+            line_key(menu_id, None),
+            line_key(menu_id, [CartItemOptionDto(menu_option_name="곱빼기", price=1000)]),
+            line_key(menu_id, [CartItemOptionDto(menu_option_name="계란", price=500)]),
+            line_key(uuid4(), None),
+        }
+        assert len(keys) == 4
+
+
+class TestMergeCartLines:
+    """Test cases for merging lines on add and update"""
+
+    @pytest.mark.asyncio
+    async def test_add_same_configuration_merges(self, store, user_id, restaurant_id):
+        """Adding the same menu with the same options sums the quantity on one line"""
+        # Given
+        menu_id = str(uuid4())
+        options = [{"menu_option_name": "곱빼기", "price": 1000}]
+        first = await add_item(user_id, restaurant_id, menu_id, quantity=1, options=options)
+
+        # When: 같은 구성 다시 담기 + 다른 구성 담기
+        merged = await add_item(user_id, restaurant_id, menu_id, quantity=2, options=options)
+        other = await add_item(user_id, restaurant_id, menu_id, quantity=1)
+
+        # Then
+        assert merged.uuid == first.uuid
+        assert merged.quantity == 3
+        assert other.uuid != first.uuid
+        state = await store.get(UUID(user_id))
+        assert len(state.cart.items) == 2
+        assert state.pricing.subtotal == 3 * 10000 + 9000
+
+    @pytest.mark.asyncio
+    async def test_update_into_existing_configuration_merges(self, store, db_session_factory, user_id, restaurant_id):
+        """Changing a line's options to match another line folds it into that line"""
+        # Given: 같은 메뉴, 옵션만 다른 두 라인이 DB 에 반영됨
+        menu_id = str(uuid4())
+        large = await add_item(user_id, restaurant_id, menu_id, quantity=1, options=[{"menu_option_name": "곱빼기", "price": 1000}])
+        plain = await add_item(user_id, restaurant_id, menu_id, quantity=2)
+        await store.flush()
+
+        # When: plain 라인의 옵션을 곱빼기로 변경
+        result = await try_update_cart_item(plain.uuid, UpdateCartItemRequestDto(
+            user_id=user_id, quantity=2, price=9000, options=[{"menu_option_name": "곱빼기", "price": 1000}],
+        ))
+
+        # Then: large 라인에 합산되고 plain 라인은 제거
+        assert result.error is None
+        assert result.data.cart_item.uuid == large.uuid
+        assert result.data.cart_item.quantity == 3
+        state = await store.get(UUID(user_id))
+        assert [item.uuid for item in state.cart.items] == [large.uuid]
+        assert state.pricing.subtotal == 3 * 10000
+
+        await store.flush()
+        async with db_session_factory() as session:
+            cart = await load_cart(session, UUID(user_id))
+        assert [(item.uuid, item.quantity) for item in cart.items] == [(large.uuid, 3)]
+
+    @pytest.mark.asyncio
+    async def test_update_swapping_configurations_flushes(self, store, db_session_factory, user_id, restaurant_id):
+        """Two lines trading configurations in one flush don't trip the unique line index"""
+        # Given
+        menu_id = str(uuid4())
+        large = await add_item(user_id, restaurant_id, menu_id, options=[{"menu_option_name": "곱빼기", "price": 1000}])
+        egg = await add_item(user_id, restaurant_id, menu_id, options=[{"menu_option_name": "계란", "price": 500}])
+        await store.flush()
+
+        # When: 임시 구성을 거쳐 두 라인의 옵션을 맞바꿈
+        for item_id, option in ((large.uuid, "임시"), (egg.uuid, "곱빼기"), (large.uuid, "계란")):
+            result = await try_update_cart_item(item_id, UpdateCartItemRequestDto(
+                user_id=user_id, quantity=1, price=9000, options=[{"menu_option_name": option, "price": 0}],
+            ))
+            assert result.error is None
+        await store.flush()
+
+        # Then
+        async with db_session_factory() as session:
+            cart = await load_cart(session, UUID(user_id))
+        options = {item.uuid: [option.menu_option_name for option in item.options] for item in cart.items}
+        assert options == {large.uuid: ["계란"], egg.uuid: ["곱빼기"]}
+
+    @pytest.mark.asyncio
+    async def test_delete_then_re_add_in_one_flush(self, store, db_session_factory, user_id, restaurant_id):
+        """A line deleted and added again before the flush doesn't hit the unique line index"""
+        # Given: DB 에 반영된 라인
+        menu_id = str(uuid4())
+        options = [{"menu_option_name": "곱빼기", "price": 1000}]
+        first = await add_item(user_id, restaurant_id, menu_id, options=options)
+        await store.flush()
+
+        # When: 삭제 후 같은 구성 다시 담기 (반영 전)
+        result = await try_delete_cart_item(first.uuid, DeleteCartItemRequestDto(user_id=UUID(user_id)))
+        assert result.error is None
+        again = await add_item(user_id, restaurant_id, menu_id, quantity=2, options=options)
+        await store.flush()
+
+        # Then: 새 라인만 활성
+        assert again.uuid != first.uuid
+        async with db_session_factory() as session:
+            cart = await load_cart(session, UUID(user_id))
+        assert [(item.uuid, item.quantity) for item in cart.items] == [(again.uuid, 2)]
+        assert not store._states[UUID(user_id)].dirty
@@ -0,0 +1,147 @@
+"""
+Test cases for the hot cart store (journaled edits, write-behind persistence)
+"""
+
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import func, select
+
+from api.v1.rest.func.try_add_cart_item import try_add_cart_item
+from api.v1.rest.func.try_get_cart import load_cart
+from model.cart import CartItem, CartItemOption
+from schemas.request.add_cart_item import AddCartItemRequestDto
+from utility.cart_store import CartSnapshot, CartStore, persist_carts
+
+
+async def add_item(user_id: str, restaurant_id: str, menu_id: str = None, quantity: int = 1, options: list = None):
+    result = await try_add_cart_item(AddCartItemRequestDto(
+        user_id=user_id,
+        restaurant_id=restaurant_id,
+        menu_id=menu_id or str(uuid4()),
+        menu_name="김치찌개",
+        quantity=quantity,
+        price=9000,
+        options=options,
+    ))
+    assert result.error is None, result.error
+    return result.data.cart_item
+
+
+async def count_active_rows(db_session_factory):
+    async with db_session_factory() as session:
+        items = await session.scalar(select(func.count()).select_from(CartItem).where(CartItem.is_deleted == False))
+        options = await session.scalar(select(func.count()).select_from(CartItemOption).where(CartItemOption.is_deleted == False))
+    return items, options
+
+
+def cart_lines(cart):
+    return [(item.uuid, item.quantity, [option.uuid for option in item.options or []]) for item in cart.items]
+
+
+class TestCartStore:
+    """Test cases for MemoryCartStore"""
+
+    def test_cart_store_is_abstract(self):
+        """CartStore can't be used without get/edit"""
+        with pytest.raises(TypeError):
+            CartStore()
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_cart(self, store, db_session_factory, user_id, restaurant_id):
+        """Edits are served from memory and reach the DB on flush"""
+        # Given: 메모리에서 담기
+        item = await add_item(user_id, restaurant_id, options=[{"menu_option_name": "곱빼기", "price": 1000}])
+        assert await count_active_rows(db_session_factory) == (0, 0)
+
+        # When: DB 반영
+        flushed = await store.flush()
+
+        # Then
+        assert flushed == 1
+        async with db_session_factory() as session:
+            cart = await load_cart(session, UUID(user_id))
+        assert [(line.uuid, line.quantity) for line in cart.items] == [(item.uuid, 1)]
+        assert not store._states[UUID(user_id)].dirty
+
+    @pytest.mark.asyncio
+    async def test_failed_edit_leaves_state_unchanged(self, store, user_id, restaurant_id):
+        """An exception inside edit() discards the changes"""
+        # Given
+        await add_item(user_id, restaurant_id)
+        state = await store.get(UUID(user_id))
+        version = state.version
+
+        # When: 블록 안에서 수정 후 예외
+        with pytest.raises(RuntimeError):
+            async with store.edit(UUID(user_id)) as draft:
+                draft.cart.items[0].quantity = 99
+                draft.cart.items = []
+                raise RuntimeError("validation failed")
+
+        # Then: 메모리 상태 그대로
+        assert state.version == version
+        assert [item.quantity for item in state.cart.items] == [1]
+
+    @pytest.mark.asyncio
+    async def test_failed_journal_append_leaves_state_unchanged(self, store, monkeypatch, user_id, restaurant_id):
+        """A change that couldn't be journaled is not visible to readers"""
+        # Given
+        await add_item(user_id, restaurant_id)
+        state = await store.get(UUID(user_id))
+        subtotal = state.pricing.subtotal
+
+        async def failing_append(record):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(store.journal, "append", failing_append)
+
+        # When: journal 기록 실패
+        result = await try_add_cart_item(AddCartItemRequestDto(
+            user_id=user_id, restaurant_id=restaurant_id, menu_id=str(uuid4()), menu_name="된장찌개", quantity=1, price=8000,
+        ))
+
+        # Then: 오류 응답, 메모리 상태 그대로
+        assert result.error is not None
+        assert len(state.cart.items) == 1
+        assert state.pricing.subtotal == subtotal
+
+    @pytest.mark.asyncio
+    async def test_persist_carts_is_idempotent(self, store, db_session_factory, user_id, restaurant_id):
+        """Persisting the same snapshot twice (e.g. journal replay after a flush) changes nothing"""
+        # Given: 반영된 장바구니의 전체 스냅샷 (journal 복구와 같은 상태)
+        await add_item(user_id, restaurant_id, options=[{"menu_option_name": "곱빼기", "price": 1000}])
+        await add_item(user_id, restaurant_id)
+        await store.flush()
+        state = await store.get(UUID(user_id))
+        state.dirty_items = None
+        snapshot = CartSnapshot(state)
+
+        # When: 같은 스냅샷을 두 번 반영
+        for _ in range(2):
+            async with db_session_factory() as session:
+                await persist_carts(session, [snapshot])
+                await session.commit()
+
+        # Then: 행이 늘거나 지워지지 않음
+        assert await count_active_rows(db_session_factory) == (2, 1)
+        async with db_session_factory() as session:
+            cart = await load_cart(session, UUID(user_id))
+        assert cart_lines(cart) == cart_lines(snapshot.cart)
+
+    @pytest.mark.asyncio
+    async def test_recover_from_journal(self, store, db_session_factory, user_id, restaurant_id):
+        """Edits that were journaled but never flushed come back after a restart"""
+        # Given: 담기 후 DB 반영 전에 종료
+        item = await add_item(user_id, restaurant_id, quantity=3)
+        store._states.clear()
+
+        # When: journal 에서 복구
+        store._recover()
+
+        # Then: 메모리에 복구되고 다음 반영 때 DB 에 기록
+        state = await store.get(UUID(user_id))
+        assert [(line.uuid, line.quantity) for line in state.cart.items] == [(item.uuid, 3)]
+        assert state.pricing.subtotal == 27000
+        await store.flush()
+        assert await count_active_rows(db_session_factory) == (1, 0)
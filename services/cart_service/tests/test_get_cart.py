@@ -0,0 +1,85 @@
+"""
+Test cases for get cart
+"""
+
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import event
+
+from api.v1.rest.func.try_get_cart import load_cart, try_get_cart
+from model.cart import Cart, CartItem, CartItemOption
+from schemas.request.get_cart import GetCartRequestDto
+
+
+class TestGetCart:
+    """Test cases for try_get_cart"""
+
+    @pytest.mark.asyncio
+    async def test_get_cart_without_cart(self, store, user_id):
+        """A user without a cart gets cart=None"""
+        # When: 장바구니가 없는 사용자 조회
+        result = await try_get_cart(GetCartRequestDto(user_id=UUID(user_id)))
+
+        # Then: 성공, 장바구니 없음
+        assert result.error is None
+        assert result.data.cart is None
+        assert result.data.pricing is None
+
+
+class TestLoadCart:
+    """Test cases for load_cart (cart + items + options in one query)"""
+
+    @pytest.mark.asyncio
+    async def test_load_cart_folds_joined_rows(self, db_session_factory, user_id, restaurant_id):
+        """Active items come back with their active options from a single query"""
+        # Given: 활성/삭제 아이템과 옵션이 섞인 장바구니
+        cart_id = uuid4()
+        kept_id, deleted_id = uuid4(), uuid4()
+        async with db_session_factory() as session:
+            session.add(Cart(uuid=cart_id, user_id=UUID(user_id), restaurant_id=UUID(restaurant_id)))
+            session.add_all([
+                CartItem(uuid=kept_id, cart_id=cart_id, menu_id=uuid4(), menu_name="김치찌개", quantity=2, price=9000),
+                CartItem(uuid=deleted_id, cart_id=cart_id, menu_id=uuid4(), menu_name="된장찌개", quantity=1, price=8000, is_deleted=True),
+            ])
+            session.add_all([
+                CartItemOption(uuid=uuid4(), cart_item_id=kept_id, menu_option_name="곱빼기", price=1000),
+                CartItemOption(uuid=uuid4(), cart_item_id=kept_id, menu_option_name="계란", price=500, is_deleted=True),
+            ])
+            await session.commit()
+
+        # When: 조회 (실행된 쿼리 수 기록)
+        statements = []
+        engine = db_session_factory.kw["bind"].sync_engine
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            async with db_session_factory() as session:
+                cart = await load_cart(session, UUID(user_id))
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        # Then: 활성 아이템 1개 + 활성 옵션 1개, 쿼리 1번
+        assert len(statements) == 1
+        assert cart.uuid == cart_id
+        assert [item.uuid for item in cart.items] == [kept_id]
+        assert [option.menu_option_name for option in cart.items[0].options] == ["곱빼기"]
+
+    @pytest.mark.asyncio
+    async def test_load_cart_without_active_items(self, db_session_factory, user_id, restaurant_id):
+        """A cart with no active items is None unless include_empty is set"""
+        # Given: 아이템이 없는 장바구니
+        cart_id = uuid4()
+        async with db_session_factory() as session:
+            session.add(Cart(uuid=cart_id, user_id=UUID(user_id), restaurant_id=UUID(restaurant_id)))
+            await session.commit()
+
+        # When: 조회
+        async with db_session_factory() as session:
+            cart = await load_cart(session, UUID(user_id))
+            empty_cart = await load_cart(session, UUID(user_id), include_empty=True)
+
+        # Then
+        assert cart is None
+        assert empty_cart.uuid == cart_id
+        assert empty_cart.items == []
@@ -0,0 +1,216 @@
+"""
+Test cases for cart pricing (line totals, delivery fee tiers, minimum order)
+"""
+
+import random
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+import httpx
+import pytest
+
+from api.v1.rest.func.try_add_cart_item import try_add_cart_item
+from api.v1.rest.func.try_get_cart import try_get_cart
+from schemas.request.add_cart_item import AddCartItemRequestDto
+from schemas.request.get_cart import GetCartRequestDto
+from schemas.response.get_cart import CartDto, CartItemDto, CartItemOptionDto
+from utility.pricing import CartPricing, DeliveryFeeTiers, quote
+from utility.restaurant_terms import RestaurantTerms, RestaurantTermsCache, restaurant_terms
+
+NOW = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+
+def make_item(quantity: int, price: int, option_prices: list = ()) -> CartItemDto:
+    return CartItemDto(
+        uuid=uuid4(), menu_id=uuid4(), menu_name="메뉴", quantity=quantity, price=price, created_at=NOW, updated_at=NOW,
+        options=[
+            CartItemOptionDto(uuid=uuid4(), menu_option_name=f"옵션{index}", price=option_price, created_at=NOW, updated_at=NOW)
+            for index, option_price in enumerate(option_prices)
+        ] or None,
+    )
+
+
+class TestCartPricing:
+    """Test cases for CartPricing"""
+
+    def test_line_total_includes_options(self):
+        """Line total is (menu price + option prices) x quantity"""
+        pricing = CartPricing()
+        item = make_item(quantity=2, price=9000, option_prices=[1000, 500])
+
+        pricing.set_line(item)
+
+        assert item.line_total == 21000
+        assert pricing.subtotal == 21000
+
+    def test_incremental_updates_match_rebuild(self):
+        """set_line/remove_line in any order give the same subtotal as a full rebuild"""
+        rng = random.Random(20261018)
+        pricing = CartPricing()
+        items = []
+
+        for _ in range(200):
+            action = rng.random()
+            if action < 0.5 or not items:
+                # 추가
+                item = make_item(rng.randint(1, 5), rng.randrange(0, 20000, 500), [rng.randrange(0, 3000, 500) for _ in range(rng.randint(0, 3))])
+                items.append(item)
+                pricing.set_line(item)
+            elif action < 0.8:
+                # 수량/가격 변경
+                item = rng.choice(items)
+                item.quantity = rng.randint(1, 5)
+                item.price = rng.randrange(0, 20000, 500)
+                pricing.set_line(item)
+            else:
+                # 삭제
+                item = items.pop(rng.randrange(len(items)))
+                pricing.remove_line(item.uuid)
+
+            rebuilt = CartPricing()
+            rebuilt.rebuild(CartDto(uuid=uuid4(), user_id=uuid4(), restaurant_id=uuid4(), created_at=NOW, updated_at=NOW, items=items))
+            assert pricing.subtotal == rebuilt.subtotal
+            assert pricing.lines == rebuilt.lines
+
+    def test_copy_is_independent(self):
+        """Changes to a copy don't touch the original"""
+        pricing = CartPricing()
+        item = make_item(quantity=1, price=5000)
+        pricing.set_line(item)
+
+        copied = pricing.copy()
+        copied.remove_line(item.uuid)
+
+        assert pricing.subtotal == 5000
+        assert copied.subtotal == 0
+
+
+class TestDeliveryFeeTiers:
+    """Test cases for DeliveryFeeTiers"""
+
+    @pytest.mark.parametrize("subtotal, expected_fee", [
+        (0, 3000),
+        (29999, 3000),
+        (30000, 1500),
+        (49999, 1500),
+        (50000, 0),
+        (100000, 0),
+    ])
+    def test_fee_at_tier_boundaries(self, subtotal, expected_fee):
+        """Each tier starts at its threshold (inclusive)"""
+        tiers = DeliveryFeeTiers([(50000, 0), (0, 1.0), (30000, 0.5)])
+
+        assert tiers.fee(3000, subtotal) == expected_fee
+
+    def test_below_first_tier_pays_full_fee(self):
+        """Subtotals below the first configured threshold pay the restaurant fee"""
+        tiers = DeliveryFeeTiers([(20000, 0)])
+
+        assert tiers.fee(3000, 19999) == 3000
+        assert tiers.fee(3000, 20000) == 0
+
+    def test_no_tiers(self):
+        """Without tiers the restaurant fee is used as is"""
+        assert DeliveryFeeTiers([]).fee(2500, 10000) == 2500
+
+
+class TestQuote:
+    """Test cases for quote"""
+
+    def test_min_order_shortfall(self):
+        """Below the minimum order the cart is not orderable"""
+        pricing = quote(12000, RestaurantTerms(min_order_amount=15000, delivery_fee=3000))
+
+        assert pricing.min_order_shortfall == 3000
+        assert pricing.orderable is False
+        assert pricing.total == 15000
+
+    def test_min_order_reached(self):
+        """At the minimum order the cart is orderable"""
+        pricing = quote(15000, RestaurantTerms(min_order_amount=15000, delivery_fee=3000))
+
+        assert pricing.min_order_shortfall == 0
+        assert pricing.orderable is True
+
+    def test_without_restaurant_terms(self):
+        """Without restaurant terms only the subtotal is known"""
+        pricing = quote(12000, None)
+
+        assert pricing.subtotal == 12000
+        assert pricing.delivery_fee is None
+        assert pricing.orderable is None
+
+
+class TestGetCartPricing:
+    """Test cases for pricing in the get cart response"""
+
+    @pytest.mark.asyncio
+    async def test_get_cart_includes_pricing(self, store, monkeypatch, user_id, restaurant_id):
+        """Subtotal comes from the store, fee and minimum order from the restaurant terms"""
+        # Given: 매장 조건 캐시 + 장바구니
+        monkeypatch.setattr(restaurant_terms, "_entries", {})
+        monkeypatch.setattr("utility.pricing.delivery_fee_tiers", DeliveryFeeTiers([]))
+        restaurant_terms.put(UUID(restaurant_id), RestaurantTerms(min_order_amount=20000, delivery_fee=3000))
+        result = await try_add_cart_item(AddCartItemRequestDto(
+            user_id=user_id, restaurant_id=restaurant_id, menu_id=str(uuid4()), menu_name="김치찌개", quantity=2, price=9000,
+            options=[{"menu_option_name": "곱빼기", "price": 1000}],
+        ))
+        assert result.error is None
+
+        # When
+        result = await try_get_cart(GetCartRequestDto(user_id=UUID(user_id)))
+
+        # Then
+        assert result.error is None
+        assert result.data.cart.items[0].line_total == 20000
+        assert result.data.pricing.subtotal == 20000
+        assert result.data.pricing.delivery_fee == 3000
+        assert result.data.pricing.total == 23000
+        assert result.data.pricing.orderable is True
+
+
+def terms_cache(body, status_code: int = 200) -> RestaurantTermsCache:
+    """restaurant-service 대신 `body` 를 돌려주는 캐시 (ttl=0: 매번 다시 조회)"""
+    def handler(request: httpx.Request):
+        if isinstance(body, str):
+            return httpx.Response(status_code, text=body)
+        return httpx.Response(status_code, json=body)
+
+    cache = RestaurantTermsCache(base_url="http://restaurant-service", ttl=0)
+    cache._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return cache
+
+
+class TestRestaurantTermsCache:
+    """Test cases for RestaurantTermsCache"""
+
+    @pytest.mark.asyncio
+    async def test_terms_from_restaurant_detail(self):
+        cache = terms_cache({"data": {"restaurant": {"min_order_amount": 15000, "delivery_fee": "2500"}}, "error": None})
+
+        assert await cache.get(uuid4()) == RestaurantTerms(min_order_amount=15000, delivery_fee=2500)
+        await cache.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("body", [
+        "not json",
+        [],
+        {"data": []},
+        {"data": {"restaurant": None}},
+        {"data": {"restaurant": "r1"}},
+        {"data": {"restaurant": {"min_order_amount": {"value": 1}}}},
+        {"data": {"restaurant": {"delivery_fee": "free"}}},
+        {"data": {"restaurant": {"delivery_fee": -100}}},
+        {"data": None, "error": "restaurant not found"},
+    ])
+    async def test_malformed_body_falls_back(self, body):
+        """A malformed body falls back to the stale snapshot (or none) instead of raising"""
+        restaurant_id = uuid4()
+        cache = terms_cache(body)
+
+        assert await cache.get(restaurant_id) is None
+
+        stale = RestaurantTerms(min_order_amount=10000, delivery_fee=3000)
+        cache.put(restaurant_id, stale)
+        assert await cache.get(restaurant_id) == stale
+        await cache.close()
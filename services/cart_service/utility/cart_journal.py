@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+장바구니 변경 journal (write-ahead)
+
+hot cart store 가 DB 에 아직 반영하지 않은 변경을 잃지 않기 위한 append-only 파일입니다.
+- 변경마다 해당 장바구니의 전체 스냅샷을 JSON 한 줄로 기록하고, 응답 전에 fsync 합니다.
+  동시에 들어온 기록들은 fsync 한 번으로 함께 내려갑니다 (group commit).
+- 재시작 시 replay() 로 사용자별 마지막 스냅샷을 읽어 다시 DB 반영 대상으로 올립니다.
+  (스냅샷 단위라 같은 기록을 여러 번 반영해도 결과가 같음)
+- DB 반영 후 rewrite() 로 아직 반영되지 않은 장바구니만 남기고 파일을 교체합니다.
+  교체는 진행 중인 append(와 fsync)가 끝난 뒤 시작하고, 교체 중 append 는 끝날 때까지 기다립니다.
+  파일 작업과 fsync 는 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+
+크래시로 마지막 줄이 잘린 경우 그 줄은 건너뜁니다.
+"""
+
+import asyncio
+import json
+import os
+from typing import Callable, Dict, Iterable, Optional
+
+from utility.logger import logger
+
+
+class CartJournal:
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._file = None
+        self._sync: Optional[asyncio.Future] = None
+        # 진행 중인 append/fsync 수 (rewrite 는 0 이 될 때까지 기다림)
+        self._pending = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        # 교체 중에는 set 되지 않은 Event (append 가 기다림)
+        self._rewriting: Optional[asyncio.Event] = None
+        self._rewrite_lock = asyncio.Lock()
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    async def append(self, record: dict):
+        """기록 한 줄 추가. fsync 설정 시 디스크에 내려간 뒤 반환"""
+        while self._rewriting is not None:
+            await self._rewriting.wait()
+        self._begin()
+        try:
+            self._file.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+            self._file.flush()
+            if not self.fsync:
+                return
+            if self._sync is None:
+                # 다음 루프 차례에 시작: 그 전에 쓰인 기록들이 같은 fsync 에 포함됨
+                self._begin()
+                self._sync = asyncio.ensure_future(self._fsync(self._file))
+            await asyncio.shield(self._sync)
+        finally:
+            self._end()
+
+    async def _fsync(self, file):
+        # 시작 이후에 쓰인 기록은 다음 fsync 에서 처리
+        self._sync = None
+        try:
+            await asyncio.to_thread(os.fsync, file.fileno())
+        finally:
+            # append 가 취소돼도 rewrite 는 이 fsync 가 끝난 뒤 파일을 교체
+            self._end()
+
+    def _begin(self):
+        self._pending += 1
+        self._drained.clear()
+
+    def _end(self):
+        self._pending -= 1
+        if self._pending == 0:
+            self._drained.set()
+
+    def replay(self) -> Dict[str, dict]:
+        """사용자별 마지막 스냅샷"""
+        records = {}
+        try:
+            with open(self.path, encoding="utf-8") as journal:
+                for number, line in enumerate(journal, 1):
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"[CART_JOURNAL] Skipping unreadable line {number} of {self.path}")
+                        continue
+                    records[record["user_id"]] = record
+        except FileNotFoundError:
+            pass
+        return records
+
+    async def rewrite(self, records: Callable[[], Iterable[dict]]):
+        """
+        파일을 records() 만 담은 새 파일로 교체 (DB 반영이 끝난 기록 정리)
+
+        진행 중인 append 와 fsync 가 모두 끝난 뒤 records() 를 호출하므로, 기록을 마친 수정은
+        이미 장바구니 상태에 반영돼 새 파일에 포함됩니다. 교체가 끝날 때까지 새 append 는 기다립니다.
+        새 파일을 fsync 한 뒤 rename 하므로 어느 시점에 죽어도 이전 파일이나 새 파일 중 하나가 온전히 남습니다.
+        """
+        async with self._rewrite_lock:
+            self._rewriting = asyncio.Event()
+            try:
+                await self._drained.wait()
+                lines = [json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n" for record in records()]
+                await asyncio.to_thread(self._replace, lines)
+            finally:
+                self._rewriting.set()
+                self._rewriting = None
+
+    def _replace(self, lines: Iterable[str]):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as temp:
+            temp.writelines(lines)
+            temp.flush()
+            os.fsync(temp.fileno())
+        os.replace(temp_path, self.path)
+        self._fsync_directory()
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def _fsync_directory(self):
+        try:
+            directory = os.open(os.path.dirname(self.path) or ".", os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+장바구니 라인 식별 키
+
+같은 메뉴 + 같은 옵션 구성은 같은 라인입니다. 다시 담으면 새 행을 만들지 않고 수량을 더합니다.
+키: sha256("{menu_id}|{옵션1}|{옵션2}...") 의 hex, 옵션은 "{menu_option_id}:{menu_option_name}" 을 정렬
+(옵션 순서와 무관). migrations/003 의 backfill SQL 과 같은 규칙이어야 합니다.
+"""
+
+import hashlib
+from typing import Iterable, Optional
+from uuid import UUID
+
+
+def line_key(menu_id: UUID, options: Optional[Iterable]) -> str:
+    """options: menu_option_name (와 menu_option_id) 를 가진 옵션 DTO 목록"""
+    parts = sorted(
+        f"{getattr(option, 'menu_option_id', None) or ''}:{option.menu_option_name or ''}"
+        for option in options or []
+    )
+    canonical = "|".join([str(menu_id), *parts]) if parts else f"{menu_id}|"
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,465 @@
+# -*- coding: utf-8 -*-
+"""
+Hot cart store
+
+주문 중인 사용자의 장바구니를 user_id 별로 메모리에 두고, 조회와 수정은 메모리에서 처리합니다.
+변경은 journal 에 먼저 기록(fsync)한 뒤 응답하고, 백그라운드 작업이 모아서 DB 에 반영합니다 (write-behind).
+
+- 조회: 메모리에 없으면 DB 에서 한 번 읽어 올림 (load_cart, 왕복 1회)
+- 수정: edit() 안에서 사본을 바꾸고, journal 기록이 끝나면 사본으로 교체 + dirty 표시
+  (장바구니별 lock 으로 같은 사용자의 동시 수정은 순서대로 처리)
+- 반영: CART_FLUSH_INTERVAL 마다 dirty 장바구니를 CART_FLUSH_BATCH_SIZE 개씩 한 트랜잭션으로 반영.
+  스냅샷과 DB 의 활성 행을 비교해 필요한 INSERT / UPDATE / soft delete 만 실행합니다.
+  실패하면 dirty 로 남겨 다음 주기에 다시 시도합니다.
+- 가격: 장바구니마다 CartPricing 을 두고 수정된 라인만 다시 계산 (utility/pricing.py)
+- 제거: CART_STORE_IDLE_SECONDS 동안 사용되지 않았거나 CART_STORE_MAX_CARTS 를 넘은 장바구니 중
+  DB 반영이 끝난 것부터 (오래 안 쓰인 순) 메모리에서 제거
+- 복구: 시작 시 journal 의 사용자별 마지막 스냅샷을 dirty 상태로 다시 올림
+
+저장소는 프로세스 안에 있으므로 cart-service 는 프로세스 1개(워커 1개, 레플리카 1개)로 실행해야 합니다.
+시작 시 PostgreSQL advisory lock 으로 소유권을 잡아 두 번째 프로세스는 시작하지 않고,
+gateway 도 cart-service 레플리카를 1개만 허용합니다 (SINGLE_INSTANCE_SERVICES).
+여러 프로세스가 공유해야 하면 CartStore 를 구현한 공유 저장소(예: Redis)로 교체합니다.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import (
+    CART_STORE_MAX_CARTS,
+    CART_STORE_IDLE_SECONDS,
+    CART_FLUSH_INTERVAL,
+    CART_FLUSH_BATCH_SIZE,
+    CART_JOURNAL_PATH,
+    CART_JOURNAL_FSYNC,
+)
+from model.cart import Cart, CartItem, CartItemOption
+from schemas.response.get_cart import CartDto, CartItemDto
+from utility.cart_journal import CartJournal
+from utility.cart_line import line_key
+from utility.db import AsyncSessionLocal, async_engine
+from utility.logger import logger
+from utility.pricing import CartPricing
+
+
+# 저장소 소유권 advisory lock key ("cart")
+OWNER_LOCK_KEY = 0x63617274
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class CartState:
+    """한 사용자의 장바구니 상태"""
+
+    __slots__ = ("user_id", "cart", "pricing", "cleared_cart_ids", "dirty_items", "dirty", "version", "loaded", "lock", "last_access")
+
+    def __init__(self, user_id: UUID):
+        self.user_id = user_id
+        # 활성 장바구니 (아이템이 없을 수 있음). 없으면 None
+        self.cart: Optional[CartDto] = None
+        self.pricing = CartPricing()
+        # 비웠지만 아직 DB 에 반영되지 않은 장바구니
+        self.cleared_cart_ids: List[UUID] = []
+        # 값이 바뀐 아이템 (None: 전체 - journal 복구 시)
+        self.dirty_items: Optional[Set[UUID]] = set()
+        self.dirty = False
+        self.version = 0
+        self.loaded = False
+        self.lock = asyncio.Lock()
+        self.last_access = time.monotonic()
+
+    @property
+    def active_cart(self) -> Optional[CartDto]:
+        """API 에 보이는 장바구니 (활성 아이템이 없으면 None)"""
+        return self.cart if self.cart is not None and self.cart.items else None
+
+    def touch_items(self, items: Iterable[CartItemDto]):
+        """추가/수정된 아이템: DB 반영 대상으로 표시하고 라인 금액 재계산"""
+        for item in items:
+            if self.dirty_items is not None:
+                self.dirty_items.add(item.uuid)
+            self.pricing.set_line(item)
+
+    def draft(self) -> "CartState":
+        """수정용 사본 (edit() 가 journal 기록 후 commit 으로 반영)"""
+        draft = CartState(self.user_id)
+        draft.cart = self.cart.model_copy(deep=True) if self.cart is not None else None
+        draft.pricing = self.pricing.copy()
+        draft.cleared_cart_ids = list(self.cleared_cart_ids)
+        draft.dirty_items = set(self.dirty_items) if self.dirty_items is not None else None
+        draft.loaded = True
+        return draft
+
+    def commit(self, draft: "CartState"):
+        """사본을 통째로 교체 (조회 쪽은 항상 journal 에 기록된 상태만 봄)"""
+        self.cart = draft.cart
+        self.pricing = draft.pricing
+        self.cleared_cart_ids = draft.cleared_cart_ids
+        self.dirty_items = draft.dirty_items
+        self.version += 1
+        self.dirty = True
+
+    def to_record(self) -> dict:
+        return {
+            "user_id": str(self.user_id),
+            "cart": self.cart.model_dump(mode="json") if self.cart is not None else None,
+            "cleared_cart_ids": [str(cart_id) for cart_id in self.cleared_cart_ids],
+        }
+
+
+class CartSnapshot:
+    """DB 반영용 사본 (반영 중에도 원본은 계속 수정될 수 있음)"""
+
+    __slots__ = ("state", "version", "cart", "cleared_cart_ids", "dirty_items")
+
+    def __init__(self, state: CartState):
+        self.state = state
+        self.version = state.version
+        self.cart = state.cart.model_copy(deep=True) if state.cart is not None else None
+        self.cleared_cart_ids = list(state.cleared_cart_ids)
+        self.dirty_items = set(state.dirty_items) if state.dirty_items is not None else None
+
+
+class CartStore(ABC):
+    """
+    hot cart store 인터페이스
+
+    get(): 조회용 (반환값을 수정하지 말 것), edit(): 수정용 async context manager (사본을 수정).
+    """
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def get(self, user_id: UUID) -> CartState:
+        ...
+
+    @abstractmethod
+    def edit(self, user_id: UUID):
+        ...
+
+
+class MemoryCartStore(CartStore):
+    def __init__(
+        self,
+        journal: CartJournal,
+        max_carts: int = CART_STORE_MAX_CARTS,
+        idle_seconds: float = CART_STORE_IDLE_SECONDS,
+        flush_interval: float = CART_FLUSH_INTERVAL,
+        flush_batch_size: int = CART_FLUSH_BATCH_SIZE,
+    ):
+        self.journal = journal
+        self.max_carts = max_carts
+        self.idle_seconds = idle_seconds
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        # 최근 사용 순 (LRU)
+        self._states: "OrderedDict[UUID, CartState]" = OrderedDict()
+        self._flush_task: Optional[asyncio.Task] = None
+        # 반영 요청 (용량 초과 등으로 주기보다 먼저)
+        self._wakeup = asyncio.Event()
+        # 저장소 소유권 (advisory lock 을 잡고 있는 연결)
+        self._owner_connection = None
+
+    async def start(self):
+        await self._acquire_ownership()
+        self.journal.open()
+        self._recover()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """반영 작업을 멈추고 남은 변경을 모두 DB 에 반영"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            while await self.flush():
+                pass
+        except Exception as e:
+            # journal 에 남아 있으므로 다음 시작 시 복구
+            logger.error(f"[CART_STORE] Final flush failed, changes kept in journal: {e}")
+        self.journal.close()
+        await self._release_ownership()
+
+    async def get(self, user_id: UUID) -> CartState:
+        state = self._state(user_id)
+        if not state.loaded:
+            async with state.lock:
+                await self._load(state)
+        return state
+
+    @asynccontextmanager
+    async def edit(self, user_id: UUID) -> AsyncIterator[CartState]:
+        """
+        장바구니 수정
+
+        블록에는 사본(draft)이 전달됩니다. 블록이 예외 없이 끝나고 journal 기록(fsync)까지
+        성공해야 사본으로 교체하고 dirty 로 표시합니다. 블록이나 journal 기록이 실패하면
+        사본은 버려지고 메모리 상태는 그대로입니다.
+        """
+        state = self._state(user_id)
+        async with state.lock:
+            await self._load(state)
+            draft = state.draft()
+            yield draft
+            await self.journal.append(draft.to_record())
+            state.commit(draft)
+        if len(self._states) > self.max_carts:
+            self._wakeup.set()
+
+    async def _acquire_ownership(self):
+        """
+        저장소 소유권: 같은 DB 를 쓰는 cart-service 는 한 프로세스만 시작
+
+        메모리 장바구니를 가진 프로세스가 둘이면 서로의 라인을 soft delete 하므로,
+        PostgreSQL session advisory lock 을 종료 시까지 잡고 두 번째 프로세스는 시작을 거부합니다.
+        프로세스가 죽으면 연결과 함께 lock 도 풀립니다.
+        """
+        if async_engine.dialect.name != "postgresql":
+            return
+        connection = await async_engine.connect()
+        try:
+            owned = await connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": OWNER_LOCK_KEY})
+            # lock 은 session 단위: 트랜잭션을 열어 둔 채로 두지 않음
+            await connection.commit()
+        except Exception:
+            await connection.close()
+            raise
+        if not owned:
+            await connection.close()
+            raise RuntimeError("다른 cart-service 프로세스가 장바구니 저장소를 사용 중입니다 (레플리카/워커는 1개만 허용)")
+        self._owner_connection = connection
+
+    async def _release_ownership(self):
+        if self._owner_connection is None:
+            return
+        try:
+            await self._owner_connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": OWNER_LOCK_KEY})
+            await self._owner_connection.commit()
+        finally:
+            await self._owner_connection.close()
+            self._owner_connection = None
+
+    def _state(self, user_id: UUID) -> CartState:
+        state = self._states.get(user_id)
+        if state is None:
+            state = self._states[user_id] = CartState(user_id)
+        else:
+            self._states.move_to_end(user_id)
+        state.last_access = time.monotonic()
+        return state
+
+    async def _load(self, state: CartState):
+        if state.loaded:
+            return
+        # 순환 import 방지 (try_get_cart 가 이 모듈을 사용)
+        from api.v1.rest.func.try_get_cart import load_cart
+
+        async with AsyncSessionLocal() as session:
+            state.cart = await load_cart(session, state.user_id, include_empty=True)
+        state.pricing.rebuild(state.cart)
+        state.loaded = True
+
+    def _recover(self):
+        for record in self.journal.replay().values():
+            state = self._state(UUID(record["user_id"]))
+            state.cart = CartDto.model_validate(record["cart"]) if record["cart"] is not None else None
+            state.cleared_cart_ids = [UUID(cart_id) for cart_id in record["cleared_cart_ids"]]
+            state.pricing.rebuild(state.cart)
+            state.dirty_items = None
+            state.dirty = True
+            state.loaded = True
+        if self._states:
+            logger.info(f"[CART_STORE] Recovered {len(self._states)} carts from journal")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while await self.flush():
+                    pass
+                self._evict()
+            except Exception as e:
+                logger.error(f"[CART_STORE] Flush failed, retrying in {self.flush_interval}s: {e}")
+
+    async def flush(self) -> int:
+        """dirty 장바구니 최대 flush_batch_size 개를 한 트랜잭션으로 반영. 반영한 개수를 반환"""
+        snapshots = [CartSnapshot(state) for state in self._states.values() if state.dirty][: self.flush_batch_size]
+        if not snapshots:
+            return 0
+
+        async with AsyncSessionLocal() as session:
+            await persist_carts(session, snapshots)
+            await session.commit()
+
+        for snapshot in snapshots:
+            state = snapshot.state
+            state.cleared_cart_ids = [cart_id for cart_id in state.cleared_cart_ids if cart_id not in snapshot.cleared_cart_ids]
+            if state.version == snapshot.version:
+                state.dirty = False
+                state.dirty_items = set()
+        # 반영이 끝난 기록 정리: 아직 dirty 인 장바구니의 현재 스냅샷만 남김
+        # (진행 중인 수정이 journal 기록을 마치고 상태에 반영된 뒤 계산)
+        await self.journal.rewrite(lambda: [state.to_record() for state in self._states.values() if state.dirty])
+        return len(snapshots)
+
+    def _evict(self):
+        now = time.monotonic()
+        for user_id, state in list(self._states.items()):
+            if len(self._states) <= self.max_carts and now - state.last_access < self.idle_seconds:
+                # 이후는 더 최근에 사용된 장바구니
+                break
+            if not state.dirty and not state.lock.locked():
+                del self._states[user_id]
+
+
+async def persist_carts(session: AsyncSession, snapshots: List[CartSnapshot]):
+    """
+    스냅샷을 cart_service.cart* 테이블에 반영 (같은 스냅샷을 다시 반영해도 결과가 같음)
+
+    스냅샷에 없는 DB 활성 아이템/옵션은 soft delete, DB 에 없는 것은 INSERT,
+    바뀐 아이템(dirty_items)은 UPDATE. 조회 3번 + 종류별 쓰기 한 번씩.
+    같은 장바구니에서 활성 라인의 line_key 는 유일합니다 (migrations/003 의 unique index).
+    """
+    now = utcnow()
+
+    cleared = [cart_id for snapshot in snapshots for cart_id in snapshot.cleared_cart_ids]
+    if cleared:
+        cleared_items = select(CartItem.uuid).where(CartItem.cart_id.in_(cleared))
+        await session.execute(
+            update(CartItemOption)
+            .where(CartItemOption.cart_item_id.in_(cleared_items), CartItemOption.is_deleted == False)
+            .values(is_deleted=True, updated_at=now)
+        )
+        await session.execute(
+            update(CartItem)
+            .where(CartItem.cart_id.in_(cleared), CartItem.is_deleted == False)
+            .values(is_deleted=True, updated_at=now)
+        )
+        await session.execute(
+            update(Cart)
+            .where(Cart.uuid.in_(cleared), Cart.is_deleted == False)
+            .values(is_deleted=True, updated_at=now)
+        )
+
+    snapshots = [snapshot for snapshot in snapshots if snapshot.cart is not None]
+    if not snapshots:
+        return
+    cart_ids = [snapshot.cart.uuid for snapshot in snapshots]
+
+    # DB 의 현재 활성 행
+    existing_carts = set((await session.scalars(select(Cart.uuid).where(Cart.uuid.in_(cart_ids)))).all())
+    existing_items = set((await session.scalars(
+        select(CartItem.uuid).where(CartItem.cart_id.in_(cart_ids), CartItem.is_deleted == False)
+    )).all())
+    # option uuid -> cart_item_id
+    existing_options = dict((await session.execute(
+        select(CartItemOption.uuid, CartItemOption.cart_item_id).where(
+            CartItemOption.cart_item_id.in_(existing_items), CartItemOption.is_deleted == False
+        )
+    )).all()) if existing_items else {}
+
+    cart_inserts, cart_updates = [], []
+    item_inserts, item_updates, option_inserts = [], [], []
+    live_items, live_options = set(), set()
+    for snapshot in snapshots:
+        cart = snapshot.cart
+        cart_row = {"uuid": cart.uuid, "restaurant_id": cart.restaurant_id, "updated_at": cart.updated_at}
+        if cart.uuid in existing_carts:
+            cart_updates.append(cart_row)
+        else:
+            cart_inserts.append({**cart_row, "user_id": cart.user_id, "created_at": cart.created_at, "is_deleted": False})
+
+        for item in cart.items or []:
+            live_items.add(item.uuid)
+            item_row = {
+                "uuid": item.uuid,
+                "menu_name": item.menu_name,
+                "menu_description": item.menu_description,
+                "menu_image_url": item.menu_image_url,
+                "quantity": item.quantity,
+                "price": item.price,
+                "line_key": line_key(item.menu_id, item.options),
+                "updated_at": item.updated_at,
+            }
+            if item.uuid not in existing_items:
+                item_inserts.append({
+                    **item_row, "cart_id": cart.uuid, "menu_id": item.menu_id,
+                    "created_at": item.created_at, "is_deleted": False,
+                })
+            elif snapshot.dirty_items is None or item.uuid in snapshot.dirty_items:
+                item_updates.append(item_row)
+
+            for option in item.options or []:
+                live_options.add(option.uuid)
+                if option.uuid not in existing_options:
+                    option_inserts.append({
+                        "uuid": option.uuid,
+                        "cart_item_id": item.uuid,
+                        "menu_option_id": option.menu_option_id,
+                        "menu_option_name": option.menu_option_name,
+                        "price": option.price,
+                        "created_at": option.created_at,
+                        "updated_at": option.updated_at,
+                        "is_deleted": False,
+                    })
+
+    removed_items = existing_items - live_items
+    # 삭제된 아이템의 옵션은 아이템과 함께 처리
+    removed_options = [
+        option_id for option_id, item_id in existing_options.items()
+        if option_id not in live_options and item_id not in removed_items
+    ]
+    if removed_items:
+        # 삭제된 아이템의 옵션도 함께
+        await session.execute(
+            update(CartItemOption)
+            .where(CartItemOption.cart_item_id.in_(removed_items), CartItemOption.is_deleted == False)
+            .values(is_deleted=True, updated_at=now)
+        )
+        await session.execute(update(CartItem).where(CartItem.uuid.in_(removed_items)).values(is_deleted=True, updated_at=now))
+    if removed_options:
+        await session.execute(update(CartItemOption).where(CartItemOption.uuid.in_(removed_options)).values(is_deleted=True, updated_at=now))
+
+    # 부모부터 INSERT (FK)
+    if cart_inserts:
+        await session.execute(insert(Cart), cart_inserts)
+    if cart_updates:
+        await session.execute(update(Cart), cart_updates)
+    if item_updates:
+        # 라인끼리 옵션 구성이 바뀌어도 unique index 에 걸리지 않도록 키를 비운 뒤 UPDATE
+        await session.execute(
+            update(CartItem)
+            .where(CartItem.uuid.in_([row["uuid"] for row in item_updates]))
+            .values(line_key=None)
+        )
+        await session.execute(update(CartItem), item_updates)
+    if item_inserts:
+        await session.execute(insert(CartItem), item_inserts)
+    if option_inserts:
+        await session.execute(insert(CartItemOption), option_inserts)
+
+
+cart_store = MemoryCartStore(CartJournal(CART_JOURNAL_PATH, fsync=CART_JOURNAL_FSYNC))
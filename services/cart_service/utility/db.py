@@ -1,12 +1,38 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from config import SQLALCHEMY_DATABASE_URL
+from config import (
+    SQLALCHEMY_DATABASE_URL,
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+)
+from utility.tracing import instrument_engine
 
+# 동기 엔진: 시작 시 스키마 생성 / 마이그레이션용
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# 쿼리마다 DB span 기록
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 비동기 엔진: API 핸들러용 (쿼리 대기 중에도 이벤트 루프가 다른 요청을 처리)
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    # 끊어진 커넥션(DB 재시작, idle timeout)을 빌려주기 전에 확인
+    pool_pre_ping=True,
+)
+instrument_engine(async_engine.sync_engine)
+# commit 후에도 객체 속성을 읽을 수 있도록 만료시키지 않음 (비동기에선 lazy load 불가)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 # 스키마 생성
@@ -23,6 +49,11 @@ try:
                 ALTER TABLE cart_service.cart_item_option 
                 ALTER COLUMN menu_option_id DROP NOT NULL;
             """))
+            # 장바구니 라인 식별 키 (backfill / unique index 는 migrations/003)
+            conn.execute(text("""
+                ALTER TABLE cart_service.cart_item
+                ADD COLUMN IF NOT EXISTS line_key VARCHAR(64);
+            """))
             conn.commit()
         except Exception as _:
             # ignore migration issues to avoid startup failure
@@ -38,3 +69,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
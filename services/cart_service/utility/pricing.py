@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+장바구니 가격 계산
+
+- 라인 금액: (메뉴 가격 + 옵션 가격 합) x 수량
+- 상품 금액(subtotal): 라인 금액 합
+- 배달팁: 매장 배달팁 x 주문금액 구간 비율 (DELIVERY_FEE_TIERS)
+- 최소주문금액 부족분: max(0, 매장 최소주문금액 - 상품 금액)
+
+CartPricing 은 장바구니 상태와 함께 보관되며, 수정된 라인만 다시 계산해
+subtotal 을 증감합니다 (전체 재계산은 장바구니를 처음 올릴 때 한 번).
+"""
+
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from config import DELIVERY_FEE_TIERS
+from schemas.response.get_cart import CartDto, CartItemDto, CartPricingDto
+from utility.restaurant_terms import RestaurantTerms
+
+
+def line_total(item: CartItemDto) -> int:
+    unit_price = item.price + sum(option.price for option in item.options or [])
+    return unit_price * item.quantity
+
+
+class CartPricing:
+    """장바구니 라인 금액과 subtotal (라인 단위로 갱신)"""
+
+    __slots__ = ("lines", "subtotal")
+
+    def __init__(self):
+        self.lines: Dict[UUID, int] = {}
+        self.subtotal = 0
+
+    def rebuild(self, cart: Optional[CartDto]):
+        self.clear()
+        for item in (cart.items if cart else None) or []:
+            self.set_line(item)
+
+    def set_line(self, item: CartItemDto):
+        """추가/수정된 라인 반영 (item.line_total 도 갱신)"""
+        total = line_total(item)
+        self.subtotal += total - self.lines.get(item.uuid, 0)
+        self.lines[item.uuid] = total
+        item.line_total = total
+
+    def remove_line(self, item_id: UUID):
+        self.subtotal -= self.lines.pop(item_id, 0)
+
+    def clear(self):
+        self.lines.clear()
+        self.subtotal = 0
+
+    def copy(self) -> "CartPricing":
+        pricing = CartPricing()
+        pricing.lines = dict(self.lines)
+        pricing.subtotal = self.subtotal
+        return pricing
+
+
+class DeliveryFeeTiers:
+    """주문금액 구간별 배달팁 비율 (구간 경계는 이분 탐색)"""
+
+    def __init__(self, tiers: Iterable[Tuple[int, float]]):
+        ordered = sorted(tiers)
+        if not ordered or ordered[0][0] > 0:
+            # 첫 구간 아래는 매장 배달팁 그대로
+            ordered.insert(0, (0, 1.0))
+        self._thresholds: List[int] = [threshold for threshold, _ in ordered]
+        self._ratios: List[float] = [ratio for _, ratio in ordered]
+
+    def fee(self, base_fee: int, subtotal: int) -> int:
+        ratio = self._ratios[max(0, bisect_right(self._thresholds, subtotal) - 1)]
+        return int(round(base_fee * ratio))
+
+
+delivery_fee_tiers = DeliveryFeeTiers(DELIVERY_FEE_TIERS)
+
+
+def quote(subtotal: int, terms: Optional[RestaurantTerms]) -> CartPricingDto:
+    """
+    장바구니 금액 요약
+
+    매장 정보를 가져오지 못한 경우(terms=None) 배달팁/최소주문금액 관련 값은 None 입니다.
+    """
+    if terms is None:
+        return CartPricingDto(subtotal=subtotal)
+
+    delivery_fee = delivery_fee_tiers.fee(terms.delivery_fee, subtotal)
+    shortfall = max(0, terms.min_order_amount - subtotal)
+    return CartPricingDto(
+        subtotal=subtotal,
+        delivery_fee=delivery_fee,
+        min_order_amount=terms.min_order_amount,
+        min_order_shortfall=shortfall,
+        total=subtotal + delivery_fee,
+        orderable=subtotal > 0 and shortfall == 0,
+    )
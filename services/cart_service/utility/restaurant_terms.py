@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+매장 주문 조건(최소주문금액, 배달팁) 스냅샷 캐시
+
+restaurant-service 의 매장 상세 조회 결과를 RESTAURANT_TERMS_TTL 동안 재사용합니다.
+- 같은 매장을 동시에 조회하면 요청 한 번만 보냄
+- 만료 후 조회에 실패하면 만료된 스냅샷을 계속 사용 (restaurant-service 장애가 장바구니 조회를 막지 않음)
+- 스냅샷이 없고 조회에도 실패하면 None
+"""
+
+import asyncio
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+import httpx
+
+from config import RESTAURANT_SERVICE_URL, RESTAURANT_SERVICE_TIMEOUT, RESTAURANT_TERMS_TTL
+from utility.logger import logger
+from utility.tracing import outbound_span
+
+
+class RestaurantTerms(NamedTuple):
+    min_order_amount: int
+    delivery_fee: int
+
+
+class RestaurantTermsCache:
+    def __init__(self, base_url: str = RESTAURANT_SERVICE_URL, ttl: float = RESTAURANT_TERMS_TTL, timeout: float = RESTAURANT_SERVICE_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.timeout = timeout
+        # restaurant_id -> (스냅샷, 조회 시각)
+        self._entries: Dict[UUID, Tuple[RestaurantTerms, float]] = {}
+        self._pending: Dict[UUID, asyncio.Future] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def get(self, restaurant_id: UUID) -> Optional[RestaurantTerms]:
+        entry = self._entries.get(restaurant_id)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            return entry[0]
+
+        pending = self._pending.get(restaurant_id)
+        if pending is None:
+            pending = self._pending[restaurant_id] = asyncio.ensure_future(self._refresh(restaurant_id))
+            pending.add_done_callback(lambda _: self._pending.pop(restaurant_id, None))
+        return await asyncio.shield(pending)
+
+    def put(self, restaurant_id: UUID, terms: RestaurantTerms):
+        self._entries[restaurant_id] = (terms, time.monotonic())
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _refresh(self, restaurant_id: UUID) -> Optional[RestaurantTerms]:
+        try:
+            terms = await self._fetch(restaurant_id)
+        except (httpx.HTTPError, ValueError, KeyError, TypeError, AttributeError) as e:
+            entry = self._entries.get(restaurant_id)
+            logger.warning(f"[RESTAURANT_TERMS] Fetch failed for {restaurant_id} ({'using stale snapshot' if entry else 'no snapshot'}): {e}")
+            return entry[0] if entry else None
+        self.put(restaurant_id, terms)
+        return terms
+
+    async def _fetch(self, restaurant_id: UUID) -> RestaurantTerms:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        url = f"{self.base_url}/restaurants/{restaurant_id}"
+        with outbound_span("GET restaurant-service", url=url) as headers:
+            response = await self._client.get(url, headers=headers)
+        response.raise_for_status()
+        return _parse_terms(response.json())
+
+
+def _parse_terms(body) -> RestaurantTerms:
+    """
+    restaurant-service 매장 상세 응답({"data": {"restaurant": {...}}, "error": ...})에서 주문 조건 추출
+
+    형식이 다르면 ValueError (호출 쪽에서 이전 스냅샷 / None 으로 대체)
+    """
+    if not isinstance(body, dict):
+        raise ValueError(f"응답 형식 오류: {type(body).__name__}")
+    error = body.get("error")
+    if error:
+        raise ValueError(error.get("message") if isinstance(error, dict) else str(error))
+    data = body.get("data")
+    restaurant = data.get("restaurant") if isinstance(data, dict) else None
+    if not isinstance(restaurant, dict):
+        raise ValueError("응답에 매장 정보가 없습니다")
+    return RestaurantTerms(
+        min_order_amount=_amount(restaurant, "min_order_amount"),
+        delivery_fee=_amount(restaurant, "delivery_fee"),
+    )
+
+
+def _amount(restaurant: dict, key: str) -> int:
+    value = restaurant.get(key) or 0
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{key} 형식 오류: {value!r}")
+    amount = int(value)
+    if amount < 0:
+        raise ValueError(f"{key} 는 0 이상이어야 합니다: {amount}")
+    return amount
+
+
+restaurant_terms = RestaurantTermsCache()
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+요청 추적 (W3C Trace Context)
+
+Gateway가 전달한 traceparent / x-request-id 를 이어받아 span 시간을 기록합니다.
+- handler span: tracing_middleware 가 요청마다 하나 기록
+- DB span: instrument_engine() 으로 등록한 SQLAlchemy 이벤트가 쿼리마다 기록
+- outbound span: outbound_span() 으로 감싼 다른 서비스 호출 (전달할 헤더를 돌려줌)
+
+끝난 span 은 bounded queue 에 넣고 백그라운드 스레드가 OTLP JSON 으로 내보냅니다.
+TRACE_EXPORTER=file 이면 파일에 한 줄씩, otlp 이면 collector 로 POST, none 이면 기록만 하지 않습니다.
+queue 가 가득 차면 요청을 막지 않고 span 을 버립니다.
+"""
+
+import atexit
+import json
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+
+from config import SERVICE_NAME, TRACE_EXPORTER, TRACE_FILE_PATH, TRACE_OTLP_ENDPOINT
+from utility.logger import logger
+
+# OTLP span kind
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+EXPORT_QUEUE_SIZE = 10_000
+EXPORT_BATCH_SIZE = 512
+# 긴 SQL 은 잘라서 기록
+MAX_STATEMENT_LENGTH = 500
+
+
+class Span:
+    """시간을 재는 작업 하나 (end() 시 exporter 로 전달)"""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "request_id", "sampled", "attributes", "error", "start_ns", "end_ns")
+
+    def __init__(self, name: str, kind: int, trace_id: str, parent_id: Optional[str], request_id: str, sampled: bool, attributes: dict = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.request_id = request_id
+        self.sampled = sampled
+        self.attributes = attributes or {}
+        self.error = False
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def child(self, name: str, kind: int, attributes: dict = None) -> "Span":
+        return Span(name, kind, self.trace_id, self.span_id, self.request_id, self.sampled, attributes)
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            span_exporter.export(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes({**self.attributes, "request.id": self.request_id}),
+            "status": {"code": 2 if self.error else 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+# 처리 중인 요청의 현재 span (DB / outbound span 의 부모)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]):
+    """traceparent -> (trace_id, parent span_id, sampled), 형식이 틀리면 None"""
+    match = TRACEPARENT_PATTERN.match((value or "").strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 0x01)
+
+
+async def tracing_middleware(request: Request, call_next):
+    """
+    요청 추적 미들웨어
+
+    Gateway의 trace 를 이어서 handler span 을 기록하고 x-request-id 를 응답에 돌려줍니다.
+    Gateway를 거치지 않은 요청은 새 trace 를 시작합니다.
+    """
+    parent = parse_traceparent(request.headers.get("traceparent"))
+    trace_id, parent_id, sampled = parent or (secrets.token_hex(16), None, True)
+    request_id = request.headers.get("x-request-id") or trace_id
+    span = Span(
+        f"{request.method} {request.url.path}",
+        SPAN_KIND_SERVER,
+        trace_id,
+        parent_id,
+        request_id,
+        sampled,
+        {"http.method": request.method, "http.target": request.url.path},
+    )
+
+    token = current_span.set(span)
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["x-request-id"] = request_id
+        return response
+    finally:
+        current_span.reset(token)
+        # 라우팅 후에는 경로 대신 handler 이름으로 (span 이름 개수 제한)
+        endpoint = request.scope.get("endpoint")
+        if endpoint is not None:
+            span.name = f"{request.method} {endpoint.__name__}"
+        span.attributes["http.status_code"] = status_code
+        span.error = status_code >= 500
+        span.end()
+        elapsed_ms = (span.end_ns - span.start_ns) / 1e6
+        logger.info("[%s] %s %s -> %s (%.1fms)", request_id, request.method, request.url.path, status_code, elapsed_ms)
+
+
+def instrument_engine(engine):
+    """engine 에서 실행되는 쿼리마다 현재 요청의 자식 DB span 을 기록"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query_span(conn, cursor, statement, parameters, context, executemany):
+        parent = current_span.get()
+        if parent is None or context is None:
+            return
+        operation = statement.split(None, 1)[0].upper() if statement.strip() else "SQL"
+        context._trace_span = parent.child(
+            f"DB {operation}",
+            SPAN_KIND_CLIENT,
+            {"db.system": engine.dialect.name, "db.statement": statement[:MAX_STATEMENT_LENGTH]},
+        )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_query_span(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _fail_query_span(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.error = True
+            span.end()
+
+
+@contextmanager
+def outbound_span(name: str, **attributes):
+    """
+    다른 서비스 호출을 자식 span 으로 기록
+
+    Usage:
+        with outbound_span("GET menu-service", url=url) as headers:
+            response = await client.get(url, headers=headers)
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield {}
+        return
+
+    span = parent.child(name, SPAN_KIND_CLIENT, attributes)
+    token = current_span.set(span)
+    try:
+        yield {"traceparent": span.traceparent, "x-request-id": span.request_id}
+    except BaseException:
+        span.error = True
+        raise
+    finally:
+        current_span.reset(token)
+        span.end()
+
+
+class SpanExporter:
+    """끝난 span 을 백그라운드 스레드에서 OTLP JSON 으로 내보냄"""
+
+    def __init__(self, kind: str = TRACE_EXPORTER, file_path: str = TRACE_FILE_PATH, endpoint: str = TRACE_OTLP_ENDPOINT):
+        self.kind = kind
+        self.file_path = file_path
+        self.endpoint = endpoint
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._thread = None
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    @property
+    def enabled(self) -> bool:
+        return self.kind in ("file", "otlp")
+
+    def export(self, span: Span):
+        if not (self.enabled and span.sampled):
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        if self.enabled:
+            self._queue.join()
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < EXPORT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [span for span in batch if span is not None]
+            try:
+                if spans:
+                    self._write(spans)
+            except Exception as e:
+                logger.warning(f"span export 실패 ({self.kind}): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(spans) < len(batch):
+                return
+
+    def _write(self, spans: List[Span]):
+        payload = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+                "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [span.to_otlp() for span in spans]}],
+            }]
+        }, separators=(",", ":"))
+        if self.kind == "file":
+            os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+            with open(self.file_path, "a", encoding="utf-8") as sink:
+                sink.write(payload + "\n")
+        else:
+            request = urllib.request.Request(
+                self.endpoint, data=payload.encode(), headers={"Content-Type": "application/json"}, method="POST"
+            )
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    values = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        values.append({"key": key, "value": typed})
+    return values
+
+
+span_exporter = SpanExporter()
+atexit.register(span_exporter.close)
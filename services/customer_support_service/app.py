@@ -7,6 +7,7 @@ from fastapi import FastAPI, Request
 from utility.db import create_schema_if_not_exists, Base, engine
 
 from utility.logger import logger
+from utility.tracing import tracing_middleware
 
 # API 라우터 import
 from api.v1.rest.support_router import router as support_router
@@ -22,6 +23,9 @@ def main():
         description="배달 앱 고객지원 관리 서비스",
         version="1.0.0"
     )
+
+    # 요청 추적 (traceparent / x-request-id, handler span)
+    app.middleware("http")(tracing_middleware)
     
     # API 라우터 등록
     app.include_router(support_router, prefix="/api/v1/rest")
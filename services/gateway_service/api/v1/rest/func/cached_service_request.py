@@ -0,0 +1,107 @@
+from typing import Tuple
+
+import httpx
+from fastapi import HTTPException, Request
+from config import Config
+from utility.http_client import upstream_clients
+from utility.http_response import build_response, encode_variants, filter_response_headers, strong_etag, wants_etag
+from utility.route_table import RoutePolicy, get_route
+from utility.response_cache import CachedResponse, build_cache_key, response_cache
+from .proxy_service_request import (
+    DECODED_BODY_HEADERS, build_forward_headers, resolve_target_url, send_upstream, unexpected_error, upstream_status_error,
+)
+
+
+# Not sent on shared cache fills: the cache key ignores them, and one caller's
+# credentials or validators must not decide what everyone else is served
+PER_CALLER_HEADERS = {
+    "authorization", "proxy-authorization", "cookie", "x-user-id", "x-user-role",
+    "if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "if-range", "range",
+}
+
+
+async def fetch_get(route: RoutePolicy, service_name: str, path: str, headers: dict, query_items: list) -> Tuple[CachedResponse, str]:
+    """
+    GET a backend resource, through the response cache when the route is cacheable
+
+    Returns (response, cache_status); cache_status is BYPASS for uncached routes.
+    Cached fills are shared, so they go out without the caller's credential and
+    conditional headers (PER_CALLER_HEADERS).
+    """
+    target_url = resolve_target_url(route, service_name, path)
+    client = upstream_clients.get(service_name)
+    cached = route.cache_ttl is not None and Config.RESPONSE_CACHE_ENABLED
+    if cached:
+        headers = {key: value for key, value in headers.items() if key.lower() not in PER_CALLER_HEADERS}
+
+    async def load() -> CachedResponse:
+        upstream_request = client.build_request("GET", target_url, headers=headers, params=query_items, timeout=route.timeout)
+        upstream = await send_upstream(service_name, client, upstream_request, route=route)
+
+        response_headers = {
+            key: value
+            for key, value in filter_response_headers(upstream.headers).items()
+            if key.lower() not in DECODED_BODY_HEADERS
+        }
+        body = upstream.content
+        # Validators and compressed variants are computed once per fill, not per hit
+        etag = None
+        variants = {}
+        if wants_etag("GET", upstream.status_code, response_headers):
+            etag = strong_etag(body)
+            variants = encode_variants(response_headers, body)
+        return CachedResponse(
+            status_code=upstream.status_code,
+            headers=response_headers,
+            body=body,
+            etag=etag,
+            variants=variants,
+        )
+
+    if not cached:
+        return await load(), "BYPASS"
+
+    return await response_cache.fetch(
+        build_cache_key(service_name, path, query_items),
+        ttl=route.cache_ttl,
+        stale_while_revalidate=route.stale_while_revalidate,
+        loader=load,
+    )
+
+
+async def cached_service_request(service_name: str, path: str, request: Request):
+    """
+    Serve a public catalog GET from the gateway response cache
+
+    A cold key triggers one upstream call no matter how many requests are
+    waiting on it; stale entries are served while a background refresh runs.
+    The cached ETag answers If-None-Match with 304 and cached compressed
+    variants are sent to clients that accept them. Upstream errors map to
+    the same HTTP errors as on uncached routes.
+    """
+    try:
+        cached, cache_status = await fetch_get(
+            get_route(request),
+            service_name,
+            path,
+            build_forward_headers(request),
+            request.query_params.multi_items(),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise unexpected_error(e)
+
+    if cached.status_code >= 400:
+        # Decoded the way the uncached path reads response.text
+        text = httpx.Response(cached.status_code, headers=cached.headers, content=cached.body).text
+        raise upstream_status_error(cached.status_code, text)
+
+    return build_response(
+        request,
+        cached.status_code,
+        {**cached.headers, "x-cache": cache_status},
+        cached.body,
+        etag=cached.etag,
+        variants=cached.variants,
+    )
@@ -0,0 +1,77 @@
+import httpx
+from fastapi import Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from config import Config
+from middleware.rate_limit_middleware import client_ip
+from model.exception import ConnectionLimitException, ServiceOverloadedException
+from schemas.common import create_error_result
+from utility.http_client import upstream_clients
+from utility.http_response import HOP_BY_HOP_HEADERS, filter_response_headers
+from utility.logger import logger
+from utility.realtime import ConnectionLimitExceeded, realtime_connections, with_idle_timeout
+from utility.route_table import get_route
+from .proxy_service_request import resolve_target_url, build_forward_headers, send_upstream
+
+
+def is_event_stream(request: Request) -> bool:
+    """Server-Sent Events subscription (EventSource sends Accept: text/event-stream)"""
+    return request.method == "GET" and "text/event-stream" in request.headers.get("accept", "")
+
+
+async def event_stream_service_request(service_name: str, path: str, request: Request):
+    """
+    Server-Sent Events pass-through proxy
+
+    Authentication and rate limiting already ran once in the middleware when
+    the stream was opened. Event bytes are relayed as they arrive, without
+    compression or buffering. There is no upstream read timeout, because
+    events may be minutes apart; the stream ends instead after
+    Config.REALTIME_IDLE_TIMEOUT seconds without data (upstreams should send
+    comment heartbeats).
+    """
+    route = get_route(request)
+    owner = request.headers.get("x-user-id") or client_ip(request)
+    try:
+        realtime_connections.open("sse", service_name, owner)
+    except ConnectionLimitExceeded as e:
+        logger.warning("[SSE] Refused %s/%s for %s: %s", service_name, path, owner, e)
+        if e.limit == "user":
+            return _error_response(status.HTTP_429_TOO_MANY_REQUESTS, ConnectionLimitException())
+        return _error_response(status.HTTP_503_SERVICE_UNAVAILABLE, ServiceOverloadedException())
+
+    try:
+        target_url = resolve_target_url(route, service_name, path)
+        headers = build_forward_headers(request)
+        for header in HOP_BY_HOP_HEADERS:
+            headers.pop(header, None)
+
+        client = upstream_clients.get(service_name)
+        timeout = route.timeout or client.timeout
+        upstream_request = client.build_request(
+            "GET",
+            target_url,
+            headers=headers,
+            params=request.query_params,
+            timeout=httpx.Timeout(connect=timeout.connect, read=None, write=timeout.write, pool=timeout.pool),
+        )
+        upstream_response = await send_upstream(service_name, client, upstream_request, stream=True, route=route)
+    except BaseException:
+        realtime_connections.close("sse", service_name, owner)
+        raise
+
+    async def release():
+        await upstream_response.aclose()
+        realtime_connections.close("sse", service_name, owner)
+
+    return StreamingResponse(
+        with_idle_timeout(upstream_response.aiter_raw(), Config.REALTIME_IDLE_TIMEOUT),
+        status_code=upstream_response.status_code,
+        # Ask intermediate proxies (nginx) not to buffer the stream
+        headers={**filter_response_headers(upstream_response.headers), "x-accel-buffering": "no"},
+        background=BackgroundTask(release),
+    )
+
+
+def _error_response(status_code: int, exception) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content=create_error_result(exception).model_dump(), headers={"Retry-After": "1"})
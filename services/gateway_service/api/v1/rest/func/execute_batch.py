@@ -0,0 +1,91 @@
+import asyncio
+import json
+from typing import Dict
+
+from fastapi import HTTPException, Request
+from config import Config
+from middleware.rate_limit_middleware import client_ip
+from schemas.request.batch import BatchRequestDto, BatchSubRequestDto
+from utility.logger import logger
+from utility.rate_limiter import rate_limiter
+from utility.route_table import route_table
+from .proxy_service_request import build_forward_headers, forward_request
+
+# Headers describing the batch envelope, not the sub-requests
+ENVELOPE_HEADERS = ("content-length", "content-type", "transfer-encoding")
+
+
+async def execute_batch(batch: BatchRequestDto, request: Request) -> dict:
+    """
+    Run a batch of sub-requests through the proxy and collect their results
+
+    Sub-requests run concurrently up to the concurrency cap. A sub-request
+    with depends_on starts only after all of its dependencies succeeded
+    and is answered with 424 if one of them failed. Results keep the order
+    of the request array.
+    """
+    headers = build_forward_headers(request)
+    for name in ENVELOPE_HEADERS:
+        headers.pop(name, None)
+    user_id = request.headers.get("x-user-id")
+    caller_ip = client_ip(request)
+
+    concurrency = min(batch.max_concurrency or Config.BATCH_MAX_CONCURRENCY, Config.BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(sub_request: BatchSubRequestDto) -> dict:
+        # Wait for dependencies before taking a concurrency slot
+        for dependency in sub_request.depends_on:
+            result = await tasks[dependency]
+            if result["status_code"] >= 400:
+                return _result(sub_request, 424, error=f"Dependency '{dependency}' failed")
+
+        async with semaphore:
+            return await _run_sub_request(sub_request, headers, user_id, caller_ip)
+
+    for sub_request in batch.requests:
+        tasks[sub_request.id] = asyncio.create_task(run(sub_request))
+
+    results = await asyncio.gather(*tasks.values())
+    logger.info("[BATCH] %d requests, concurrency %d", len(results), concurrency)
+    return {"results": list(results)}
+
+
+async def _run_sub_request(sub_request: BatchSubRequestDto, headers: dict, user_id: str, caller_ip: str) -> dict:
+    path = sub_request.path.strip("/")
+    route = route_table.match(f"{sub_request.service}/{path}")
+
+    # Each sub-request spends its own rate-limit token
+    if Config.RATE_LIMIT_ENABLED:
+        limited, retry_after = await rate_limiter.check(route, user_id, caller_ip)
+        if limited:
+            return _result(sub_request, 429, error=f"Rate limited ({limited}), retry after {retry_after:.1f}s")
+
+    body = None
+    sub_headers = headers
+    if sub_request.body is not None:
+        body = json.dumps(sub_request.body).encode()
+        sub_headers = {**headers, "content-type": "application/json"}
+
+    try:
+        status_code, content = await forward_request(
+            route,
+            sub_request.service,
+            path,
+            sub_request.method,
+            sub_headers,
+            body=body,
+            query_items=list((sub_request.query or {}).items()),
+        )
+    except HTTPException as e:
+        return _result(sub_request, e.status_code, error=e.detail)
+
+    return _result(sub_request, status_code, body=content)
+
+
+def _result(sub_request: BatchSubRequestDto, status_code: int, body=None, error=None) -> dict:
+    result = {"id": sub_request.id, "status_code": status_code, "body": body}
+    if error is not None:
+        result["error"] = error
+    return result
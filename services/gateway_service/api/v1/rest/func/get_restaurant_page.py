@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from config import Config
+from utility.http_response import build_response, strong_etag
+from utility.logger import logger
+from utility.route_table import route_table
+from .cached_service_request import fetch_get
+from .proxy_service_request import build_forward_headers
+
+
+class PartFailed(Exception):
+    """An aggregated part that could not be served"""
+
+    def __init__(self, status_code: int, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+async def get_restaurant_page(restaurant_id: str, request: Request):
+    """
+    Restaurant page in one round trip (backend-for-frontend)
+
+    Restaurant, images, menus, categories and reviews are fetched
+    concurrently over the pooled upstream clients (catalog parts through
+    the response cache). Every part has its own deadline; optional parts
+    that fail are reported in "partial_errors" and left as null.
+    """
+    headers = build_forward_headers(request)
+    headers.pop("content-length", None)
+
+    parts = Config.BFF_RESTAURANT_PAGE_PARTS
+    results = await asyncio.gather(
+        *(_settle(name, spec, restaurant_id, headers) for name, spec in parts.items())
+    )
+
+    data = {}
+    partial_errors = {}
+    for (name, spec), (value, failure) in zip(parts.items(), results):
+        if failure is None:
+            data[name] = value
+            continue
+
+        if spec.get("required"):
+            logger.warning("[BFF] Required part '%s' failed for restaurant %s: %s", name, restaurant_id, failure.detail)
+            if isinstance(failure.detail, dict):
+                # Business error from the backend (ErrorDto): pass it through as a ResultDto
+                return JSONResponse(status_code=failure.status_code, content={"data": None, "error": failure.detail})
+            raise HTTPException(status_code=failure.status_code, detail=failure.detail)
+
+        data[name] = None
+        partial_errors[name] = {"status_code": failure.status_code, "detail": failure.detail}
+
+    if partial_errors:
+        logger.info("[BFF] Restaurant %s served without: %s", restaurant_id, ", ".join(partial_errors))
+
+    page = JSONResponse(content={"data": data, "error": None, "partial_errors": partial_errors})
+    return build_response(request, page.status_code, {"content-type": page.media_type}, page.body, etag=strong_etag(page.body))
+
+
+async def _settle(name: str, spec: dict, restaurant_id: str, headers: dict):
+    """
+    Returns:
+        (value, None) on success, (None, PartFailed) otherwise
+    """
+    try:
+        value = await asyncio.wait_for(_fetch_part(spec, restaurant_id, headers), timeout=spec["timeout"])
+        return value, None
+    except asyncio.TimeoutError:
+        return None, PartFailed(504, f"Part '{name}' timed out after {spec['timeout']}s")
+    except PartFailed as failure:
+        return None, failure
+    except HTTPException as e:
+        return None, PartFailed(e.status_code, e.detail)
+    except Exception as e:
+        logger.error("[BFF] Part '%s' failed: %s", name, e)
+        return None, PartFailed(502, f"Part '{name}' failed")
+
+
+async def _fetch_part(spec: dict, restaurant_id: str, headers: dict):
+    route_path = spec["route"].format(restaurant_id=restaurant_id)
+    service_name, path = route_path.split("/", 1)
+    query_items = list(spec.get("params", {}).items())
+
+    cached, _ = await fetch_get(route_table.match(route_path), service_name, path, headers, query_items)
+
+    try:
+        body = json.loads(cached.body) if cached.body else None
+    except ValueError:
+        body = cached.body.decode(errors="replace")
+
+    if cached.status_code >= 400:
+        raise PartFailed(cached.status_code, body)
+
+    # Backends answer with ResultDto ({"data": ..., "error": ...})
+    if isinstance(body, dict) and "data" in body:
+        if body.get("error"):
+            raise PartFailed(cached.status_code, body["error"])
+        return body["data"]
+    return body
@@ -1,78 +1,346 @@
+import asyncio
+import math
+import time
 import httpx
 from fastapi import HTTPException, Request
 from config import Config
+from utility.circuit_breaker import circuit_breakers
+from utility.http_client import upstream_clients
+from utility.http_response import build_response, filter_response_headers, strong_etag, wants_etag
+from utility.load_balancer import load_balancer
 from utility.logger import logger
+from utility.metrics import POOL_WAIT, UPSTREAM_DURATION, UPSTREAM_HEDGES, UPSTREAM_RETRIES
+from utility.retry_policy import HEDGEABLE_METHODS, IDEMPOTENT_METHODS, backoff_delay, latency_tracker, retry_budget
+from utility.route_table import RoutePolicy, get_route
+from utility.tracing import start_client_span
 
-async def proxy_service_request(service_name: str, path: str, request: Request):
+# httpx hands back the decoded body, so encoding/length headers are recomputed on the way out
+DECODED_BODY_HEADERS = {"content-encoding", "content-length"}
+
+
+def resolve_target_url(route: RoutePolicy, service_name: str, path: str) -> str:
     """
-    Proxy requests to backend services
+    Resolve the backend URL for a service path (404 for unknown services)
     """
-    if service_name not in Config.SERVICE_ENDPOINTS:
-        logger.error(f"Unknown service: {service_name}")
+    if route.base_url is None:
+        logger.error("Unknown service: %s", service_name)
         raise HTTPException(status_code=404, detail=f"Service '{service_name}' not found")
-    
-    service_url = Config.SERVICE_ENDPOINTS[service_name]
+
     # Build target URL without forcing trailing slash
     if path:
-        target_url = f"{service_url}/{path}"
-    else:
-        target_url = service_url
-    
-    # Get request details
-    method = request.method
+        return f"{route.base_url}/{path}"
+    return route.base_url
+
+
+def build_forward_headers(request: Request) -> dict:
+    """
+    Copy client headers for the upstream request
+    """
     headers = dict(request.headers)
-    
+
     # Remove host header to avoid conflicts
     headers.pop("host", None)
-    
-    logger.info(f"Proxying {method} request to {target_url}")
-    
+    return headers
+
+
+# The request never reached the backend, so sending it again is safe
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+# httpcore trace events marking the end of the wait for a pooled connection
+# (a new connection starts connecting, or a ready one starts sending)
+CONNECTION_ACQUIRED_EVENTS = ("connect_tcp.started", "connect_unix_socket.started", "send_request_headers.started")
+
+
+def _pool_wait_trace(service_name: str, started: float):
+    """httpcore trace hook recording how long the request queued for a connection"""
+    waiting = True
+
+    async def trace(event_name: str, info: dict):
+        nonlocal waiting
+        if waiting and event_name.endswith(CONNECTION_ACQUIRED_EVENTS):
+            waiting = False
+            POOL_WAIT.observe(time.monotonic() - started, service_name)
+
+    return trace
+
+
+async def send_upstream(service_name: str, client: httpx.AsyncClient, upstream_request: httpx.Request, stream: bool = False, route: RoutePolicy = None) -> httpx.Response:
+    """
+    Send a request to a backend service through its circuit breaker
+
+    Open circuits fail fast with 503; timeouts map to 504 and connection
+    errors to 503. 5xx responses, errors and slow calls feed the breaker
+    and the replica's outlier detection. The replica is chosen by the load
+    balancer. Latency (to response headers) and pool wait time go to the
+    metrics.
+
+    Idempotent requests with a replayable body are retried on connection
+    errors (jittered backoff); GETs on hedged routes send a second attempt
+    to another replica when the first is slower than the route's p95.
+    Retries and hedges both draw from the global retry budget.
+    """
+    route_name = (route.name if route else None) or service_name
+    breaker = circuit_breakers.get(service_name)
+    if not breaker.allow_request():
+        logger.warning("Circuit open for %s, failing fast", service_name)
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service '{service_name}' temporarily unavailable",
+            headers={"Retry-After": str(max(1, math.ceil(breaker.retry_after())))},
+        )
+
+    retry_budget.deposit()
+    method = upstream_request.method
+    replayable = method in IDEMPOTENT_METHODS and isinstance(upstream_request.stream, httpx.ByteStream)
+    hedge = (
+        route is not None and route.hedge and method in HEDGEABLE_METHODS and replayable
+        and load_balancer.replica_count(service_name) > 1
+    )
+
+    tried = []
+    attempt = 1
+    while True:
+        try:
+            if hedge:
+                return await _send_hedged(service_name, client, upstream_request, stream, route_name, tried)
+            return await _send_once(service_name, client, upstream_request, stream, route_name, tried)
+        except httpx.RequestError as e:
+            retry = (
+                replayable
+                and isinstance(e, RETRYABLE_ERRORS)
+                and attempt < Config.RETRY_MAX_ATTEMPTS
+                and retry_budget.try_spend()
+                and breaker.allow_request()
+            )
+            if not retry:
+                raise _upstream_error(e, upstream_request, client)
+
+            UPSTREAM_RETRIES.inc(service_name)
+            logger.warning("Retrying %s to %s after connection error: %s", method, service_name, e)
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
+
+async def _send_once(service_name: str, client: httpx.AsyncClient, upstream_request: httpx.Request, stream: bool, route_name: str, tried: list) -> httpx.Response:
+    """
+    One attempt on one replica (the caller already passed the circuit breaker)
+
+    Raises the httpx error as-is so the caller can decide about retrying.
+    """
+    breaker = circuit_breakers.get(service_name)
+    endpoint = load_balancer.acquire(service_name, exclude=tried)
+    if endpoint is not None:
+        tried.append(endpoint)
+        endpoint.apply_to(upstream_request)
+
+    # Each attempt is its own client span; the backend continues from it
+    span = start_client_span(
+        f"{upstream_request.method} {route_name}",
+        {"http.method": upstream_request.method, "http.url": str(upstream_request.url), "peer.service": service_name},
+    )
+    if span is not None:
+        upstream_request.headers["traceparent"] = span.traceparent
+
+    started = time.monotonic()
+    upstream_request.extensions["trace"] = _pool_wait_trace(service_name, started)
+    settled = False
     try:
-        async with httpx.AsyncClient() as client:
-            if method == "GET":
-                response = await client.get(
-                    target_url,
-                    headers=headers,
-                    params=request.query_params,
-                    timeout=Config.REQUEST_TIMEOUT
-                )
-            else:
-                body = await request.body()
-                logger.info(f"Request body size: {len(body)} bytes")
-                response = await client.request(
-                    method,
-                    target_url,
-                    headers=headers,
-                    content=body,
-                    params=request.query_params,
-                    timeout=Config.REQUEST_TIMEOUT
-                )
-
-            logger.info(f"Service response status: {response.status_code}")
-            logger.info(f"Service response headers: {dict(response.headers)}")
-
-            # Return appropriate response based on status code
-            if response.status_code >= 400:
-                logger.error(f"Service returned error: {response.status_code} - {response.text}")
-                raise HTTPException(status_code=response.status_code, detail=response.text)
-
-            # Return JSON if content type is JSON, otherwise return text
-            if response.headers.get("content-type", "").startswith("application/json"):
-                return response.json()
-            else:
-                return response.text
-
-    except httpx.TimeoutException as e:
-        logger.error(f"Request timeout after {Config.REQUEST_TIMEOUT}s: {str(e)}")
-        raise HTTPException(status_code=504, detail=f"Service timeout after {Config.REQUEST_TIMEOUT}s")
+        response = await client.send(upstream_request, stream=stream)
+        settled = True
     except httpx.RequestError as e:
-        logger.error(f"Request error: {str(e)}")
-        raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}")
+        settled = True
+        latency = time.monotonic() - started
+        breaker.record_failure(latency)
+        load_balancer.release(service_name, endpoint, failed=True)
+        outcome = "timeout" if isinstance(e, httpx.TimeoutException) else "error"
+        UPSTREAM_DURATION.observe(latency, service_name, route_name, outcome)
+        _end_span(span, outcome, error=True)
+        raise
+    finally:
+        if not settled:
+            # Client went away, a hedge lost or an unexpected error: no verdict on the
+            # backend, but the half-open probe slot and the replica are given back
+            breaker.release()
+            load_balancer.release(service_name, endpoint, failed=None)
+            _end_span(span, "aborted")
+
+    latency = time.monotonic() - started
+    _end_span(span, response.status_code, error=response.status_code >= 500)
+    breaker.record_result(response.status_code, latency)
+    load_balancer.release(service_name, endpoint, failed=response.status_code >= 500)
+    UPSTREAM_DURATION.observe(latency, service_name, route_name, str(response.status_code))
+    if response.status_code < 500:
+        latency_tracker.observe(route_name, latency)
+    return response
+
+
+def _end_span(span, outcome, error: bool = False):
+    """Finish an attempt's span (at response headers, like the latency metric)"""
+    if span is None:
+        return
+    span.attributes["http.status_code" if isinstance(outcome, int) else "outcome"] = outcome
+    span.error = error
+    span.end()
+
+
+async def _send_hedged(service_name: str, client: httpx.AsyncClient, upstream_request: httpx.Request, stream: bool, route_name: str, tried: list) -> httpx.Response:
+    """
+    First answer wins between the original attempt and, if it is slower
+    than the route's hedge delay, a second attempt on another replica
+    """
+    primary = asyncio.create_task(_send_once(service_name, client, upstream_request, stream, route_name, tried))
+    done, _ = await asyncio.wait({primary}, timeout=latency_tracker.hedge_delay(route_name))
+    if done:
+        return primary.result()
+    if not (retry_budget.try_spend() and circuit_breakers.get(service_name).allow_request()):
+        return await primary
+
+    hedged = asyncio.create_task(
+        _send_once(service_name, client, _copy_request(upstream_request), stream, route_name, tried)
+    )
+    pending = {primary, hedged}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    UPSTREAM_HEDGES.inc(service_name, "hedge" if task is hedged else "primary")
+                    for other in done - {task}:
+                        if other.exception() is None and stream:
+                            await other.result().aclose()
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _copy_request(upstream_request: httpx.Request) -> httpx.Request:
+    """Fresh request with the same method, URL, headers and (replayable) body"""
+    return httpx.Request(
+        upstream_request.method,
+        upstream_request.url,
+        headers=upstream_request.headers,
+        content=upstream_request.content,
+        extensions={key: value for key, value in upstream_request.extensions.items() if key != "trace"},
+    )
+
+
+def _upstream_error(error: httpx.RequestError, upstream_request: httpx.Request, client: httpx.AsyncClient) -> HTTPException:
+    """Map a failed upstream call to the gateway's HTTP error"""
+    if isinstance(error, httpx.TimeoutException):
+        read_timeout = upstream_request.extensions.get("timeout", {}).get("read", client.timeout.read)
+        logger.error("Request timeout after %ss: %s", read_timeout, error)
+        return HTTPException(status_code=504, detail=f"Service timeout after {read_timeout}s")
+    logger.error("Request error: %s", error)
+    return HTTPException(status_code=503, detail=f"Service unavailable: {str(error)}")
+
+
+def upstream_status_error(status_code: int, text: str) -> HTTPException:
+    """
+    Map an upstream 4xx/5xx answer to the gateway's HTTP error
+
+    Cached and uncached routes both go through here, so caching a route
+    doesn't change what clients see when the backend fails.
+    """
+    logger.error("Service returned error: %s - %.1000s", status_code, text)
+    return HTTPException(status_code=status_code, detail=text)
+
+
+def unexpected_error(error: Exception) -> HTTPException:
+    """Map an unexpected failure while proxying to the gateway's HTTP error"""
+    logger.error("Unexpected error: %s", error, exc_info=True)
+    return HTTPException(status_code=500, detail="Internal gateway error")
+
+
+async def send_request(route: RoutePolicy, service_name: str, path: str, method: str, headers: dict, body: bytes = None, query_items: list = None) -> httpx.Response:
+    """
+    Forward one request to a backend service
+
+    Returns the buffered upstream response; upstream errors raise HTTPException
+    """
+    target_url = resolve_target_url(route, service_name, path)
+
+    logger.info("Proxying %s request to %s", method, target_url)
+
+    # Pooled client with per-service timeouts
+    client = upstream_clients.get(service_name)
+
+    try:
+        if body is not None:
+            logger.debug("Request body size: %d bytes", len(body))
+
+        upstream_request = client.build_request(
+            method,
+            target_url,
+            headers=headers,
+            content=body,
+            params=query_items,
+            timeout=route.timeout,
+        )
+        response = await send_upstream(service_name, client, upstream_request, route=route)
+
+        logger.info("Service response status: %s", response.status_code)
+        logger.debug("Service response headers: %s", response.headers)
+
+        # Return appropriate response based on status code
+        if response.status_code >= 400:
+            raise upstream_status_error(response.status_code, response.text)
+
+        return response
+
+    except HTTPException:
+        raise
     except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP status error: {e.response.status_code} - {e.response.text}")
+        logger.error("HTTP status error: %s - %.1000s", e.response.status_code, e.response.text)
         raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail="Internal gateway error")
\ No newline at end of file
+        raise unexpected_error(e)
+
+
+async def forward_request(route: RoutePolicy, service_name: str, path: str, method: str, headers: dict, body: bytes = None, query_items: list = None):
+    """
+    Forward one request to a backend service and decode the reply
+
+    Returns:
+        (status_code, JSON or text body); upstream errors raise HTTPException
+    """
+    response = await send_request(route, service_name, path, method, headers, body=body, query_items=query_items)
+
+    # Return JSON if content type is JSON, otherwise return text
+    if response.headers.get("content-type", "").startswith("application/json"):
+        return response.status_code, response.json()
+    else:
+        return response.status_code, response.text
+
+
+async def proxy_service_request(service_name: str, path: str, request: Request):
+    """
+    Proxy requests to backend services
+
+    The upstream body is passed through without decoding; JSON GETs get a
+    strong ETag (304 on If-None-Match) and large bodies are compressed.
+    """
+    body = None
+    if request.method != "GET":
+        body = await request.body()
+
+    response = await send_request(
+        get_route(request),
+        service_name,
+        path,
+        request.method,
+        build_forward_headers(request),
+        body=body,
+        query_items=request.query_params.multi_items(),
+    )
+
+    headers = {
+        key: value
+        for key, value in filter_response_headers(response.headers).items()
+        if key.lower() not in DECODED_BODY_HEADERS
+    }
+    etag = strong_etag(response.content) if wants_etag(request.method, response.status_code, headers) else None
+    return build_response(request, response.status_code, headers, response.content, etag=etag)
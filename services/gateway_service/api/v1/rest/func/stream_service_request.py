@@ -0,0 +1,47 @@
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from utility.http_client import upstream_clients
+from utility.http_response import HOP_BY_HOP_HEADERS, filter_response_headers
+from utility.route_table import get_route
+from .proxy_service_request import resolve_target_url, build_forward_headers, send_upstream
+
+
+async def stream_service_request(service_name: str, path: str, request: Request):
+    """
+    Streaming pass-through proxy
+
+    The request body is streamed upstream and the upstream response bytes are
+    streamed back unchanged (status, headers, content-encoding), so payloads
+    are never parsed, re-encoded or held fully in memory.
+    """
+    route = get_route(request)
+    target_url = resolve_target_url(route, service_name, path)
+
+    method = request.method
+    headers = build_forward_headers(request)
+    for header in HOP_BY_HOP_HEADERS:
+        headers.pop(header, None)
+
+    # Only send a body when the client sent one (avoids chunked GETs)
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+    content = request.stream() if has_body else None
+
+    client = upstream_clients.get(service_name)
+    upstream_request = client.build_request(
+        method,
+        target_url,
+        headers=headers,
+        params=request.query_params,
+        content=content,
+        timeout=route.timeout,
+    )
+
+    upstream_response = await send_upstream(service_name, client, upstream_request, stream=True, route=route)
+
+    return StreamingResponse(
+        upstream_response.aiter_raw(),
+        status_code=upstream_response.status_code,
+        headers=filter_response_headers(upstream_response.headers),
+        background=BackgroundTask(upstream_response.aclose),
+    )
@@ -0,0 +1,213 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+import httpx
+import websockets
+from fastapi import WebSocket, status
+from starlette.websockets import WebSocketState
+from config import Config
+from middleware.auth_middleware import TRUSTED_USER_HEADERS, authenticate_connection
+from middleware.rate_limit_middleware import client_ip
+from utility.http_response import HOP_BY_HOP_HEADERS
+from utility.load_balancer import Endpoint, load_balancer
+from utility.logger import logger
+from utility.rate_limiter import rate_limiter
+from utility.realtime import Activity, ConnectionLimitExceeded, idle_watchdog, realtime_connections
+from utility.route_table import RoutePolicy, get_route
+from utility.tracing import TRACE_HEADERS, current_span, start_request_span
+
+# Handshake headers the upstream connection negotiates itself
+WEBSOCKET_HANDSHAKE_HEADERS = {
+    "host",
+    "content-length",
+    "sec-websocket-key",
+    "sec-websocket-version",
+    "sec-websocket-extensions",
+    "sec-websocket-protocol",
+}
+
+# Close codes that describe a closure but may not be sent in a close frame (RFC 6455 7.4.1)
+RESERVED_CLOSE_CODES = {1005, 1006, 1015}
+
+
+async def websocket_service_request(service_name: str, path: str, websocket: WebSocket):
+    """
+    WebSocket pass-through proxy
+
+    The client is authenticated once at the upgrade (HTTP middleware does not
+    run for WebSockets), then messages are relayed in both directions as they
+    are, text or binary, without being parsed. Either side closing closes the
+    other; a connection without messages for Config.REALTIME_IDLE_TIMEOUT
+    seconds is closed with 1001.
+    """
+    route = get_route(websocket)
+    if route.base_url is None:
+        logger.error("Unknown service: %s", service_name)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    # The trace middleware does not run for WebSockets; the connection is one server span
+    span = start_request_span(
+        f"WEBSOCKET {route.name}",
+        websocket.headers.get("traceparent"),
+        websocket.headers.get("x-request-id"),
+        {"http.target": websocket.url.path, "gateway.service": service_name},
+    )
+    headers = _forward_headers(websocket)
+    headers.append(("traceparent", span.traceparent))
+    headers.append(("x-request-id", span.request_id))
+    token = current_span.set(span)
+    try:
+        await _proxy_connection(service_name, path, websocket, route, headers)
+    finally:
+        current_span.reset(token)
+        span.end()
+
+
+async def _proxy_connection(service_name: str, path: str, websocket: WebSocket, route: RoutePolicy, headers: List[Tuple[str, str]]):
+    user_id = None
+    if not route.public:
+        user_info = await authenticate_connection(websocket)
+        if not user_info:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        user_id = str(user_info.get("user_id"))
+        headers.append(("x-user-id", user_id))
+        headers.append(("x-user-role", user_info.get("role", "customer")))
+
+    caller_ip = client_ip(websocket)
+    if Config.RATE_LIMIT_ENABLED:
+        limited, _ = await rate_limiter.check(route, user_id, caller_ip)
+        if limited:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return
+
+    owner = user_id or caller_ip
+    try:
+        realtime_connections.open("websocket", service_name, owner)
+    except ConnectionLimitExceeded as e:
+        logger.warning("[WS] Refused %s/%s for %s: %s", service_name, path, owner, e)
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    endpoint = load_balancer.acquire(service_name)
+    failed = None
+    try:
+        upstream_url = _upstream_url(route, path, endpoint, websocket.url.query)
+        try:
+            upstream = await websockets.connect(
+                upstream_url,
+                extra_headers=headers,
+                subprotocols=websocket.scope.get("subprotocols") or None,
+                open_timeout=Config.WEBSOCKET_OPEN_TIMEOUT,
+                max_size=Config.WEBSOCKET_MAX_MESSAGE_BYTES,
+                max_queue=Config.WEBSOCKET_MAX_QUEUE,
+                # Messages are relayed as is; no per-message (de)compression in the gateway
+                compression=None,
+            )
+        except websockets.InvalidStatusCode as e:
+            logger.warning("[WS] %s refused the upgrade: %s", upstream_url, e.status_code)
+            failed = e.status_code >= 500
+            await websocket.close(code=status.WS_1014_BAD_GATEWAY if failed else status.WS_1008_POLICY_VIOLATION)
+            return
+        except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+            logger.error("[WS] Could not connect to %s: %s", upstream_url, e)
+            failed = True
+            await websocket.close(code=status.WS_1014_BAD_GATEWAY)
+            return
+
+        failed = False
+        try:
+            await websocket.accept(subprotocol=upstream.subprotocol)
+            await _relay(websocket, upstream)
+        finally:
+            await upstream.close()
+    finally:
+        load_balancer.release(service_name, endpoint, failed)
+        realtime_connections.close("websocket", service_name, owner)
+
+
+def _forward_headers(websocket: WebSocket) -> List[Tuple[str, str]]:
+    """Client handshake headers for the upstream handshake (user and trace headers are set by the gateway)"""
+    excluded = HOP_BY_HOP_HEADERS | WEBSOCKET_HANDSHAKE_HEADERS
+    return [
+        (key, value)
+        for key, value in websocket.headers.items()
+        if key not in excluded and key.encode() not in TRUSTED_USER_HEADERS | TRACE_HEADERS
+    ]
+
+
+def _upstream_url(route: RoutePolicy, path: str, endpoint: Optional[Endpoint], query: str) -> str:
+    url = httpx.URL(f"{route.base_url}/{path}" if path else route.base_url)
+    if endpoint is not None:
+        url = url.copy_with(scheme=endpoint.url.scheme, host=endpoint.url.host, port=endpoint.url.port)
+    url = url.copy_with(scheme="wss" if url.scheme == "https" else "ws")
+    if query:
+        url = url.copy_with(query=query.encode("ascii"))
+    return str(url)
+
+
+async def _relay(websocket: WebSocket, upstream: websockets.WebSocketClientProtocol):
+    activity = Activity()
+    client_side = asyncio.create_task(_client_to_upstream(websocket, upstream, activity))
+    upstream_side = asyncio.create_task(_upstream_to_client(websocket, upstream, activity))
+    idle = asyncio.create_task(idle_watchdog(activity, Config.REALTIME_IDLE_TIMEOUT))
+
+    done, pending = await asyncio.wait({client_side, upstream_side, idle}, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    if client_side in done and client_side.exception() is None and client_side.result() is not None:
+        # Client went away: pass its close code upstream
+        await upstream.close(code=_sendable(client_side.result(), status.WS_1000_NORMAL_CLOSURE))
+    elif idle in done:
+        logger.info("[WS] Closing idle connection after %.0fs", Config.REALTIME_IDLE_TIMEOUT)
+        await upstream.close(code=status.WS_1001_GOING_AWAY)
+        await _close_client(websocket, status.WS_1001_GOING_AWAY)
+    else:
+        # Upstream went away: pass its close code to the client
+        await _close_client(websocket, _sendable(upstream.close_code, status.WS_1014_BAD_GATEWAY))
+
+
+async def _client_to_upstream(websocket: WebSocket, upstream: websockets.WebSocketClientProtocol, activity: Activity) -> Optional[int]:
+    """Relay client messages; returns the client's close code, or None if upstream closed first"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return message.get("code", status.WS_1000_NORMAL_CLOSURE)
+        activity.touch()
+        data = message.get("bytes")
+        try:
+            await upstream.send(data if data is not None else message["text"])
+        except websockets.ConnectionClosed:
+            return None
+
+
+async def _upstream_to_client(websocket: WebSocket, upstream: websockets.WebSocketClientProtocol, activity: Activity):
+    """Relay upstream messages until upstream closes"""
+    try:
+        async for message in upstream:
+            activity.touch()
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            else:
+                await websocket.send_text(message)
+    except websockets.ConnectionClosed:
+        pass
+
+
+async def _close_client(websocket: WebSocket, code: int):
+    if websocket.application_state != WebSocketState.CONNECTED:
+        return
+    try:
+        await websocket.close(code=code)
+    except (RuntimeError, OSError):
+        # The client disconnected at the same time
+        pass
+
+
+def _sendable(code: Optional[int], default: int) -> int:
+    if code is None or code in RESERVED_CLOSE_CODES:
+        return default
+    return code
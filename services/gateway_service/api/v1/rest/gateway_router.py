@@ -1,5 +1,21 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, WebSocket
+from config import Config
+from utility.admission import admission
+from utility.circuit_breaker import circuit_breakers
+from utility.http_client import upstream_clients
+from utility.load_balancer import load_balancer
+from utility.rate_limiter import rate_limiter
+from utility.realtime import realtime_connections
+from utility.response_cache import response_cache
+from utility.route_table import get_route
+from schemas.request.batch import BatchRequestDto
+from .func.cached_service_request import cached_service_request
+from .func.event_stream_service_request import event_stream_service_request, is_event_stream
+from .func.execute_batch import execute_batch
+from .func.get_restaurant_page import get_restaurant_page
 from .func.proxy_service_request import proxy_service_request
+from .func.stream_service_request import stream_service_request
+from .func.websocket_service_request import websocket_service_request
 
 router = APIRouter()
 
@@ -8,9 +24,68 @@ async def health_check():
     """Gateway health check endpoint"""
     return {"status": "healthy", "service": "gateway"}
 
+@router.get("/gateway/pool-stats")
+async def pool_stats():
+    """Upstream connection pool usage per service (in-use / idle / waiting)"""
+    return upstream_clients.pool_stats()
+
+@router.get("/gateway/cache-stats")
+async def cache_stats():
+    """Response cache size and hit ratio"""
+    return response_cache.snapshot()
+
+@router.get("/gateway/rate-limit-stats")
+async def rate_limit_stats():
+    """Rate-limit rejection counters"""
+    return rate_limiter.snapshot()
+
+@router.get("/gateway/admission-stats")
+async def admission_stats():
+    """In-flight requests, queue depth and shed counts per priority class"""
+    return admission.snapshot()
+
+@router.get("/gateway/upstreams")
+async def upstreams():
+    """Replicas per service with health, ejection and in-flight counts"""
+    return load_balancer.snapshot()
+
+@router.get("/gateway/circuit-stats")
+async def circuit_stats():
+    """Circuit breaker state per upstream service"""
+    return circuit_breakers.snapshot()
+
+@router.get("/gateway/realtime-stats")
+async def realtime_stats():
+    """Open WebSocket / SSE connections and their caps"""
+    return realtime_connections.snapshot()
+
+@router.get("/bff/restaurants/{restaurant_id}")
+async def restaurant_page(restaurant_id: str, request: Request):
+    """Restaurant page (info, images, menus, categories, reviews) aggregated in one call"""
+    return await get_restaurant_page(restaurant_id, request)
+
+@router.post("/batch")
+async def batch(batch_request: BatchRequestDto, request: Request):
+    """Several proxied requests in one call (concurrent, optional depends_on ordering)"""
+    return await execute_batch(batch_request, request)
+
 @router.api_route("/{service_name}/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def proxy_request(service_name: str, path: str, request: Request):
     """
     Generic proxy endpoint for all service requests
     """
-    return await proxy_service_request(service_name, path, request)
\ No newline at end of file
+    route = get_route(request)
+    if is_event_stream(request):
+        return await event_stream_service_request(service_name, path, request)
+    if request.method == "GET" and route.cache_ttl is not None and Config.RESPONSE_CACHE_ENABLED:
+        return await cached_service_request(service_name, path, request)
+    if Config.PROXY_STREAMING:
+        return await stream_service_request(service_name, path, request)
+    return await proxy_service_request(service_name, path, request)
+
+@router.websocket("/{service_name}/{path:path}")
+async def proxy_websocket(service_name: str, path: str, websocket: WebSocket):
+    """
+    WebSocket pass-through to backend services (e.g. delivery tracking)
+    """
+    await websocket_service_request(service_name, path, websocket)
@@ -1,19 +1,62 @@
 # -*- coding: utf-8 -*-
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from config import Config
+from middleware.auth_middleware import auth_middleware
+from middleware.metrics_middleware import metrics_middleware
+from middleware.rate_limit_middleware import rate_limit_middleware
+from middleware.trace_middleware import trace_middleware
+from utility.http_client import upstream_clients
+from utility.load_balancer import load_balancer
+from utility.rate_limiter import create_rate_limit_backend, rate_limiter
+from utility.metrics import metrics
+from utility.route_table import route_table
+from utility.tracing import span_exporter
 from utility.logger import logger
 
 # API router import
 from api.v1.rest.gateway_router import router as gateway_router
 
-def main():
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Route policies compiled once from Config
+    route_table.load()
+    # Long-lived upstream connection pools
+    await upstream_clients.start()
+    # Replica sets (reloaded from Config.UPSTREAMS_FILE on change) and health checks
+    await load_balancer.start(upstream_clients.get)
+    # Limiter state: in-process by default, shared backend when configured
+    rate_limiter.backend = create_rate_limit_backend()
+    yield
+    await rate_limiter.backend.close()
+    await load_balancer.close()
+    await upstream_clients.close()
+    span_exporter.flush()
+
+
+def create_app() -> FastAPI:
     app = FastAPI(
         title="Gateway Service API",
         description="API Gateway for microservices",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
-    
+
+    # Rate limiting / load shedding (runs after auth so x-user-id is trusted)
+    app.middleware("http")(rate_limit_middleware)
+
+    # JWT authentication
+    app.middleware("http")(auth_middleware)
+
+    # Request count / latency / in-flight metrics (outermost, so rejected requests are counted too)
+    app.middleware("http")(metrics_middleware)
+
+    # traceparent / x-request-id for every request (outside metrics, so every log line carries them)
+    app.middleware("http")(trace_middleware)
+
     # CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -22,14 +65,24 @@ def main():
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    
+
     # API router registration
     app.include_router(gateway_router, prefix="/api/v1/rest")
-    
+
+    @app.get(Config.METRICS_PATH, response_class=PlainTextResponse, include_in_schema=False)
+    async def prometheus_metrics():
+        """Prometheus text exposition"""
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
     logger.info("Gateway service initialized successfully")
-    
+    return app
+
+
+def main():
+    app = create_app()
+
     import uvicorn
     uvicorn.run(app, host=Config.HOST, port=Config.PORT)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,230 @@
+"""
+Load test: gateway overhead against in-process stub backends
+
+Run from services/gateway_service:
+
+    python -m benchmarks.bench_proxy [--mode closed --concurrency 64 | --mode open --rps 2000]
+                                     [--duration 10] [--latency-ms 5] [--payload-bytes 4096]
+                                     [--scenarios direct,buffered,streaming] [--transport asgi|http]
+                                     [--output results.json]
+
+The gateway app runs in this process with its real middleware stack; the
+upstream client pools are swapped for stub backends (httpx.MockTransport)
+that wait --latency-ms and answer --payload-bytes of JSON in
+--chunk-bytes chunks. Scenarios:
+
+- direct: the load generator calls the stub itself (no gateway); the
+  baseline to subtract from the other scenarios
+- buffered: GATEWAY_PROXY_STREAMING off (body read, ETag, compression)
+- streaming: GATEWAY_PROXY_STREAMING on (bytes passed through)
+
+Load is either a closed loop (--concurrency workers, each sending the next
+request when the previous one answered) or an open loop at a fixed --rps,
+where latency counts from the scheduled send time so a slow gateway is not
+hidden by a stalled generator. --transport asgi calls the app in-process;
+http serves it with uvicorn on a local port (requires uvicorn).
+
+Results (throughput, p50/p95/p99/max latency, CPU time per request, RSS)
+are printed as JSON, and written to --output, together with the commit and
+settings, so runs can be compared across commits.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Gateway logging would measure stdout; production keeps it at WARNING
+os.environ.setdefault("ENVIRONMENT", "production")
+
+import httpx
+
+from app import create_app
+from benchmarks.loadgen import Recorder, access_token, closed_loop, git_commit, open_loop, rss_bytes, summarize
+from benchmarks.stub_backend import stub_payload
+from config import Config
+from utility.http_client import upstream_clients
+
+SCENARIOS = ("direct", "buffered", "streaming")
+BACKEND = "order-service"
+BACKEND_PATH = "orders/bench-1"
+GATEWAY_URL = f"/api/v1/rest/{BACKEND}/{BACKEND_PATH}"
+STUB_URL = f"http://{BACKEND}/api/v1/rest/{BACKEND_PATH}"
+
+
+class StubBackend:
+    """Backend answering every request with a fixed-size JSON body after a fixed delay"""
+
+    def __init__(self, latency: float, payload_bytes: int, chunk_bytes: int):
+        self.latency = latency
+        self.chunk_bytes = max(1, chunk_bytes)
+        self.payload = stub_payload(payload_bytes)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return httpx.Response(200, content=self._chunks(), headers={"content-type": "application/json"})
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        for start in range(0, len(self.payload), self.chunk_bytes):
+            yield self.payload[start:start + self.chunk_bytes]
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handle), timeout=upstream_clients.timeout_for(BACKEND))
+
+
+async def measure(send: Callable[[], Awaitable[int]], args: argparse.Namespace) -> dict:
+    """Warm up, then run the configured load once and summarize it"""
+    await closed_loop(send, Recorder(), args.warmup, min(args.concurrency, 8))
+
+    recorder = Recorder()
+    rss_before = rss_bytes()
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+    if args.mode == "open":
+        await open_loop(send, recorder, args.duration, args.rps, args.max_outstanding)
+    else:
+        await closed_loop(send, recorder, args.duration, args.concurrency)
+    elapsed = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    rss_after = rss_bytes()
+
+    completed = len(recorder.latencies)
+    return {
+        **summarize(recorder, elapsed),
+        # Whole process: load generator + gateway + stub (compare against "direct")
+        "cpu_us_per_request": round(cpu / completed * 1e6, 1) if completed else None,
+        "cpu_utilization": round(cpu / elapsed, 3) if elapsed else None,
+        "rss_mb": None if rss_after is None else round(rss_after / 2**20, 1),
+        "rss_growth_mb": None if None in (rss_before, rss_after) else round((rss_after - rss_before) / 2**20, 1),
+    }
+
+
+@asynccontextmanager
+async def gateway_client(args: argparse.Namespace, stub: StubBackend) -> AsyncIterator[httpx.AsyncClient]:
+    """Client for a gateway whose upstream pool for BACKEND is the stub"""
+    app = create_app()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    headers = {"authorization": f"Bearer {access_token('bench-user')}", "accept-encoding": args.accept_encoding}
+
+    def install_stub():
+        replaced = upstream_clients._clients.get(BACKEND)
+        upstream_clients._clients[BACKEND] = stub.client()
+        return replaced
+
+    if args.transport == "http":
+        import uvicorn
+
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", lifespan="on"))
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        replaced = install_stub()
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", headers=headers, limits=limits) as client:
+                yield client
+        finally:
+            if replaced is not None:
+                await replaced.aclose()
+            server.should_exit = True
+            await serving
+        return
+
+    async with app.router.lifespan_context(app):
+        replaced = install_stub()
+        if replaced is not None:
+            await replaced.aclose()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway", headers=headers, limits=limits) as client:
+            yield client
+
+
+async def run_scenario(name: str, args: argparse.Namespace) -> dict:
+    stub = StubBackend(args.latency_ms / 1000, args.payload_bytes, args.chunk_bytes)
+
+    if name == "direct":
+        async with stub.client() as client:
+            async def send() -> int:
+                response = await client.get(STUB_URL)
+                return response.status_code
+
+            return await measure(send, args)
+
+    Config.PROXY_STREAMING = name == "streaming"
+    async with gateway_client(args, stub) as client:
+        async def send() -> int:
+            response = await client.get(GATEWAY_URL)
+            return response.status_code
+
+        return await measure(send, args)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    # Measure the proxy path, not the limiter or the cache
+    Config.RATE_LIMIT_ENABLED = args.rate_limit
+    Config.RESPONSE_CACHE_ENABLED = False
+
+    results = {}
+    for name in args.scenarios:
+        results[name] = await run_scenario(name, args)
+    return {
+        "benchmark": "gateway_proxy",
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "results": results,
+    }
+
+
+def _scenarios(value: str) -> List[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", type=_scenarios, default=list(SCENARIOS))
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--concurrency", type=int, default=64, help="closed loop workers")
+    parser.add_argument("--rps", type=float, default=1000.0, help="open loop request rate")
+    parser.add_argument("--max-outstanding", type=int, default=10_000, help="open loop cap on unanswered requests")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before each scenario")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="stub backend delay")
+    parser.add_argument("--payload-bytes", type=int, default=4096, help="stub response size")
+    parser.add_argument("--chunk-bytes", type=int, default=16384, help="stub response chunk size")
+    parser.add_argument("--accept-encoding", default="identity", help="client Accept-Encoding (e.g. gzip)")
+    parser.add_argument("--rate-limit", action="store_true", help="keep rate limiting / admission on")
+    parser.add_argument("--transport", choices=("asgi", "http"), default="asgi")
+    parser.add_argument("--port", type=int, default=19102, help="port for --transport http")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    return 0 if all(result["requests"] for result in report["results"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
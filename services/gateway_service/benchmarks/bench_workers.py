@@ -0,0 +1,225 @@
+"""
+Benchmark: gateway throughput as worker processes are added
+
+Run from services/gateway_service (requires uvicorn; gunicorn optional):
+
+    python -m benchmarks.bench_workers [--workers 1,2,4,8] [--duration 10]
+                                       [--concurrency 256] [--generators 4]
+                                       [--latency-ms 5] [--payload-bytes 4096]
+                                       [--streaming] [--output scaling.json]
+
+For each worker count, the gateway is started the way production starts it
+(`python launcher.py`, GATEWAY_WORKERS=N) in front of a stub backend
+(benchmarks/stub_backend.py served by uvicorn in its own processes). The
+stub is reached through GATEWAY_UPSTREAMS_FILE. --generators load
+processes then share --concurrency closed-loop connections for --duration
+seconds. Rate limiting and the response cache are off, so the proxy path
+is measured.
+
+The JSON report has, per worker count: throughput, p50/p95/p99 latency,
+gateway CPU (cores busy and time per request), and gateway RSS (master
+plus workers, from /proc). It also has the throughput relative to the
+first worker count.
+
+Generators and stub need cores too: on an N-core host, expect the curve to
+flatten at roughly N minus the cores the generators and stub use, well
+before N workers. Run the generators on another machine to measure the
+gateway alone.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.loadgen import Recorder, access_token, closed_loop, git_commit, rss_bytes, summarize
+
+GATEWAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = "order-service"
+GATEWAY_PATH = f"/api/v1/rest/{BACKEND}/orders/bench-1"
+HEALTH_PATH = "/api/v1/rest/health"
+
+
+def _generate(url: str, token: str, concurrency: int, duration: float, warmup: float) -> Recorder:
+    """One load generator process (closed loop)"""
+
+    async def run() -> Recorder:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        headers = {"authorization": f"Bearer {token}", "accept-encoding": "identity"}
+        async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30.0) as client:
+            async def send() -> int:
+                response = await client.get(url)
+                return response.status_code
+
+            await closed_loop(send, Recorder(), warmup, concurrency)
+            recorder = Recorder()
+            await closed_loop(send, recorder, duration, concurrency)
+            return recorder
+
+    return asyncio.run(run())
+
+
+def process_tree_stats(root_pid: int) -> Dict[str, float]:
+    """CPU seconds and RSS bytes of a process and its direct children (Linux /proc)"""
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu, rss = 0.0, 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                fields = stat.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # fields[0] is the state; ppid, utime and stime are fields 4, 14 and 15 of the full line
+        if int(entry) == root_pid or int(fields[1]) == root_pid:
+            cpu += (int(fields[11]) + int(fields[12])) / ticks
+            rss += rss_bytes(entry) or 0
+    return {"cpu_s": cpu, "rss_bytes": rss}
+
+
+def _wait_until_healthy(base_url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with {process.returncode}")
+        try:
+            if httpx.get(base_url + HEALTH_PATH, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{base_url} did not become healthy within {timeout}s")
+
+
+@contextmanager
+def running(command: List[str], env: Dict[str, str], base_url: str) -> Iterator[subprocess.Popen]:
+    process = subprocess.Popen(
+        command, cwd=GATEWAY_DIR, env={**os.environ, **env}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_until_healthy(base_url, process)
+        yield process
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def run_workers(workers: int, args: argparse.Namespace, upstreams_file: str) -> dict:
+    base_url = f"http://127.0.0.1:{args.gateway_port}"
+    env = {
+        "ENVIRONMENT": "production",
+        "GATEWAY_HOST": "127.0.0.1",
+        "GATEWAY_PORT": str(args.gateway_port),
+        "GATEWAY_WORKERS": str(workers),
+        "GATEWAY_UPSTREAMS_FILE": upstreams_file,
+        "GATEWAY_RATE_LIMIT": "false",
+        "GATEWAY_RESPONSE_CACHE": "false",
+        "GATEWAY_PROXY_STREAMING": "true" if args.streaming else "false",
+    }
+    with running([sys.executable, "launcher.py"], env, base_url) as gateway:
+        per_generator = max(1, args.concurrency // args.generators)
+        jobs = [(base_url + GATEWAY_PATH, access_token("bench-user"), per_generator, args.duration, args.warmup)] * args.generators
+        with multiprocessing.get_context("spawn").Pool(args.generators) as pool:
+            pending = pool.starmap_async(_generate, jobs)
+            # Sample gateway CPU inside the measured window (after process start-up and warmup)
+            time.sleep(args.warmup + 1.0)
+            before, sampled_at = process_tree_stats(gateway.pid), time.perf_counter()
+            time.sleep(args.duration / 2)
+            after, window = process_tree_stats(gateway.pid), time.perf_counter() - sampled_at
+            recorders = pending.get()
+
+    recorder = Recorder()
+    for generator in recorders:
+        recorder.merge(generator)
+    result = summarize(recorder, args.duration)
+    cores = (after["cpu_s"] - before["cpu_s"]) / window
+    result["gateway_cpu_cores"] = round(cores, 2)
+    result["gateway_cpu_us_per_request"] = round(cores / result["throughput_rps"] * 1e6, 1) if result["throughput_rps"] else None
+    result["gateway_rss_mb"] = round(after["rss_bytes"] / 2**20, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=",".join(str(count) for count in _default_worker_counts()))
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=256, help="connections across all generators")
+    parser.add_argument("--generators", type=int, default=max(1, (os.cpu_count() or 2) // 4), help="load processes")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--payload-bytes", type=int, default=4096)
+    parser.add_argument("--stub-workers", type=int, default=2)
+    parser.add_argument("--streaming", action="store_true", help="measure the streaming proxy path")
+    parser.add_argument("--gateway-port", type=int, default=19102)
+    parser.add_argument("--stub-port", type=int, default=19300)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    worker_counts = [int(count) for count in args.workers.split(",") if count.strip()]
+
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    stub_env = {"STUB_LATENCY_MS": str(args.latency_ms), "STUB_PAYLOAD_BYTES": str(args.payload_bytes)}
+    stub_command = [
+        sys.executable, "-m", "uvicorn", "benchmarks.stub_backend:app", "--host", "127.0.0.1",
+        "--port", str(args.stub_port), "--workers", str(args.stub_workers), "--log-level", "warning",
+    ]
+
+    results = {}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as upstreams:
+        json.dump({BACKEND: [stub_url]}, upstreams)
+    try:
+        with running(stub_command, stub_env, stub_url):
+            for workers in worker_counts:
+                results[str(workers)] = run_workers(workers, args, upstreams.name)
+                print(f"{workers} workers: {results[str(workers)]['throughput_rps']} rps", file=sys.stderr)
+    finally:
+        os.unlink(upstreams.name)
+
+    baseline = results[str(worker_counts[0])]["throughput_rps"] or None
+    report = {
+        "benchmark": "gateway_workers",
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "settings": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+        "scaling": {
+            workers: round(result["throughput_rps"] / baseline, 2) if baseline else None
+            for workers, result in results.items()
+        },
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    return 0
+
+
+def _default_worker_counts() -> List[int]:
+    counts, count = [], 1
+    while count <= (os.cpu_count() or 1):
+        counts.append(count)
+        count *= 2
+    return counts
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Async load generation shared by the gateway benchmarks
+
+Closed loop: `concurrency` workers, each sending its next request once the
+previous one answered. Open loop: requests sent at a fixed rate whatever
+the answers; latency counts from the scheduled send time, so a slow
+target cannot hide behind a stalled generator (coordinated omission).
+
+Does not import the gateway app, so benchmark processes that only drive
+load stay light.
+"""
+
+import asyncio
+import os
+import subprocess
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import jwt
+
+from config import Config
+
+
+class Recorder:
+    """Latencies and outcomes of the measured requests"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+        self.missed = 0
+
+    def record(self, latency: float, status: str):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def merge(self, other: "Recorder"):
+        self.latencies.extend(other.latencies)
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.errors += other.errors
+        self.missed += other.missed
+
+
+async def closed_loop(send: Callable[[], Awaitable[int]], recorder: Recorder, duration: float, concurrency: int):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+
+    async def worker():
+        while loop.time() < deadline:
+            await _timed(send, time.perf_counter(), recorder)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def open_loop(send: Callable[[], Awaitable[int]], recorder: Recorder, duration: float, rps: float, max_outstanding: int):
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / rps
+    started = loop.time()
+    perf_offset = time.perf_counter() - started
+    outstanding = set()
+    sent = 0
+    while sent * interval < duration:
+        scheduled = started + sent * interval
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        sent += 1
+        if len(outstanding) >= max_outstanding:
+            # Counted, not queued: the generator would otherwise slow down to the target's pace
+            recorder.missed += 1
+            continue
+        task = asyncio.create_task(_timed(send, scheduled + perf_offset, recorder))
+        outstanding.add(task)
+        task.add_done_callback(outstanding.discard)
+    await asyncio.gather(*outstanding)
+
+
+async def _timed(send: Callable[[], Awaitable[int]], started: float, recorder: Recorder):
+    try:
+        status = await send()
+    except httpx.HTTPError:
+        recorder.errors += 1
+        return
+    recorder.record(time.perf_counter() - started, str(status))
+
+
+def percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return None
+    rank = max(1, round(fraction * len(ordered) + 0.5))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    """Throughput and latency percentiles of one run"""
+    completed = len(recorder.latencies)
+    ordered = sorted(recorder.latencies)
+    to_ms = lambda seconds: None if seconds is None else round(seconds * 1000, 3)
+    return {
+        "requests": completed,
+        "errors": recorder.errors,
+        "missed": recorder.missed,
+        "statuses": recorder.statuses,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": to_ms(percentile(ordered, 0.50)),
+            "p95": to_ms(percentile(ordered, 0.95)),
+            "p99": to_ms(percentile(ordered, 0.99)),
+            "max": to_ms(ordered[-1] if ordered else None),
+        },
+    }
+
+
+def rss_bytes(pid: str = "self") -> Optional[int]:
+    """Resident memory of a process (Linux /proc; None elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def access_token(user_id: str) -> str:
+    """Gateway JWT for the benchmark user"""
+    payload = {"user_id": user_id, "role": "customer", "exp": int(time.time()) + 3600}
+    return jwt.encode(payload, Config.JWT_SECRET_KEY, algorithm=Config.JWT_ALGORITHM)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
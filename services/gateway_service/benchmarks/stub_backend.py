@@ -0,0 +1,50 @@
+"""
+Stub backend served over HTTP for out-of-process gateway benchmarks
+
+    STUB_LATENCY_MS=5 STUB_PAYLOAD_BYTES=4096 \\
+        python -m uvicorn benchmarks.stub_backend:app --port 19300 --workers 2
+
+Plain ASGI (no framework) so the stub costs as little as possible: every
+request waits STUB_LATENCY_MS and gets STUB_PAYLOAD_BYTES of JSON, sent in
+STUB_CHUNK_BYTES chunks.
+"""
+
+import asyncio
+import os
+
+
+def stub_payload(payload_bytes: int) -> bytes:
+    """JSON body of (at least the envelope and) exactly payload_bytes bytes"""
+    filler = max(0, payload_bytes - len(b'{"data":""}'))
+    return b'{"data":"' + b"x" * filler + b'"}'
+
+
+def create_stub_app(latency: float, payload_bytes: int, chunk_bytes: int):
+    payload = stub_payload(payload_bytes)
+    chunks = [payload[start:start + chunk_bytes] for start in range(0, len(payload), max(1, chunk_bytes))]
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while (await receive())["type"] != "lifespan.shutdown":
+                await send({"type": "lifespan.startup.complete"})
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+        more_body = True
+        while more_body:
+            more_body = (await receive()).get("more_body", False)
+        if latency:
+            await asyncio.sleep(latency)
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+
+    return app
+
+
+app = create_stub_app(
+    float(os.getenv("STUB_LATENCY_MS", "5")) / 1000,
+    int(os.getenv("STUB_PAYLOAD_BYTES", "4096")),
+    int(os.getenv("STUB_CHUNK_BYTES", "16384")),
+)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Production launcher for the gateway
+
+    python launcher.py
+
+Runs Config.WORKERS worker processes (GATEWAY_WORKERS, default one per CPU)
+on Config.HOST:Config.PORT. Workers share nothing: each has its own event
+loop (uvloop and httptools when installed), upstream connection pools,
+caches, circuit breakers, admission slots and rate-limit buckets. Limits
+such as GATEWAY_MAX_IN_FLIGHT therefore apply per worker. Rate limits can
+be kept host-wide with GATEWAY_RATE_LIMIT_BACKEND=shared (shared-memory
+buckets), or cluster-wide with redis.
+
+With gunicorn installed, the workers run under its arbiter:
+- SIGHUP: graceful reload. New workers start with fresh code and config,
+  and the old ones finish their in-flight requests (up to
+  GATEWAY_GRACEFUL_TIMEOUT seconds) before exiting.
+- SIGTERM: graceful shutdown.
+- SIGTTIN / SIGTTOU: add or remove a worker.
+Without gunicorn, uvicorn's process manager runs the workers (no reload).
+
+This module imports nothing but Config: workers are forked from the
+launcher, and each one builds its own app, including the logging and
+tracing threads, which would not survive the fork.
+"""
+
+import os
+
+from config import Config
+
+APP_FACTORY = "app:create_app"
+
+
+def gunicorn_options(workers: int = None) -> dict:
+    return {
+        "bind": f"{Config.HOST}:{Config.PORT}",
+        "workers": workers or Config.WORKERS,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "graceful_timeout": Config.GRACEFUL_TIMEOUT,
+        # Heartbeat timeout: a worker whose event loop is blocked this long is restarted
+        "timeout": 60,
+        "keepalive": 5,
+        "proc_name": "gateway-service",
+        # Heartbeat files on tmpfs (container disks can stall the heartbeat)
+        "worker_tmp_dir": "/dev/shm" if os.path.isdir("/dev/shm") else None,
+        "on_starting": lambda arbiter: _reset_shared_state(),
+    }
+
+
+def _reset_shared_state():
+    """Each launch starts with empty shared rate-limit buckets"""
+    if Config.RATE_LIMIT_BACKEND == "shared":
+        try:
+            os.unlink(Config.RATE_LIMIT_SHARED_PATH)
+        except FileNotFoundError:
+            pass
+
+
+def run_gunicorn(workers: int = None):
+    from gunicorn.app.base import BaseApplication
+
+    class GatewayApplication(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(workers).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Runs in each worker after the fork
+            from app import create_app
+
+            return create_app()
+
+    GatewayApplication().run()
+
+
+def run_uvicorn(workers: int = None):
+    import uvicorn
+
+    _reset_shared_state()
+    uvicorn.run(
+        APP_FACTORY,
+        factory=True,
+        host=Config.HOST,
+        port=Config.PORT,
+        workers=workers or Config.WORKERS,
+        timeout_graceful_shutdown=Config.GRACEFUL_TIMEOUT,
+    )
+
+
+def main():
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        run_uvicorn()
+    else:
+        run_gunicorn()
+
+
+if __name__ == "__main__":
+    main()
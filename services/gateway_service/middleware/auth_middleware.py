@@ -3,22 +3,46 @@
 Authentication Middleware for Gateway Service
 
 Gateway에서 모든 요청에 대한 JWT 토큰 검증을 수행합니다.
+검증된 토큰은 만료 시각(exp)까지 캐시하고, 검증 실패 토큰은 잠시 negative-cache 하여
+잘못된 토큰이 몰려도 auth service 호출이 늘어나지 않도록 합니다.
 """
 
+import hashlib
+import time
+from typing import Optional
+
 import httpx
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
+from starlette.requests import HTTPConnection
 from config import Config
+from middleware.rate_limit_middleware import client_ip, in_networks
+from utility.http_client import upstream_clients
 from utility.logger import logger
+from utility.metrics import AUTH_FAILURES
+from utility.route_table import get_route
+from utility.token_cache import ExpiringLRUCache
 import jwt
 
+# 검증된 토큰 캐시 (token hash -> user info, exp 까지 유효)
+verified_tokens = ExpiringLRUCache(Config.AUTH_TOKEN_CACHE_MAX_ENTRIES)
+# 검증 실패 토큰 negative cache (token hash -> True)
+rejected_tokens = ExpiringLRUCache(Config.AUTH_NEGATIVE_CACHE_MAX_ENTRIES)
+
+# 클라이언트가 직접 보낸 값은 신뢰하지 않고 Gateway가 다시 설정
+TRUSTED_USER_HEADERS = {b"x-user-id", b"x-user-role"}
+
+# 형식은 올바르지만 gateway 키/알고리즘으로 검증할 수 없는 토큰만 auth service로 fallback
+# (형식 오류(DecodeError)나 claim 오류는 로컬에서 바로 거절: 임의 문자열이 auth service로 가지 않도록)
+FALLBACK_ERRORS = (jwt.InvalidSignatureError, jwt.InvalidAlgorithmError)
+
 
 async def auth_middleware(request: Request, call_next):
     """
     Gateway 인증 미들웨어
 
     1. Public endpoints 체크
-    2. JWT 토큰 추출 및 검증
+    2. JWT 토큰 추출 및 검증 (운영 endpoint는 내부망 또는 admin 역할)
     3. 검증된 user_id를 백엔드 서비스로 전달
     """
 
@@ -26,18 +50,32 @@ async def auth_middleware(request: Request, call_next):
     path = str(request.url.path)
     method = request.method
 
-    logger.info(f"[AUTH_MIDDLEWARE] {method} {path}")
+    logger.debug("[AUTH_MIDDLEWARE] %s %s", method, path)
 
-    # 1. Public endpoints 체크
-    if _is_public_endpoint(path, method):
-        logger.info(f"[AUTH_MIDDLEWARE] Public endpoint, auth skipped: {path}")
+    # 위조 방지: 클라이언트가 보낸 x-user-id / x-user-role 제거
+    request.scope["headers"] = [
+        (key, value) for key, value in request.scope["headers"] if key not in TRUSTED_USER_HEADERS
+    ]
+
+    # 1. Public endpoints 체크 (compiled route table)
+    route = get_route(request)
+    if route.public:
+        logger.debug("[AUTH_MIDDLEWARE] Public endpoint, auth skipped: %s", path)
+        # 로그인 사용자는 public endpoint에서도 식별 (admission 클래스 구분용, 실패해도 거절하지 않음)
+        request.state.user_id = await _optional_user_id(request)
         response = await call_next(request)
         return response
 
+    # 운영 endpoint: 내부망에서는 토큰 없이 허용, 그 외에는 admin 역할 필요 (아래 4번)
+    if route.ops and in_networks(client_ip(request), Config.OPS_ALLOWED_NETWORKS):
+        logger.debug("[AUTH_MIDDLEWARE] Operational endpoint from internal network: %s", path)
+        return await call_next(request)
+
     # 2. Authorization 헤더에서 JWT 토큰 추출
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
-        logger.warning(f"[AUTH_MIDDLEWARE] Missing or invalid Authorization header for {path}")
+        logger.warning("[AUTH_MIDDLEWARE] Missing or invalid Authorization header for %s", path)
+        AUTH_FAILURES.inc("missing_token")
         return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={"error": "Authentication required", "message": "Missing or invalid authorization header"}
@@ -49,7 +87,8 @@ async def auth_middleware(request: Request, call_next):
     try:
         user_info = await _verify_jwt_token(token)
         if not user_info:
-            logger.warning(f"[AUTH_MIDDLEWARE] Invalid token for {path}")
+            logger.warning("[AUTH_MIDDLEWARE] Invalid token for %s", path)
+            AUTH_FAILURES.inc("invalid_token")
             return JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"error": "Invalid token", "message": "Token verification failed"}
@@ -59,86 +98,136 @@ async def auth_middleware(request: Request, call_next):
         user_id = user_info.get("user_id")
         user_role = user_info.get("role", "customer")
 
-        # Request 객체에 커스텀 헤더 추가
+        if route.ops and user_role not in Config.OPS_ADMIN_ROLES:
+            logger.warning("[AUTH_MIDDLEWARE] Operational endpoint denied for role %s: %s", user_role, path)
+            AUTH_FAILURES.inc("forbidden")
+            return JSONResponse(
+                status_code=status.HTTP_403_FORBIDDEN,
+                content={"error": "Forbidden", "message": "Admin role required"}
+            )
+
         # 백엔드 서비스에서 X-User-ID, X-User-Role 헤더를 통해 인증된 사용자 정보 사용
-        request.headers.__dict__["_list"].append(
-            (b"x-user-id", str(user_id).encode())
-        )
-        request.headers.__dict__["_list"].append(
-            (b"x-user-role", user_role.encode())
-        )
+        request.scope["headers"].append((b"x-user-id", str(user_id).encode()))
+        request.scope["headers"].append((b"x-user-role", user_role.encode()))
+        request.state.user_id = str(user_id)
 
-        logger.info(f"[AUTH_MIDDLEWARE] Authentication successful - user_id: {user_id}, role: {user_role}")
+        logger.debug("[AUTH_MIDDLEWARE] Authentication successful - user_id: %s, role: %s", user_id, user_role)
 
         # 5. 인증된 요청을 백엔드 서비스로 전달
         response = await call_next(request)
         return response
 
     except jwt.ExpiredSignatureError:
-        logger.warning(f"[AUTH_MIDDLEWARE] Expired token for {path}")
+        logger.warning("[AUTH_MIDDLEWARE] Expired token for %s", path)
+        AUTH_FAILURES.inc("expired_token")
         return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={"error": "Token expired", "message": "Token has expired, please login again"}
         )
     except jwt.InvalidTokenError as e:
-        logger.warning(f"[AUTH_MIDDLEWARE] Invalid token for {path}: {str(e)}")
+        logger.warning("[AUTH_MIDDLEWARE] Invalid token for %s: %s", path, e)
+        AUTH_FAILURES.inc("invalid_token")
         return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={"error": "Invalid token", "message": "Token is invalid"}
         )
     except Exception as e:
-        logger.error(f"[AUTH_MIDDLEWARE] Authentication error for {path}: {str(e)}")
+        logger.error("[AUTH_MIDDLEWARE] Authentication error for %s: %s", path, e)
+        AUTH_FAILURES.inc("error")
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={"error": "Authentication error", "message": "Internal authentication error"}
         )
 
 
-def _is_public_endpoint(path: str, method: str) -> bool:
+async def _optional_user_id(request: Request) -> Optional[str]:
     """
-    Public endpoint 여부 확인
+    Public endpoint의 선택적 인증: 유효한 토큰이면 user_id, 아니면 None
 
-    Args:
-        path: Request path
-        method: HTTP method
+    백엔드로 전달하는 x-user-id 헤더는 추가하지 않습니다 (public 요청 처리 방식은 그대로).
+    로컬 검증만 하고 auth service fallback은 호출하지 않습니다
+    (익명 요청의 임의 토큰이 auth service 부하로 이어지지 않도록).
+    """
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    try:
+        user_info = await _verify_jwt_token(auth_header.split("Bearer ")[1], fallback=False)
+    except jwt.InvalidTokenError:
+        return None
+    return str(user_info.get("user_id")) if user_info else None
+
+
+async def authenticate_connection(connection: HTTPConnection) -> Optional[dict]:
+    """
+    WebSocket 업그레이드 요청 인증
+
+    WebSocket은 HTTP 미들웨어를 거치지 않으므로 핸드셰이크에서 한 번만 검증하고,
+    연결이 유지되는 동안에는 다시 검증하지 않습니다.
 
     Returns:
-        bool: Public endpoint 여부
+        dict: 사용자 정보 또는 None (실패 사유는 AUTH_FAILURES에 기록)
     """
-    # Exact path matching
-    if path in Config.PUBLIC_ENDPOINTS:
-        return True
-
-    # Pattern matching for dynamic paths
-    public_patterns = [
-        "/api/v1/rest/health",
-        "/api/v1/rest/auth-service/",
-        "/api/v1/rest/restaurant-service/restaurants",
-        "/api/v1/rest/menu-service/restaurants",
-        "/api/v1/rest/cart-service/"  # Cart service patterns (temporary until login implemented)
-    ]
+    path = connection.url.path
+    auth_header = connection.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        logger.warning("[AUTH_MIDDLEWARE] Missing or invalid Authorization header for %s", path)
+        AUTH_FAILURES.inc("missing_token")
+        return None
+
+    try:
+        user_info = await _verify_jwt_token(auth_header.split("Bearer ")[1])
+    except jwt.ExpiredSignatureError:
+        logger.warning("[AUTH_MIDDLEWARE] Expired token for %s", path)
+        AUTH_FAILURES.inc("expired_token")
+        return None
+    except jwt.InvalidTokenError as e:
+        logger.warning("[AUTH_MIDDLEWARE] Invalid token for %s: %s", path, e)
+        AUTH_FAILURES.inc("invalid_token")
+        return None
+    except Exception as e:
+        logger.error("[AUTH_MIDDLEWARE] Authentication error for %s: %s", path, e)
+        AUTH_FAILURES.inc("error")
+        return None
 
-    for pattern in public_patterns:
-        if path.startswith(pattern):
-            return True
+    if not user_info:
+        logger.warning("[AUTH_MIDDLEWARE] Invalid token for %s", path)
+        AUTH_FAILURES.inc("invalid_token")
+    return user_info
 
-    return False
 
+def _token_key(token: str) -> str:
+    """
+    캐시 키: 토큰 원문 대신 SHA-256 해시 사용
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
 
-async def _verify_jwt_token(token: str) -> dict:
+
+async def _verify_jwt_token(token: str, fallback: bool = True) -> dict:
     """
     JWT 토큰 검증
 
-    두 가지 방법으로 검증:
-    1. 로컬에서 직접 JWT 검증 (빠름)
-    2. Auth service를 통한 검증 (더 안전하지만 느림)
+    1. 검증 캐시 / negative cache 조회
+    2. 로컬에서 직접 JWT 검증 (빠름)
+    3. Auth service를 통한 검증 (fallback, 결과는 캐시)
+       서명/알고리즘을 로컬에서 확인할 수 없는 토큰만 해당하고, 형식이 잘못된 토큰은 바로 거절
 
     Args:
         token: JWT token
+        fallback: False면 로컬 검증 실패 시 auth service를 호출하지 않고 None
+            (negative cache에도 넣지 않음: private route에서는 fallback으로 다시 검증)
 
     Returns:
         dict: 사용자 정보 또는 None
     """
+    token_key = _token_key(token)
+
+    cached = verified_tokens.get(token_key)
+    if cached is not None:
+        return cached
+    if rejected_tokens.get(token_key):
+        return None
+
     try:
         # 방법 1: 로컬에서 직접 JWT 검증 (권장)
         payload = jwt.decode(
@@ -154,32 +243,56 @@ async def _verify_jwt_token(token: str) -> dict:
 
         if not user_id:
             logger.warning("[AUTH_MIDDLEWARE] Token missing user_id")
+            _reject(token_key)
             return None
 
-        logger.info(f"[AUTH_MIDDLEWARE] Token verified locally - user_id: {user_id}, exp: {exp}")
-        return {
+        logger.debug("[AUTH_MIDDLEWARE] Token verified locally - user_id: %s, exp: %s", user_id, exp)
+        user_info = {
             "user_id": user_id,
             "role": user_role,
             "exp": exp
         }
+        if exp:
+            verified_tokens.set(token_key, user_info, expires_at=exp)
+        return user_info
 
     except jwt.ExpiredSignatureError:
-        logger.warning("[AUTH_MIDDLEWARE] Token expired during local verification")
+        logger.debug("[AUTH_MIDDLEWARE] Token expired during local verification")
         raise
-    except jwt.InvalidTokenError as e:
-        logger.warning(f"[AUTH_MIDDLEWARE] Invalid token during local verification: {str(e)}")
+    except FALLBACK_ERRORS as e:
+        logger.debug("[AUTH_MIDDLEWARE] Token not verifiable locally: %s", e)
+        if not fallback:
+            return None
 
         # 방법 2: Auth service를 통한 검증 (fallback)
         try:
-            return await _verify_token_with_auth_service(token)
-        except Exception as fallback_error:
-            logger.error(f"[AUTH_MIDDLEWARE] Auth service verification also failed: {str(fallback_error)}")
+            user_info = await _verify_token_with_auth_service(token)
+        except AuthServiceUnavailable:
+            # 확인하지 못한 토큰은 negative cache 하지 않음 (다음 요청에서 다시 검증)
             return None
+        if not user_info:
+            _reject(token_key)
+            return None
+
+        expires_at = user_info.get("exp") or time.time() + Config.AUTH_FALLBACK_CACHE_TTL
+        verified_tokens.set(token_key, user_info, expires_at=expires_at)
+        return user_info
+    except jwt.InvalidTokenError as e:
+        # 형식 오류 / claim 오류: auth service에 묻지 않고 거절
+        logger.debug("[AUTH_MIDDLEWARE] Invalid token during local verification: %s", e)
+        return None
     except Exception as e:
-        logger.error(f"[AUTH_MIDDLEWARE] Unexpected error during token verification: {str(e)}")
+        logger.error("[AUTH_MIDDLEWARE] Unexpected error during token verification: %s", e)
         return None
 
 
+def _reject(token_key: str):
+    """
+    검증 실패 토큰 negative cache 등록
+    """
+    rejected_tokens.set(token_key, True, expires_at=time.time() + Config.AUTH_NEGATIVE_CACHE_TTL)
+
+
 async def _verify_token_with_auth_service(token: str) -> dict:
     """
     Auth service를 통한 토큰 검증 (fallback method)
@@ -188,29 +301,43 @@ async def _verify_token_with_auth_service(token: str) -> dict:
         token: JWT token
 
     Returns:
-        dict: 사용자 정보 또는 None
+        dict: 사용자 정보 또는 None (auth service가 유효하지 않다고 답한 경우)
+
+    Raises:
+        AuthServiceUnavailable: 타임아웃 / 연결 오류 / 5xx 등으로 판단하지 못한 경우
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{Config.AUTH_SERVICE_INTERNAL_URL}/api/v1/rest/verify-token",
-                json={"token": token},
-                timeout=5.0
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("valid"):
-                    user_info = result.get("user_info", {})
-                    logger.info(f"[AUTH_MIDDLEWARE] Token verified by auth service - user_id: {user_info.get('user_id')}")
-                    return user_info
-
-            logger.warning(f"[AUTH_MIDDLEWARE] Auth service token verification failed: {response.status_code}")
-            return None
-
+        client = upstream_clients.get("auth-service")
+        response = await client.post(
+            f"{Config.AUTH_SERVICE_INTERNAL_URL}/api/v1/rest/verify-token",
+            json={"token": token},
+            timeout=5.0
+        )
     except httpx.TimeoutException:
         logger.error("[AUTH_MIDDLEWARE] Auth service verification timeout")
-        return None
+        raise AuthServiceUnavailable("timeout")
     except Exception as e:
-        logger.error(f"[AUTH_MIDDLEWARE] Auth service verification error: {str(e)}")
-        return None
\ No newline at end of file
+        logger.error("[AUTH_MIDDLEWARE] Auth service verification error: %s", e)
+        raise AuthServiceUnavailable(str(e))
+
+    if response.status_code == 429 or response.status_code >= 500:
+        logger.error("[AUTH_MIDDLEWARE] Auth service unavailable: %s", response.status_code)
+        raise AuthServiceUnavailable(f"status {response.status_code}")
+
+    if response.status_code == 200:
+        try:
+            result = response.json()
+        except ValueError:
+            logger.error("[AUTH_MIDDLEWARE] Auth service returned an invalid body")
+            raise AuthServiceUnavailable("invalid body")
+        if result.get("valid"):
+            user_info = result.get("user_info", {})
+            logger.info("[AUTH_MIDDLEWARE] Token verified by auth service - user_id: %s", user_info.get("user_id"))
+            return user_info
+
+    logger.warning("[AUTH_MIDDLEWARE] Auth service token verification failed: %s", response.status_code)
+    return None
+
+
+class AuthServiceUnavailable(Exception):
+    """Auth service가 토큰 유효 여부를 답하지 못함 (결과를 캐시하지 않음)"""
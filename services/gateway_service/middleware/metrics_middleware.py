@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics Middleware for Gateway Service
+
+요청 수, 처리 중 요청 수(in-flight), 응답 헤더까지의 지연 시간을
+service / route / status 라벨로 기록합니다.
+route 라벨은 route table에 설정된 경로라서 라벨 개수가 설정 크기로 제한됩니다.
+"""
+
+import time
+
+from fastapi import Request
+from utility.metrics import IN_FLIGHT, REQUEST_DURATION, REQUESTS
+from utility.route_table import get_route
+
+
+async def metrics_middleware(request: Request, call_next):
+    """
+    Gateway metrics 미들웨어 (가장 바깥쪽에서 실행)
+    """
+    route = get_route(request)
+    service = route.service_name or "gateway"
+    route_name = route.name or "unmatched"
+
+    IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        IN_FLIGHT.dec()
+        status = str(status_code)
+        REQUESTS.inc(service, route_name, request.method, status)
+        REQUEST_DURATION.observe(elapsed, service, route_name, status)
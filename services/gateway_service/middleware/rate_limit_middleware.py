@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Rate Limit Middleware for Gateway Service
+
+토큰 버킷 기반 요청 제한과 우선순위 기반 admission control을 적용합니다.
+버킷 초과 시 즉시 429, 동시 처리 한도 초과 시 클래스별 대기열에서 기다리고
+대기열이 가득 차거나 대기 기한이 지나면 503으로 응답합니다 (낮은 클래스부터 거절).
+"""
+
+import math
+from functools import lru_cache
+from ipaddress import ip_address, ip_network
+from typing import Optional, Tuple
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from config import Config
+from model.exception import RateLimitException, ServiceOverloadedException
+from schemas.common import create_error_result
+from utility.admission import admission
+from utility.rate_limiter import rate_limiter
+from utility.route_table import RoutePolicy, get_route
+
+
+async def rate_limit_middleware(request: Request, call_next):
+    """
+    Gateway rate limit 미들웨어
+
+    1. Route budget / user / IP 버킷 체크 -> 429
+    2. 우선순위 클래스별 admission (대기열 초과 / 기한 경과 / 상위 클래스에 밀림) -> 503
+    """
+    path = request.url.path
+    if not Config.RATE_LIMIT_ENABLED or path.startswith(Config.RATE_LIMIT_EXEMPT_PREFIXES):
+        return await call_next(request)
+
+    # 1. 토큰 버킷 체크 (거절될 요청은 대기열에 넣지 않음)
+    route = get_route(request)
+    user_id = request.headers.get("x-user-id")
+    limited, retry_after = await rate_limiter.check(route, user_id, client_ip(request))
+    if limited:
+        return _error_response(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            RateLimitException(f"요청 제한에 도달했습니다 ({limited})"),
+            retry_after=retry_after,
+        )
+
+    # 2. 과부하 시 우선순위가 낮은 클래스부터 거절 (load shedding)
+    shed = await admission.acquire(admission_class(route, getattr(request.state, "user_id", None)))
+    if shed:
+        return _error_response(status.HTTP_503_SERVICE_UNAVAILABLE, ServiceOverloadedException(), retry_after=1.0)
+
+    try:
+        return await call_next(request)
+    finally:
+        admission.release()
+
+
+def admission_class(route: RoutePolicy, user_id: Optional[str]) -> str:
+    """
+    Admission 클래스: 라우트 설정 우선, 그 외는 로그인 여부로 browse / anonymous
+
+    user_id는 auth 미들웨어가 검증한 값 (public endpoint 포함)
+    """
+    if route.admission_class:
+        return route.admission_class
+    return "browse" if user_id else "anonymous"
+
+
+def client_ip(request: Request) -> str:
+    """
+    Client IP
+
+    X-Forwarded-For 는 직접 연결한 peer 가 신뢰하는 프록시(Config.TRUSTED_PROXIES)일 때만 사용하고,
+    오른쪽부터 신뢰하는 프록시를 건너뛴 첫 주소를 client 로 봅니다.
+    왼쪽 값은 client 가 임의로 넣을 수 있으므로 그대로 믿지 않습니다.
+    """
+    peer = request.client.host if request.client else "unknown"
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if not forwarded_for or not in_networks(peer, Config.TRUSTED_PROXIES):
+        return peer
+
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not in_networks(hop, Config.TRUSTED_PROXIES):
+            return hop
+    # 모든 hop 이 신뢰하는 프록시
+    return hops[0] if hops else peer
+
+
+def in_networks(address: str, networks: Tuple[str, ...]) -> bool:
+    """address 가 networks (CIDR 목록) 중 하나에 속하는지 (IP 가 아니면 False)"""
+    try:
+        ip = ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _parse_networks(networks))
+
+
+@lru_cache(maxsize=8)
+def _parse_networks(networks: Tuple[str, ...]):
+    return [ip_network(network, strict=False) for network in networks]
+
+
+def _error_response(status_code: int, exception, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content=create_error_result(exception).model_dump(),
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
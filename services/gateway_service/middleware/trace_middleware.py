@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Trace Middleware for Gateway Service
+
+모든 요청에 W3C traceparent 와 x-request-id 를 부여합니다.
+유효한 traceparent 가 들어오면 그 trace 를 이어가고, 없으면 새 trace 를 시작합니다.
+두 헤더는 요청 scope 에 다시 설정되므로 proxy / stream / batch / BFF 호출이 그대로 백엔드에 전달하고,
+x-request-id 는 응답 헤더로도 돌려줍니다.
+"""
+
+from fastapi import Request
+from utility.route_table import get_route
+from utility.tracing import TRACE_HEADERS, current_span, start_request_span
+
+
+async def trace_middleware(request: Request, call_next):
+    """
+    Gateway trace 미들웨어 (CORS 다음으로 가장 바깥쪽에서 실행)
+    """
+    route = get_route(request)
+    span = start_request_span(
+        f"{request.method} {route.name or 'unmatched'}",
+        request.headers.get("traceparent"),
+        request.headers.get("x-request-id"),
+        {"http.method": request.method, "http.target": request.url.path, "gateway.service": route.service_name or "gateway"},
+    )
+
+    # 클라이언트가 보낸 값 대신 Gateway의 span 기준으로 다시 설정
+    request.scope["headers"] = [
+        (key, value) for key, value in request.scope["headers"] if key not in TRACE_HEADERS
+    ] + [(b"traceparent", span.traceparent.encode()), (b"x-request-id", span.request_id.encode())]
+
+    token = current_span.set(span)
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["x-request-id"] = span.request_id
+        return response
+    finally:
+        current_span.reset(token)
+        span.attributes["http.status_code"] = status_code
+        span.error = status_code >= 500
+        span.end()
@@ -0,0 +1,50 @@
+"""
+Gateway Service Exception Classes
+이 모듈은 gateway_service에서 사용되는 모든 예외 클래스들을 정의함.
+"""
+
+
+class WCSException(Exception):
+    """WCS 기본 예외 클래스"""
+    code = "PTCM-E000"
+    name = "WCSException"
+
+    def __init__(self, message: str = "WCS 기본 예외가 발생했습니다"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class RateLimitException(WCSException):
+    """요청 제한 관련 예외"""
+    code = "PTCM-E429"
+    name = "RateLimitException"
+
+    def __init__(self, message: str = "요청 제한에 도달했습니다"):
+        super().__init__(message)
+
+
+class ConnectionLimitException(WCSException):
+    """동시 연결 한도 초과 (WebSocket / SSE)"""
+    code = "PTCM-E429"
+    name = "ConnectionLimitException"
+
+    def __init__(self, message: str = "동시에 열 수 있는 연결 수를 초과했습니다"):
+        super().__init__(message)
+
+
+class ServiceOverloadedException(WCSException):
+    """게이트웨이 과부하 (동시 처리 한도 초과)"""
+    code = "PTCM-E503"
+    name = "ServiceOverloadedException"
+
+    def __init__(self, message: str = "요청이 많아 잠시 후 다시 시도해 주세요"):
+        super().__init__(message)
+
+
+class UnknownException(WCSException):
+    """알 수 없는 예외"""
+    code = "PTCM-E999"
+    name = "UnknownException"
+
+    def __init__(self, message: str = "알 수 없는 오류가 발생했습니다"):
+        super().__init__(message)
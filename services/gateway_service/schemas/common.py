@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Any, Optional
+from model.exception import WCSException
 
 class GatewayResponse(BaseModel):
     """Standard gateway response format"""
@@ -10,4 +11,24 @@ class GatewayResponse(BaseModel):
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
-    service: str
\ No newline at end of file
+    service: str
+
+class ErrorDto(BaseModel):
+    """에러 정보를 담는 Pydantic 모델"""
+    code: str = Field(..., description="에러 코드")
+    name: str = Field(..., description="에러 이름")
+    message: str = Field(..., description="에러 메시지")
+
+class ResultDto(BaseModel):
+    """결과를 담는 Pydantic 모델 (성공/실패 통합)"""
+    data: Any = Field(None, description="성공 데이터")
+    error: Optional[ErrorDto] = Field(None, description="에러 정보")
+
+def create_error_result(exception: WCSException) -> ResultDto:
+    """에러 결과 생성"""
+    error = ErrorDto(
+        code=exception.code,
+        name=exception.name,
+        message=exception.message
+    )
+    return ResultDto(error=error)
\ No newline at end of file
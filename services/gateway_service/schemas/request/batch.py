@@ -0,0 +1,55 @@
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+from config import Config
+
+
+class BatchSubRequestDto(BaseModel):
+    """배치 내 개별 요청"""
+    id: Optional[str] = Field(None, description="요청 ID (depends_on 참조용, 기본값은 배열 인덱스)")
+    method: Literal["GET", "POST", "PUT", "DELETE", "PATCH"] = Field("GET", description="HTTP 메서드")
+    service: str = Field(..., description="대상 서비스 (예: cart-service)")
+    path: str = Field("", description="서비스 내 경로 (예: cart)")
+    query: Optional[Dict[str, Any]] = Field(None, description="쿼리 파라미터")
+    body: Any = Field(None, description="JSON 요청 본문")
+    depends_on: List[str] = Field(default_factory=list, description="먼저 성공해야 하는 요청 ID 목록")
+
+
+class BatchRequestDto(BaseModel):
+    """배치 요청"""
+    requests: List[BatchSubRequestDto] = Field(..., min_length=1, description="개별 요청 목록")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="동시 실행 수 (서버 상한 이내)")
+
+    @model_validator(mode="after")
+    def check_requests(self):
+        if len(self.requests) > Config.BATCH_MAX_REQUESTS:
+            raise ValueError(f"At most {Config.BATCH_MAX_REQUESTS} requests per batch")
+
+        for index, sub_request in enumerate(self.requests):
+            if sub_request.id is None:
+                sub_request.id = str(index)
+
+        dependencies = {sub_request.id: sub_request.depends_on for sub_request in self.requests}
+        if len(dependencies) != len(self.requests):
+            raise ValueError("Request ids must be unique")
+        for request_id, depends_on in dependencies.items():
+            unknown = set(depends_on) - set(dependencies)
+            if unknown:
+                raise ValueError(f"Request '{request_id}' depends on unknown ids: {sorted(unknown)}")
+
+        # Dependency graph must be acyclic (depth-first search)
+        done, visiting = set(), set()
+
+        def visit(request_id: str):
+            if request_id in done:
+                return
+            if request_id in visiting:
+                raise ValueError(f"Dependency cycle through request '{request_id}'")
+            visiting.add(request_id)
+            for dependency in dependencies[request_id]:
+                visit(dependency)
+            visiting.discard(request_id)
+            done.add(request_id)
+
+        for request_id in dependencies:
+            visit(request_id)
+        return self
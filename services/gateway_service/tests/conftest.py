@@ -0,0 +1,91 @@
+"""
+Pytest configuration and common fixtures for gateway service tests
+"""
+
+import os
+import sys
+import time
+
+import httpx
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+# Gateway modules import each other as top-level packages (config, utility, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from middleware.auth_middleware import rejected_tokens, verified_tokens
+from utility.admission import admission
+from utility.circuit_breaker import circuit_breakers
+from utility.http_client import upstream_clients
+from utility.realtime import realtime_connections
+from utility.response_cache import response_cache
+from utility.retry_policy import latency_tracker, retry_budget
+
+
+@pytest.fixture(autouse=True)
+def reset_gateway_state():
+    """Each test starts with empty caches, closed circuits and a fresh retry budget."""
+    resets = (
+        response_cache.clear, circuit_breakers.reset, verified_tokens.clear, rejected_tokens.clear,
+        retry_budget.reset, latency_tracker.clear, realtime_connections.reset, admission.reset,
+    )
+    for reset in resets:
+        reset()
+    yield
+    for reset in resets:
+        reset()
+
+
+def make_token(user_id: str = "user-123", role: str = "customer", expires_in: int = 900, secret: str = None) -> str:
+    """Sign a gateway JWT for tests."""
+    payload = {"user_id": user_id, "role": role, "exp": int(time.time()) + expires_in}
+    return jwt.encode(payload, secret or Config.JWT_SECRET_KEY, algorithm=Config.JWT_ALGORITHM)
+
+
+@pytest.fixture(scope="function")
+def mock_upstream():
+    """
+    Replace pooled upstream clients with in-memory mock transports.
+
+    Usage: mock_upstream("menu-service", handler) where handler takes an
+    httpx.Request and returns an httpx.Response.
+    """
+    installed = []
+
+    def install(service_name, handler):
+        upstream_clients._clients[service_name] = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler),
+            timeout=upstream_clients.timeout_for(service_name),
+        )
+        installed.append(service_name)
+
+    yield install
+
+    for service_name in installed:
+        upstream_clients._clients.pop(service_name, None)
+
+
+@pytest.fixture(scope="function")
+def client():
+    """Create an authenticated test client for the gateway app."""
+    with TestClient(create_app()) as test_client:
+        test_client.headers["Authorization"] = f"Bearer {make_token()}"
+        yield test_client
+
+
+@pytest.fixture(scope="function")
+def admin_client():
+    """Create a test client with an admin token (gateway operational endpoints)."""
+    with TestClient(create_app()) as test_client:
+        test_client.headers["Authorization"] = f"Bearer {make_token('admin-1', role='admin')}"
+        yield test_client
+
+
+@pytest.fixture(scope="function")
+def anonymous_client():
+    """Create a test client without credentials."""
+    with TestClient(create_app()) as test_client:
+        yield test_client
@@ -0,0 +1,116 @@
+"""
+Test cases for priority admission control
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from utility.admission import AdmissionController, admission
+
+CLASSES = {
+    "checkout": {"priority": 0, "share": 1.0, "max_queue": 10, "deadline": 1.0},
+    "cart": {"priority": 1, "share": 1.0, "max_queue": 10, "deadline": 1.0},
+    "anonymous": {"priority": 3, "share": 0.5, "max_queue": 2, "deadline": 0.05},
+}
+
+
+def _controller(capacity: int = 1, max_queued: int = 100) -> AdmissionController:
+    return AdmissionController(capacity=capacity, classes=CLASSES, max_queued=max_queued)
+
+
+class TestAdmissionController:
+    """Test cases for AdmissionController"""
+
+    @pytest.mark.asyncio
+    async def test_freed_slot_goes_to_highest_class(self):
+        controller = _controller(capacity=2)
+        assert await controller.acquire("checkout") is None
+        assert await controller.acquire("cart") is None
+
+        order = []
+
+        async def wait(class_name):
+            await controller.acquire(class_name)
+            order.append(class_name)
+
+        cart = asyncio.create_task(wait("cart"))
+        await asyncio.sleep(0)
+        checkout = asyncio.create_task(wait("checkout"))
+        await asyncio.sleep(0)
+        assert controller.queued == 2
+
+        controller.release()
+        controller.release()
+        await asyncio.gather(cart, checkout)
+
+        assert order == ["checkout", "cart"]
+        assert controller.in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_lower_class_leaves_headroom(self):
+        """Anonymous requests may fill only their share; checkout still starts at once"""
+        controller = _controller(capacity=4)
+        assert [await controller.acquire("anonymous") for _ in range(2)] == [None, None]
+
+        assert await controller.acquire("anonymous") == "deadline"
+        assert await controller.acquire("checkout") is None
+
+    @pytest.mark.asyncio
+    async def test_full_class_queue_is_shed(self):
+        controller = _controller(capacity=0)
+        waiters = [asyncio.create_task(controller.acquire("anonymous")) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        assert await controller.acquire("anonymous") == "queue_full"
+        assert await asyncio.gather(*waiters) == ["deadline", "deadline"]
+        assert controller.snapshot()["classes"]["anonymous"]["shed"] == {"queue_full": 1, "deadline": 2, "shed": 0}
+
+    @pytest.mark.asyncio
+    async def test_lowest_class_is_shed_for_higher(self):
+        """With the gateway queue full, the newest anonymous waiter makes room for checkout"""
+        controller = _controller(capacity=1, max_queued=2)
+        await controller.acquire("checkout")
+        anonymous = [asyncio.create_task(controller.acquire("anonymous")) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        checkout = asyncio.create_task(controller.acquire("checkout"))
+        await asyncio.sleep(0)
+
+        assert await anonymous[1] == "shed"
+        controller.release()
+        assert await checkout is None
+        assert await anonymous[0] == "deadline"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        controller = _controller(capacity=1)
+        await controller.acquire("cart")
+        waiter = asyncio.create_task(controller.acquire("cart"))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        controller.release()
+
+        assert controller.queued == 0
+        assert controller.in_flight == 0
+
+
+class TestAdmissionMiddleware:
+    """Test cases for admission classes of proxied requests"""
+
+    def test_routes_are_classified(self, client, anonymous_client, mock_upstream):
+        mock_upstream("cart-service", lambda request: httpx.Response(200, json={}))
+        mock_upstream("order-service", lambda request: httpx.Response(200, json={}))
+        mock_upstream("restaurant-service", lambda request: httpx.Response(200, json={}))
+
+        client.get("/api/v1/rest/cart-service/cart")
+        client.get("/api/v1/rest/order-service/orders/my")
+        client.get("/api/v1/rest/restaurant-service/restaurants")
+        anonymous_client.get("/api/v1/rest/restaurant-service/restaurants")
+
+        admitted = {name: stats["admitted"] for name, stats in admission.snapshot()["classes"].items()}
+        assert admitted == {"checkout": 1, "cart": 1, "browse": 1, "anonymous": 1}
+        assert admission.in_flight == 0
@@ -0,0 +1,171 @@
+"""
+Test cases for the gateway JWT auth middleware
+"""
+
+import httpx
+import jwt
+from fastapi import status
+
+from middleware import auth_middleware
+from tests.conftest import make_token
+from utility.route_table import route_table
+
+
+class TestAuthMiddleware:
+    """Test cases for auth_middleware"""
+
+    def test_private_route_requires_token(self, anonymous_client):
+        """Private routes reject requests without a bearer token"""
+        response = anonymous_client.get("/api/v1/rest/order-service/orders")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_verified_user_is_forwarded(self, anonymous_client, mock_upstream):
+        """Backend receives the token's user, not a client-supplied one"""
+        received = {}
+
+        def handler(request: httpx.Request):
+            received["user_id"] = request.headers.get("x-user-id")
+            return httpx.Response(200, json={"orders": []})
+
+        mock_upstream("order-service", handler)
+
+        response = anonymous_client.get(
+            "/api/v1/rest/order-service/orders",
+            headers={"Authorization": f"Bearer {make_token('user-1')}", "x-user-id": "someone-else"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert received["user_id"] == "user-1"
+
+    def test_verified_token_is_cached(self, anonymous_client, mock_upstream, monkeypatch):
+        """A token is decoded once and then served from the verified-token cache"""
+        mock_upstream("order-service", lambda request: httpx.Response(200, json={}))
+        decode_calls = []
+        original_decode = jwt.decode
+
+        def counting_decode(*args, **kwargs):
+            decode_calls.append(1)
+            return original_decode(*args, **kwargs)
+
+        monkeypatch.setattr(jwt, "decode", counting_decode)
+        headers = {"Authorization": f"Bearer {make_token('user-1')}"}
+
+        for _ in range(3):
+            assert anonymous_client.get("/api/v1/rest/order-service/orders", headers=headers).status_code == 200
+
+        assert len(decode_calls) == 1
+        assert len(auth_middleware.verified_tokens) == 1
+
+    def test_expired_token(self, anonymous_client):
+        """Expired tokens get 401 and are not cached"""
+        token = make_token(expires_in=-10)
+
+        response = anonymous_client.get(
+            "/api/v1/rest/order-service/orders",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()["error"] == "Token expired"
+        assert len(auth_middleware.verified_tokens) == 0
+
+    def test_bad_tokens_are_negative_cached(self, anonymous_client, mock_upstream):
+        """A flood of one bad token reaches auth-service only once"""
+        auth_calls = []
+
+        def auth_handler(request: httpx.Request):
+            auth_calls.append(1)
+            return httpx.Response(200, json={"valid": False})
+
+        mock_upstream("auth-service", auth_handler)
+        headers = {"Authorization": f"Bearer {make_token(secret='not-the-gateway-secret-but-long-enough')}"}
+
+        statuses = [
+            anonymous_client.get("/api/v1/rest/order-service/orders", headers=headers).status_code
+            for _ in range(5)
+        ]
+
+        assert statuses == [status.HTTP_401_UNAUTHORIZED] * 5
+        assert len(auth_calls) == 1
+
+    def test_auth_service_outage_is_not_negative_cached(self, anonymous_client, mock_upstream):
+        """Timeouts / 5xx from auth-service don't lock a token out for the negative-cache TTL"""
+        auth_calls = []
+
+        def auth_handler(request: httpx.Request):
+            auth_calls.append(1)
+            if len(auth_calls) == 1:
+                raise httpx.ConnectTimeout("auth-service down", request=request)
+            if len(auth_calls) == 2:
+                return httpx.Response(503, text="unavailable")
+            return httpx.Response(200, json={"valid": True, "user_info": {"user_id": "user-9"}})
+
+        mock_upstream("auth-service", auth_handler)
+        mock_upstream("order-service", lambda request: httpx.Response(200, json={}))
+        headers = {"Authorization": f"Bearer {make_token(secret='not-the-gateway-secret-but-long-enough')}"}
+
+        statuses = [
+            anonymous_client.get("/api/v1/rest/order-service/orders", headers=headers).status_code
+            for _ in range(3)
+        ]
+
+        assert statuses == [status.HTTP_401_UNAUTHORIZED, status.HTTP_401_UNAUTHORIZED, status.HTTP_200_OK]
+        assert len(auth_calls) == 3
+        assert len(auth_middleware.rejected_tokens) == 0
+
+    def test_public_route_never_calls_auth_service(self, anonymous_client, mock_upstream):
+        """Junk tokens on public routes are decoded locally only and the request stays anonymous"""
+        auth_calls = []
+        mock_upstream("auth-service", lambda request: auth_calls.append(1) or httpx.Response(200, json={"valid": False}))
+        mock_upstream("restaurant-service", lambda request: httpx.Response(200, json={"data": []}))
+
+        for index in range(3):
+            response = anonymous_client.get(
+                "/api/v1/rest/restaurant-service/restaurants",
+                headers={"Authorization": f"Bearer junk-{index}"},
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        assert auth_calls == []
+        assert len(auth_middleware.rejected_tokens) == 0
+
+    def test_malformed_tokens_are_rejected_locally(self, anonymous_client, mock_upstream):
+        """Tokens that aren't well-formed JWTs never reach auth-service, even on private routes"""
+        auth_calls = []
+        mock_upstream("auth-service", lambda request: auth_calls.append(1) or httpx.Response(200, json={"valid": True}))
+
+        for token in ("junk-1", "junk-2", "a.b.c", f"x{make_token()}"):
+            response = anonymous_client.get(
+                "/api/v1/rest/order-service/orders",
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        assert auth_calls == []
+
+
+class TestOperationalEndpoints:
+    """Test cases for gateway operational endpoints (/api/v1/rest/gateway/*, /metrics)"""
+
+    def test_anonymous_caller_is_rejected(self, anonymous_client):
+        for path in ("/api/v1/rest/gateway/upstreams", "/api/v1/rest/gateway/pool-stats", "/metrics"):
+            assert anonymous_client.get(path).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_non_admin_token_is_forbidden(self, client):
+        for path in ("/api/v1/rest/gateway/upstreams", "/metrics"):
+            assert client.get(path).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_admin_token_is_allowed(self, admin_client):
+        assert admin_client.get("/api/v1/rest/gateway/upstreams").status_code == status.HTTP_200_OK
+
+    def test_internal_network_needs_no_token(self, anonymous_client, monkeypatch):
+        monkeypatch.setattr(auth_middleware, "client_ip", lambda request: "127.0.0.1")
+
+        assert anonymous_client.get("/api/v1/rest/gateway/circuit-stats").status_code == status.HTTP_200_OK
+        assert anonymous_client.get("/metrics").status_code == status.HTTP_200_OK
+
+    def test_health_and_bff_stay_public(self):
+        assert route_table.match_path("/api/v1/rest/health").public
+        assert route_table.match_path("/api/v1/rest/bff/restaurants/r1").public
+        assert not route_table.match_path("/api/v1/rest/gateway/upstreams").public
@@ -0,0 +1,153 @@
+"""
+Test cases for the batch endpoint
+"""
+
+import asyncio
+import json
+
+import httpx
+from fastapi import status
+
+from config import Config
+
+BATCH_URL = "/api/v1/rest/batch"
+
+
+class TestBatch:
+    """Test cases for /batch"""
+
+    def test_results_keep_request_order(self, client, mock_upstream):
+        """Sub-requests are proxied with the caller's identity and answered in order"""
+        def cart_handler(request: httpx.Request):
+            return httpx.Response(200, json={"user": request.headers["x-user-id"], "path": request.url.path})
+
+        def user_handler(request: httpx.Request):
+            return httpx.Response(200, json={"me": True})
+
+        mock_upstream("cart-service", cart_handler)
+        mock_upstream("user-service", user_handler)
+
+        response = client.post(BATCH_URL, json={"requests": [
+            {"service": "cart-service", "path": "cart"},
+            {"id": "me", "service": "user-service", "path": "users/me"},
+        ]})
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert [result["id"] for result in results] == ["0", "me"]
+        assert results[0]["body"] == {"user": "user-123", "path": "/api/v1/rest/cart"}
+        assert results[1] == {"id": "me", "status_code": 200, "body": {"me": True}}
+
+    def test_body_and_query_are_forwarded(self, client, mock_upstream):
+        """JSON body and query params reach the backend"""
+        received = {}
+
+        def handler(request: httpx.Request):
+            received["body"] = json.loads(request.read())
+            received["content-type"] = request.headers["content-type"]
+            received["query"] = dict(request.url.params)
+            return httpx.Response(201, json={"ok": True})
+
+        mock_upstream("cart-service", handler)
+
+        response = client.post(BATCH_URL, json={"requests": [
+            {"method": "POST", "service": "cart-service", "path": "cart/items", "query": {"dry_run": "1"}, "body": {"quantity": 2}},
+        ]})
+
+        assert response.json()["results"][0]["status_code"] == status.HTTP_201_CREATED
+        assert received == {"body": {"quantity": 2}, "content-type": "application/json", "query": {"dry_run": "1"}}
+
+    def test_sub_requests_run_concurrently_up_to_cap(self, client, mock_upstream):
+        """No more than max_concurrency sub-requests are in flight at once"""
+        in_flight = {"now": 0, "peak": 0}
+
+        async def handler(request: httpx.Request):
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.02)
+            in_flight["now"] -= 1
+            return httpx.Response(200, json={})
+
+        mock_upstream("order-service", handler)
+
+        response = client.post(BATCH_URL, json={
+            "max_concurrency": 2,
+            "requests": [{"service": "order-service", "path": f"orders/{i}"} for i in range(6)],
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        assert in_flight["peak"] == 2
+
+    def test_dependencies_run_first(self, client, mock_upstream):
+        """A sub-request starts only after its dependency finished"""
+        calls = []
+
+        async def handler(request: httpx.Request):
+            calls.append(f"start {request.method}")
+            if request.method == "POST":
+                await asyncio.sleep(0.05)
+            calls.append(f"end {request.method}")
+            return httpx.Response(200, json={})
+
+        mock_upstream("cart-service", handler)
+
+        response = client.post(BATCH_URL, json={"requests": [
+            {"service": "cart-service", "path": "cart", "depends_on": ["add"]},
+            {"id": "add", "method": "POST", "service": "cart-service", "path": "cart/items", "body": {}},
+        ]})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert calls == ["start POST", "end POST", "start GET", "end GET"]
+
+    def test_failed_dependency_skips_dependents(self, client, mock_upstream):
+        """Dependents of a failed sub-request are answered with 424 without being sent"""
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(request.method)
+            return httpx.Response(400, text="bad item")
+
+        mock_upstream("cart-service", handler)
+
+        response = client.post(BATCH_URL, json={"requests": [
+            {"id": "add", "method": "POST", "service": "cart-service", "path": "cart/items", "body": {}},
+            {"service": "cart-service", "path": "cart", "depends_on": ["add"]},
+        ]})
+
+        results = response.json()["results"]
+        assert results[0]["status_code"] == status.HTTP_400_BAD_REQUEST
+        assert results[1]["status_code"] == status.HTTP_424_FAILED_DEPENDENCY
+        assert calls == ["POST"]
+
+    def test_unknown_service_fails_only_its_entry(self, client, mock_upstream):
+        """Gateway-local or unknown services are not reachable through a batch"""
+        mock_upstream("cart-service", lambda request: httpx.Response(200, json={}))
+
+        response = client.post(BATCH_URL, json={"requests": [
+            {"service": "batch"},
+            {"service": "cart-service", "path": "cart"},
+        ]})
+
+        results = response.json()["results"]
+        assert results[0]["status_code"] == status.HTTP_404_NOT_FOUND
+        assert results[1]["status_code"] == status.HTTP_200_OK
+
+    def test_dependency_cycle_is_rejected(self, client):
+        response = client.post(BATCH_URL, json={"requests": [
+            {"id": "a", "service": "cart-service", "depends_on": ["b"]},
+            {"id": "b", "service": "cart-service", "depends_on": ["a"]},
+        ]})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_oversized_batch_is_rejected(self, client):
+        requests = [{"service": "cart-service"}] * (Config.BATCH_MAX_REQUESTS + 1)
+
+        response = client.post(BATCH_URL, json={"requests": requests})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_requires_authentication(self, anonymous_client):
+        response = anonymous_client.post(BATCH_URL, json={"requests": [{"service": "cart-service"}]})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,157 @@
+"""
+Test cases for the restaurant page aggregation endpoint
+"""
+
+import asyncio
+
+import httpx
+from fastapi import status
+
+from config import Config
+
+PAGE_URL = "/api/v1/rest/bff/restaurants/r1"
+
+
+def _result(data):
+    return httpx.Response(200, json={"data": data, "error": None})
+
+
+def _restaurant_handler(request: httpx.Request):
+    if request.url.path.endswith("/images"):
+        return _result([{"url": "a.jpg"}])
+    return _result({"id": "r1", "name": "Kimbap House"})
+
+
+def _menu_handler(request: httpx.Request):
+    if request.url.path.endswith("/categories"):
+        return _result([{"id": "c1"}])
+    return _result([{"id": "m1"}])
+
+
+def _review_handler(request: httpx.Request):
+    return _result({"reviews": [], "page": int(request.url.params["page"])})
+
+
+class TestRestaurantPage:
+    """Test cases for /bff/restaurants/{restaurant_id}"""
+
+    def test_parts_are_merged(self, anonymous_client, mock_upstream):
+        """All parts are unwrapped from ResultDto and merged; no login needed"""
+        mock_upstream("restaurant-service", _restaurant_handler)
+        mock_upstream("menu-service", _menu_handler)
+        mock_upstream("review-service", _review_handler)
+
+        response = anonymous_client.get(PAGE_URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["partial_errors"] == {}
+        assert body["data"] == {
+            "restaurant": {"id": "r1", "name": "Kimbap House"},
+            "images": [{"url": "a.jpg"}],
+            "menus": [{"id": "m1"}],
+            "categories": [{"id": "c1"}],
+            "reviews": {"reviews": [], "page": 1},
+        }
+
+    def test_unchanged_page_gets_304(self, anonymous_client, mock_upstream):
+        """The aggregated page carries an ETag clients can revalidate with"""
+        mock_upstream("restaurant-service", _restaurant_handler)
+        mock_upstream("menu-service", _menu_handler)
+        mock_upstream("review-service", _review_handler)
+
+        etag = anonymous_client.get(PAGE_URL).headers["etag"]
+        response = anonymous_client.get(PAGE_URL, headers={"if-none-match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_parts_are_fetched_concurrently(self, anonymous_client, mock_upstream):
+        """Every upstream call is in flight before any of them completes"""
+        started = []
+        all_started = asyncio.Event()
+
+        def concurrent(handler):
+            async def wrapped(request: httpx.Request):
+                started.append(request.url.path)
+                if len(started) == len(Config.BFF_RESTAURANT_PAGE_PARTS):
+                    all_started.set()
+                await asyncio.wait_for(all_started.wait(), timeout=1.0)
+                return handler(request)
+            return wrapped
+
+        mock_upstream("restaurant-service", concurrent(_restaurant_handler))
+        mock_upstream("menu-service", concurrent(_menu_handler))
+        mock_upstream("review-service", concurrent(_review_handler))
+
+        response = anonymous_client.get(PAGE_URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["partial_errors"] == {}
+        assert len(started) == 5
+
+    def test_slow_optional_part_is_reported(self, anonymous_client, mock_upstream, monkeypatch):
+        """A part past its deadline is null with a 504 entry; the rest still render"""
+        parts = {name: dict(spec) for name, spec in Config.BFF_RESTAURANT_PAGE_PARTS.items()}
+        parts["reviews"]["timeout"] = 0.05
+        monkeypatch.setattr(Config, "BFF_RESTAURANT_PAGE_PARTS", parts)
+
+        async def slow_reviews(request: httpx.Request):
+            await asyncio.sleep(1.0)
+            return _review_handler(request)
+
+        mock_upstream("restaurant-service", _restaurant_handler)
+        mock_upstream("menu-service", _menu_handler)
+        mock_upstream("review-service", slow_reviews)
+
+        response = anonymous_client.get(PAGE_URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["data"]["reviews"] is None
+        assert body["data"]["menus"] == [{"id": "m1"}]
+        assert body["partial_errors"]["reviews"]["status_code"] == status.HTTP_504_GATEWAY_TIMEOUT
+
+    def test_failed_optional_part_is_reported(self, anonymous_client, mock_upstream):
+        """Backend errors on optional parts do not fail the page"""
+        mock_upstream("restaurant-service", _restaurant_handler)
+        mock_upstream("menu-service", lambda request: httpx.Response(500, text="boom"))
+        mock_upstream("review-service", _review_handler)
+
+        response = anonymous_client.get(PAGE_URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["data"]["restaurant"]["id"] == "r1"
+        assert body["data"]["menus"] is None
+        assert body["partial_errors"]["menus"]["status_code"] == 500
+        assert body["partial_errors"]["categories"]["status_code"] == 500
+
+    def test_business_error_on_required_part_is_passed_through(self, anonymous_client, mock_upstream):
+        """An unknown restaurant returns the backend's ErrorDto instead of an empty page"""
+        error = {"code": "PTCM-E301", "name": "RestaurantNotFound", "message": "not found"}
+
+        def restaurant_handler(request: httpx.Request):
+            if request.url.path.endswith("/images"):
+                return _result([])
+            return httpx.Response(200, json={"data": None, "error": error})
+
+        mock_upstream("restaurant-service", restaurant_handler)
+        mock_upstream("menu-service", _menu_handler)
+        mock_upstream("review-service", _review_handler)
+
+        response = anonymous_client.get(PAGE_URL)
+
+        assert response.json() == {"data": None, "error": error}
+
+    def test_unreachable_required_part_fails_the_page(self, anonymous_client, mock_upstream):
+        """Connection errors on the restaurant itself surface as 503"""
+        def unreachable(request: httpx.Request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        mock_upstream("restaurant-service", unreachable)
+        mock_upstream("menu-service", _menu_handler)
+        mock_upstream("review-service", _review_handler)
+
+        response = anonymous_client.get(PAGE_URL)
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
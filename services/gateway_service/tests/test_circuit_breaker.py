@@ -0,0 +1,160 @@
+"""
+Test cases for the per-upstream circuit breaker
+"""
+
+import httpx
+from fastapi import status
+
+from config import Config
+from utility.circuit_breaker import CircuitBreaker, circuit_breakers
+from utility.enums import CircuitState
+
+SETTINGS = {
+    "window_seconds": 30.0,
+    "min_calls": 4,
+    "error_rate_threshold": 0.5,
+    "slow_call_seconds": 1.0,
+    "slow_rate_threshold": 0.75,
+    "open_seconds": 10.0,
+    "half_open_max_calls": 2,
+}
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker"""
+
+    def test_trips_on_error_rate(self):
+        """Error rate above threshold opens the circuit"""
+        breaker = CircuitBreaker("review-service", SETTINGS)
+
+        for status_code in (200, 500, 200, 503):
+            assert breaker.allow_request()
+            breaker.record_result(status_code, latency=0.01)
+
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.allow_request() is False
+
+    def test_needs_min_calls(self):
+        """A couple of failures on low traffic don't trip the circuit"""
+        breaker = CircuitBreaker("review-service", SETTINGS)
+
+        breaker.record_failure(latency=0.01)
+        breaker.record_failure(latency=0.01)
+
+        assert breaker.state is CircuitState.CLOSED
+
+    def test_old_calls_leave_the_window(self, monkeypatch):
+        """Failures older than the window stop counting towards the rates"""
+        breaker = CircuitBreaker("review-service", SETTINGS)
+        now = [1000.0]
+        monkeypatch.setattr("utility.circuit_breaker.time.monotonic", lambda: now[0])
+
+        for _ in range(3):
+            breaker.record_failure(latency=0.01)
+        now[0] += SETTINGS["window_seconds"] + 1
+        for _ in range(3):
+            breaker.record_success(latency=0.01)
+        breaker.record_failure(latency=0.01)
+
+        assert breaker.state is CircuitState.CLOSED
+        snapshot = breaker.snapshot()
+        assert snapshot["calls"] == 4
+        assert snapshot["error_rate"] == 0.25
+
+    def test_trips_on_slow_calls(self):
+        """Latency threshold opens the circuit even when responses succeed"""
+        breaker = CircuitBreaker("review-service", SETTINGS)
+
+        for _ in range(4):
+            breaker.record_success(latency=2.0)
+
+        assert breaker.state is CircuitState.OPEN
+
+    def test_half_open_probes_close_circuit(self):
+        """After open_seconds, successful probes close the circuit"""
+        breaker = CircuitBreaker("review-service", SETTINGS)
+        for _ in range(4):
+            breaker.record_failure(latency=0.01)
+        breaker.opened_at -= SETTINGS["open_seconds"]
+
+        assert breaker.allow_request() is True
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False  # probe slots exhausted
+
+        breaker.record_success(latency=0.01)
+        breaker.record_success(latency=0.01)
+
+        assert breaker.state is CircuitState.CLOSED
+
+    def test_half_open_failure_reopens(self):
+        """A failed probe re-opens the circuit"""
+        breaker = CircuitBreaker("review-service", SETTINGS)
+        for _ in range(4):
+            breaker.record_failure(latency=0.01)
+        breaker.opened_at -= SETTINGS["open_seconds"]
+
+        breaker.allow_request()
+        breaker.record_failure(latency=0.01)
+
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.times_opened == 2
+
+
+class TestCircuitBreakerProxy:
+    """Test cases for fast-fail through the gateway"""
+
+    def test_open_circuit_fails_fast(self, client, mock_upstream, monkeypatch):
+        """Once tripped, requests get 503 without reaching the backend"""
+        monkeypatch.setattr(Config, "CIRCUIT_BREAKER", {**Config.CIRCUIT_BREAKER, "min_calls": 3})
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(1)
+            raise httpx.ConnectError("connection refused", request=request)
+
+        mock_upstream("review-service", handler)
+
+        statuses = [client.get("/api/v1/rest/review-service/reviews/1").status_code for _ in range(5)]
+
+        assert statuses == [503] * 5
+        assert len(calls) == 3
+        assert circuit_breakers.get("review-service").state is CircuitState.OPEN
+
+    def test_other_services_unaffected(self, client, mock_upstream):
+        """An open circuit on one service doesn't affect another"""
+        breaker = circuit_breakers.get("review-service")
+        breaker._transition(CircuitState.OPEN)
+        mock_upstream("cart-service", lambda request: httpx.Response(200, json={"data": None}))
+
+        response = client.get("/api/v1/rest/cart-service/cart")
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_unexpected_error_releases_half_open_probe(self, client, mock_upstream):
+        """A probe that dies with a non-httpx error doesn't leave the circuit stuck half-open"""
+        breaker = circuit_breakers.get("review-service")
+        breaker._transition(CircuitState.OPEN)
+        breaker.opened_at -= breaker.open_seconds
+
+        def handler(request: httpx.Request):
+            raise RuntimeError("unexpected")
+
+        mock_upstream("review-service", handler)
+
+        for _ in range(breaker.half_open_max_calls + 1):
+            try:
+                client.get("/api/v1/rest/review-service/reviews/1")
+            except RuntimeError:
+                pass
+
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert breaker._half_open_in_flight == 0
+        assert breaker.rejected == 0
+
+    def test_circuit_stats_endpoint(self, admin_client):
+        """Circuit states are exposed on the gateway"""
+        response = admin_client.get("/api/v1/rest/gateway/circuit-stats")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["review-service"]["state"] == "closed"
@@ -0,0 +1,75 @@
+"""
+Test cases for the pooled upstream client registry
+"""
+
+import httpx
+from fastapi import status
+
+from config import Config
+from utility.http_client import UpstreamClientRegistry
+
+
+class TestUpstreamClientRegistry:
+    """Test cases for UpstreamClientRegistry"""
+
+    def test_client_is_reused_per_service(self):
+        """Same service returns the same pooled client"""
+        registry = UpstreamClientRegistry()
+
+        first = registry.get("menu-service")
+        second = registry.get("menu-service")
+
+        assert first is second
+        assert registry.get("cart-service") is not first
+
+    def test_per_service_timeouts(self):
+        """Service overrides win over gateway defaults"""
+        registry = UpstreamClientRegistry()
+
+        auth_timeout = registry.timeout_for("auth-service")
+        cart_timeout = registry.timeout_for("cart-service")
+
+        assert auth_timeout.read == Config.SERVICE_TIMEOUTS["auth-service"]["read"]
+        assert cart_timeout.read == Config.REQUEST_TIMEOUT
+        assert cart_timeout.connect == Config.CONNECT_TIMEOUT
+
+    def test_pool_stats_covers_all_services(self):
+        """Pool stats list every configured service"""
+        stats = UpstreamClientRegistry().pool_stats()
+
+        assert set(stats) == set(Config.SERVICE_ENDPOINTS)
+        for service_stats in stats.values():
+            assert service_stats["in_use"] == 0
+            assert service_stats["waiting"] == 0
+
+
+class TestProxyWithPooledClient:
+    """Test cases for proxying through the shared client"""
+
+    def test_proxy_uses_pooled_client(self, client, mock_upstream):
+        """Proxied request goes through the registered service client"""
+        def handler(request: httpx.Request):
+            assert request.url.path == "/api/v1/rest/restaurants"
+            return httpx.Response(200, json={"data": []})
+
+        mock_upstream("restaurant-service", handler)
+
+        response = client.get("/api/v1/rest/restaurant-service/restaurants")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"data": []}
+
+    def test_upstream_error_status_is_preserved(self, client, mock_upstream):
+        """Upstream 4xx is returned as-is rather than a gateway 500"""
+        mock_upstream("menu-service", lambda request: httpx.Response(404, text="not found"))
+
+        response = client.get("/api/v1/rest/menu-service/menus/unknown")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_pool_stats_endpoint(self, admin_client):
+        """Pool stats are exposed on the gateway"""
+        response = admin_client.get("/api/v1/rest/gateway/pool-stats")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.json()) == set(Config.SERVICE_ENDPOINTS)
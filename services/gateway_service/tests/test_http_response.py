@@ -0,0 +1,121 @@
+"""
+Test cases for response compression and conditional GETs
+"""
+
+import gzip
+
+import httpx
+from fastapi import status
+
+from utility import http_response
+from utility.http_response import etag_matches, negotiate_encoding, strong_etag
+from utility.response_cache import build_cache_key, response_cache
+
+MENU_TREE = {"data": [{"id": f"m{index}", "name": "Tteokbokki", "options": ["mild", "spicy"]} for index in range(200)], "error": None}
+
+
+def _menu_handler(request: httpx.Request):
+    return httpx.Response(200, json=MENU_TREE)
+
+
+class TestNegotiation:
+    """Test cases for Accept-Encoding and If-None-Match parsing"""
+
+    def test_gzip_when_brotli_is_missing(self, monkeypatch):
+        monkeypatch.setattr(http_response, "brotli", None)
+
+        assert negotiate_encoding("gzip, deflate, br") == "gzip"
+        assert negotiate_encoding("*") == "gzip"
+        assert negotiate_encoding("gzip;q=0, deflate") is None
+        assert negotiate_encoding("") is None
+
+    def test_brotli_is_preferred_when_installed(self, monkeypatch):
+        monkeypatch.setattr(http_response, "brotli", object())
+
+        assert negotiate_encoding("gzip, br") == "br"
+        assert negotiate_encoding("gzip, br;q=0") == "gzip"
+
+    def test_etag_matches_any_variant_of_the_body(self):
+        etag = strong_etag(b"{}")
+        opaque = etag.strip('"')
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", "{opaque}-gzip"', etag)
+        assert etag_matches(f'W/"{opaque}"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+
+
+class TestProxiedResponses:
+    """Test cases for compression and ETags on proxied responses"""
+
+    def test_large_json_is_gzipped_with_etag(self, client, mock_upstream):
+        mock_upstream("order-service", _menu_handler)
+
+        response = client.get("/api/v1/rest/order-service/orders", headers={"accept-encoding": "gzip"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"].endswith('-gzip"')
+        assert int(response.headers["content-length"]) < len(response.content) / 5
+        assert response.json() == MENU_TREE
+
+    def test_small_bodies_are_not_compressed(self, client, mock_upstream):
+        mock_upstream("order-service", lambda request: httpx.Response(200, json={"ok": True}))
+
+        response = client.get("/api/v1/rest/order-service/orders", headers={"accept-encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"].startswith('"')
+
+    def test_if_none_match_gets_304(self, client, mock_upstream):
+        mock_upstream("order-service", _menu_handler)
+        etag = client.get("/api/v1/rest/order-service/orders").headers["etag"]
+
+        response = client.get("/api/v1/rest/order-service/orders", headers={"if-none-match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_changed_body_is_sent_in_full(self, client, mock_upstream):
+        mock_upstream("order-service", _menu_handler)
+
+        response = client.get("/api/v1/rest/order-service/orders", headers={"if-none-match": strong_etag(b"old")})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == MENU_TREE
+
+    def test_writes_get_no_etag(self, client, mock_upstream):
+        mock_upstream("order-service", lambda request: httpx.Response(201, json={"id": "o1"}))
+
+        response = client.post("/api/v1/rest/order-service/orders", json={})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "etag" not in response.headers
+
+
+class TestCachedResponses:
+    """Test cases for validators stored with cached bodies"""
+
+    def test_cached_menu_revalidates_with_304(self, anonymous_client, mock_upstream):
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(1)
+            return _menu_handler(request)
+
+        mock_upstream("menu-service", handler)
+        url = "/api/v1/rest/menu-service/restaurants/r1/menus"
+
+        first = anonymous_client.get(url, headers={"accept-encoding": "gzip"})
+        second = anonymous_client.get(url, headers={"accept-encoding": "gzip", "if-none-match": first.headers["etag"]})
+
+        assert first.headers["content-encoding"] == "gzip"
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+        assert len(calls) == 1
+
+        cached = response_cache._entries[build_cache_key("menu-service", "restaurants/r1/menus", [])]
+        assert set(cached.variants) == {"gzip"}
+        assert gzip.decompress(cached.variants["gzip"]) == cached.body
@@ -0,0 +1,247 @@
+"""
+Test cases for upstream load balancing across replicas
+"""
+
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+from fastapi import status
+
+from config import Config
+from utility.load_balancer import Endpoint, LoadBalancer, ServiceEndpoints, load_balancer
+
+MENU_REPLICAS = ["http://menu-1:9110", "http://menu-2:9110", "http://menu-3:9110"]
+
+
+def _service(strategy, origins=MENU_REPLICAS):
+    return ServiceEndpoints("menu-service", [Endpoint(origin) for origin in origins], strategy)
+
+
+@pytest.fixture
+def menu_replicas():
+    """Three menu-service replicas on the shared load balancer"""
+    load_balancer.load({"menu-service": MENU_REPLICAS})
+    yield
+    load_balancer.load()
+
+
+class TestStrategies:
+    """Test cases for replica selection"""
+
+    def test_round_robin_cycles(self):
+        service = _service("round_robin")
+
+        picked = [service.pick().origin for _ in range(6)]
+
+        assert picked == MENU_REPLICAS * 2
+
+    def test_least_outstanding_prefers_idle_replica(self):
+        service = _service("least_outstanding")
+        service.endpoints[0].outstanding = 4
+        service.endpoints[1].outstanding = 1
+        service.endpoints[2].outstanding = 3
+
+        assert {service.pick().origin for _ in range(5)} == {"http://menu-2:9110"}
+
+    def test_p2c_never_picks_the_busier_of_two(self):
+        service = _service("p2c", MENU_REPLICAS[:2])
+        service.endpoints[0].outstanding = 10
+
+        assert {service.pick().origin for _ in range(20)} == {"http://menu-2:9110"}
+
+    def test_unknown_strategy_is_rejected(self):
+        with pytest.raises(ValueError):
+            _service("random")
+
+
+class TestOutlierDetection:
+    """Test cases for passive ejection"""
+
+    def test_consecutive_failures_eject_replica(self, monkeypatch):
+        monkeypatch.setattr(Config, "OUTLIER_CONSECUTIVE_FAILURES", 2)
+        service = _service("round_robin")
+        bad = service.endpoints[0]
+
+        service.record(bad, failed=True)
+        service.record(bad, failed=True)
+
+        assert bad.ejections == 1
+        assert bad.origin not in {service.pick().origin for _ in range(6)}
+
+    def test_success_resets_failure_streak(self, monkeypatch):
+        monkeypatch.setattr(Config, "OUTLIER_CONSECUTIVE_FAILURES", 2)
+        service = _service("round_robin")
+        endpoint = service.endpoints[0]
+
+        service.record(endpoint, failed=True)
+        service.record(endpoint, failed=False)
+        service.record(endpoint, failed=True)
+
+        assert endpoint.ejections == 0
+
+    def test_all_unavailable_falls_back_to_every_replica(self):
+        service = _service("round_robin")
+        for endpoint in service.endpoints:
+            endpoint.healthy = False
+
+        assert {service.pick().origin for _ in range(3)} == set(MENU_REPLICAS)
+
+
+class TestReplicaFile:
+    """Test cases for loading replicas from Config.UPSTREAMS_FILE"""
+
+    def test_reload_on_change_keeps_replica_state(self, tmp_path, monkeypatch):
+        path = tmp_path / "upstreams.json"
+        path.write_text(json.dumps({"menu-service": MENU_REPLICAS[:2]}))
+        monkeypatch.setattr(Config, "UPSTREAMS_FILE", str(path))
+        balancer = LoadBalancer()
+        balancer.load()
+
+        assert balancer.reload_if_changed() is True
+        assert balancer.reload_if_changed() is False
+        balancer.acquire("menu-service").healthy = False
+
+        path.write_text(json.dumps({"menu-service": MENU_REPLICAS}))
+        os.utime(path, (1, 1))
+        assert balancer.reload_if_changed() is True
+
+        endpoints = balancer.snapshot()["menu-service"]["endpoints"]
+        assert [endpoint["origin"] for endpoint in endpoints] == MENU_REPLICAS
+        assert sum(not endpoint["healthy"] for endpoint in endpoints) == 1
+
+    def test_invalid_file_keeps_current_replicas(self, tmp_path, monkeypatch):
+        path = tmp_path / "upstreams.json"
+        path.write_text("[not json")
+        monkeypatch.setattr(Config, "UPSTREAMS_FILE", str(path))
+        balancer = LoadBalancer()
+        balancer.load({"menu-service": MENU_REPLICAS})
+
+        assert balancer.reload_if_changed() is False
+        assert len(balancer.snapshot()["menu-service"]["endpoints"]) == 3
+
+    @pytest.mark.parametrize("replicas", [
+        {"menu-service": "http://menu-1:9110"},
+        {"menu-service": []},
+        {"menu-service": [9115]},
+        {"menu-service": ["menu-1:9110"]},
+        {"menu-service": ["ftp://menu-1"]},
+    ])
+    def test_malformed_replicas_are_rejected(self, tmp_path, monkeypatch, replicas):
+        """Bad values are reported as a load error and the current replicas stay"""
+        path = tmp_path / "upstreams.json"
+        path.write_text(json.dumps(replicas))
+        monkeypatch.setattr(Config, "UPSTREAMS_FILE", str(path))
+        balancer = LoadBalancer()
+        balancer.load({"menu-service": MENU_REPLICAS})
+
+        assert balancer.reload_if_changed() is False
+        assert [endpoint["origin"] for endpoint in balancer.snapshot()["menu-service"]["endpoints"]] == MENU_REPLICAS
+
+    def test_single_instance_service_rejects_replicas(self):
+        """cart-service keeps carts in process memory; two replicas would overwrite each other's lines"""
+        balancer = LoadBalancer()
+
+        with pytest.raises(ValueError):
+            balancer.load({"cart-service": ["http://cart-1:9115", "http://cart-2:9115"]})
+        balancer.load({"cart-service": ["http://cart-1:9115"]})
+
+        assert balancer.replica_count("cart-service") == 1
+
+    def test_unlisted_services_use_service_endpoint_host(self):
+        balancer = LoadBalancer()
+        balancer.load({"menu-service": MENU_REPLICAS})
+
+        endpoints = balancer.snapshot()["restaurant-service"]["endpoints"]
+        assert [endpoint["origin"] for endpoint in endpoints] == ["http://restaurant-service:9112"]
+
+
+class TestHealthChecks:
+    """Test cases for active health checks"""
+
+    def test_failing_replica_is_marked_unhealthy(self):
+        balancer = LoadBalancer()
+        balancer.load({"menu-service": MENU_REPLICAS[:2]})
+        probed = []
+
+        def handler(request: httpx.Request):
+            probed.append(str(request.url))
+            return httpx.Response(503 if request.url.host == "menu-2" else 200)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        asyncio.run(balancer.check_health(lambda service_name: client))
+
+        assert sorted(probed) == [
+            "http://menu-1:9110/api/v1/rest/health",
+            "http://menu-2:9110/api/v1/rest/health",
+        ]
+        health = {endpoint["origin"]: endpoint["healthy"] for endpoint in balancer.snapshot()["menu-service"]["endpoints"]}
+        assert health == {"http://menu-1:9110": True, "http://menu-2:9110": False}
+
+    def test_not_found_is_unhealthy(self):
+        """A 404 on the health path means the replica isn't serving this service"""
+        balancer = LoadBalancer()
+        balancer.load({"menu-service": MENU_REPLICAS[:2]})
+
+        def handler(request: httpx.Request):
+            return httpx.Response(404 if request.url.host == "menu-2" else 200)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        asyncio.run(balancer.check_health(lambda service_name: client))
+
+        health = {endpoint["origin"]: endpoint["healthy"] for endpoint in balancer.snapshot()["menu-service"]["endpoints"]}
+        assert health == {"http://menu-1:9110": True, "http://menu-2:9110": False}
+
+    def test_services_without_health_route_probe_openapi_schema(self):
+        """Services without a health route are probed on the origin's OpenAPI schema"""
+        balancer = LoadBalancer()
+        balancer.load({"restaurant-service": ["http://restaurant-1:9112", "http://restaurant-2:9112"]})
+        probed = []
+
+        def handler(request: httpx.Request):
+            probed.append(str(request.url))
+            return httpx.Response(200, json={"openapi": "3.1.0"})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        asyncio.run(balancer.check_health(lambda service_name: client))
+
+        assert sorted(probed) == ["http://restaurant-1:9112/openapi.json", "http://restaurant-2:9112/openapi.json"]
+
+
+class TestProxyThroughReplicas:
+    """Test cases for replica selection on proxied requests"""
+
+    def test_requests_are_spread_over_replicas(self, client, mock_upstream, menu_replicas, monkeypatch):
+        hosts = []
+
+        def handler(request: httpx.Request):
+            hosts.append((request.url.host, request.headers["host"]))
+            return httpx.Response(200, json={})
+
+        mock_upstream("menu-service", handler)
+        for service in load_balancer._services.values():
+            service.strategy = "round_robin"
+
+        for _ in range(3):
+            assert client.get("/api/v1/rest/menu-service/menus").status_code == status.HTTP_200_OK
+
+        assert sorted(hosts) == [("menu-1", "menu-1:9110"), ("menu-2", "menu-2:9110"), ("menu-3", "menu-3:9110")]
+        assert all(endpoint["outstanding"] == 0 for endpoint in load_balancer.snapshot()["menu-service"]["endpoints"])
+
+    def test_failing_replica_is_ejected(self, client, mock_upstream, menu_replicas):
+        calls = {"menu-1": 0}
+
+        def handler(request: httpx.Request):
+            if request.url.host == "menu-1":
+                calls["menu-1"] += 1
+                return httpx.Response(500, text="boom")
+            return httpx.Response(200, json={})
+
+        mock_upstream("menu-service", handler)
+
+        for _ in range(30):
+            client.get("/api/v1/rest/menu-service/menus")
+
+        assert calls["menu-1"] == Config.OUTLIER_CONSECUTIVE_FAILURES
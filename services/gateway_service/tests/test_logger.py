@@ -0,0 +1,113 @@
+"""
+Test cases for the queue-based logging pipeline
+"""
+
+import io
+import json
+import logging
+import queue
+import sys
+
+from utility.logger import DroppingQueueHandler, JsonFormatter, LogWriter, SamplingFilter
+
+
+def _record(msg="Proxying %s request to %s", args=("GET", "http://menu-service"), level=logging.INFO, **extra):
+    record = logging.LogRecord("gateway_service", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJsonFormatter:
+    """Test cases for JsonFormatter"""
+
+    def test_record_is_one_json_object(self):
+        line = JsonFormatter().format(_record(service="menu-service"))
+
+        entry = json.loads(line)
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "gateway_service"
+        assert entry["message"] == "Proxying GET request to http://menu-service"
+        assert entry["service"] == "menu-service"
+        assert entry["ts"].endswith("Z")
+
+    def test_exception_is_included(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("gateway_service", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+
+        entry = json.loads(JsonFormatter().format(record))
+        assert "ValueError: boom" in entry["exc_info"]
+
+
+class TestSamplingFilter:
+    """Test cases for SamplingFilter"""
+
+    def test_info_is_sampled_per_template(self):
+        sampling = SamplingFilter(every=3)
+
+        kept = [sampling.filter(_record()) for _ in range(6)]
+        other = sampling.filter(_record(msg="Service response status: %s", args=(200,)))
+
+        assert kept == [True, False, False, True, False, False]
+        assert other is True
+        assert sampling.sampled_out == 4
+
+    def test_templates_are_bounded(self):
+        """Pre-formatted messages (one template each) don't grow the filter without bound"""
+        sampling = SamplingFilter(every=2, max_templates=10)
+
+        for index in range(100):
+            sampling.filter(_record(msg=f"request {index}", args=()))
+
+        assert len(sampling._seen) == 10
+        assert sampling.sampled_out == 0
+
+    def test_warnings_are_always_kept(self):
+        sampling = SamplingFilter(every=100)
+
+        assert all(sampling.filter(_record(level=logging.WARNING)) for _ in range(5))
+        assert sampling.sampled_out == 0
+
+
+class TestDroppingQueueHandler:
+    """Test cases for DroppingQueueHandler"""
+
+    def test_full_queue_drops_and_counts(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+
+        for _ in range(5):
+            handler.handle(_record())
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+    def test_formatting_is_deferred(self):
+        """The enqueued record still carries the template and arguments"""
+        handler = DroppingQueueHandler(queue.Queue())
+
+        handler.handle(_record())
+
+        record = handler.queue.get_nowait()
+        assert record.msg == "Proxying %s request to %s"
+        assert record.args == ("GET", "http://menu-service")
+
+
+class TestLogWriter:
+    """Test cases for the background writer"""
+
+    def test_queued_records_are_written_on_stop(self):
+        log_queue = queue.Queue()
+        stream = io.StringIO()
+        output = logging.StreamHandler(stream)
+        output.setFormatter(JsonFormatter())
+        writer = LogWriter(log_queue, output)
+        handler = DroppingQueueHandler(log_queue)
+
+        writer.start()
+        for index in range(3):
+            handler.handle(_record(msg="record %d", args=(index,)))
+        writer.stop()
+
+        messages = [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+        assert messages == ["record 0", "record 1", "record 2"]
@@ -0,0 +1,144 @@
+"""
+Test cases for gateway metrics and the /metrics endpoint
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import status
+
+from api.v1.rest.func.proxy_service_request import _pool_wait_trace
+from config import Config
+from utility.metrics import AUTH_FAILURES, POOL_WAIT, REQUESTS, UPSTREAM_DURATION, MetricsRegistry, _Metric, metrics
+from utility.route_table import route_table
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestMetricsRegistry:
+    """Test cases for the metric primitives and text exposition"""
+
+    def test_counter_and_gauge_exposition(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests", ("service",))
+        gauge = registry.gauge("in_flight", "In flight")
+
+        counter.inc("menu-service")
+        counter.inc("menu-service", amount=2)
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{service="menu-service"} 3' in text
+        assert "in_flight 1" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ("service",), buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "cart-service")
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{service="cart-service",le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{service="cart-service",le="1"} 3' in text
+        assert 'latency_seconds_bucket{service="cart-service",le="+Inf"} 4' in text
+        assert 'latency_seconds_sum{service="cart-service"} 3.65' in text
+        assert 'latency_seconds_count{service="cart-service"} 4' in text
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("errors_total", "Errors", ("reason",)).inc('bad "quote"\n')
+
+        assert 'errors_total{reason="bad \\"quote\\"\\n"} 1' in registry.render()
+
+    def test_duplicate_registration_is_rejected(self):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests")
+
+        with pytest.raises(ValueError):
+            registry.gauge("requests_total", "Requests")
+
+    def test_metric_without_samples_fails_on_creation(self):
+        class IncompleteMetric(_Metric):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteMetric("incomplete", "Incomplete")
+
+
+class TestGatewayMetrics:
+    """Test cases for metrics recorded by the gateway"""
+
+    def test_requests_are_labelled_by_configured_route(self, client, mock_upstream):
+        """Path parameters do not leak into labels; the configured route does"""
+        mock_upstream("menu-service", lambda request: httpx.Response(200, json={}))
+
+        client.get("/api/v1/rest/menu-service/restaurants/r1/menus")
+        client.get("/api/v1/rest/menu-service/restaurants/r2/menus")
+        client.get("/api/v1/rest/menu-service/restaurants/r2/menus")
+
+        assert REQUESTS.value("menu-service", "menu-service/restaurants", "GET", "200") == 3
+        # the repeated page is served from the response cache
+        assert UPSTREAM_DURATION.count("menu-service", "menu-service/restaurants", "200") == 2
+
+    def test_upstream_errors_are_recorded(self, client, mock_upstream):
+        def unreachable(request: httpx.Request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        mock_upstream("user-service", unreachable)
+
+        response = client.get("/api/v1/rest/user-service/users/me")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert REQUESTS.value("user-service", "user-service", "GET", "503") == 1
+        # connection errors on GETs are retried
+        assert UPSTREAM_DURATION.count("user-service", "user-service", "error") == Config.RETRY_MAX_ATTEMPTS
+
+    def test_auth_failures_are_counted(self, anonymous_client):
+        anonymous_client.get("/api/v1/rest/order-service/orders")
+        anonymous_client.get("/api/v1/rest/order-service/orders", headers={"Authorization": "Bearer not-a-jwt"})
+
+        assert AUTH_FAILURES.value("missing_token") == 1
+        assert AUTH_FAILURES.value("invalid_token") == 1
+
+    def test_metrics_endpoint(self, admin_client):
+        """/metrics includes scrape-time cache and pool metrics"""
+        admin_client.get("/api/v1/rest/health")
+
+        response = admin_client.get("/metrics")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'gateway_requests_total{service="gateway",route="health",method="GET",status="200"} 1' in response.text
+        assert "gateway_in_flight_requests 1" in response.text  # the scrape itself
+        assert "gateway_cache_hit_ratio" in response.text
+        assert 'gateway_pool_connections{service="menu-service",state="idle"}' in response.text
+
+    def test_metrics_route_is_operational(self):
+        assert route_table.match_path("/metrics").ops
+        assert not route_table.match_path("/metrics").public
+        assert not route_table.match_path("/metrics/other").ops
+
+
+class TestPoolWaitTrace:
+    """Test cases for the httpcore trace hook measuring pool wait"""
+
+    def test_records_once_when_connection_is_acquired(self):
+        trace = _pool_wait_trace("cart-service", started=0.0)
+
+        async def run():
+            await trace("connection.connect_tcp.started", {})
+            await trace("http11.send_request_headers.started", {})
+
+        asyncio.run(run())
+
+        assert POOL_WAIT.count("cart-service") == 1
@@ -0,0 +1,184 @@
+"""
+Test cases for gateway rate limiting and load shedding
+"""
+
+import multiprocessing
+
+import httpx
+import pytest
+from fastapi import status
+
+from starlette.requests import Request
+
+from config import Config
+from middleware.rate_limit_middleware import client_ip
+from utility.admission import admission
+from utility.rate_limiter import InMemoryRateLimitBackend, RateLimitBackend, RateLimiter, SharedMemoryRateLimitBackend
+from utility.route_table import RoutePolicy
+
+CART = RoutePolicy(service_name="cart-service")
+CATALOG = RoutePolicy(service_name="restaurant-service", public=True)
+
+
+class TestTokenBucket:
+    """Test cases for InMemoryRateLimitBackend"""
+
+    def test_burst_then_reject(self):
+        """A full bucket allows `burst` requests, then rejects with retry_after"""
+        backend = InMemoryRateLimitBackend(max_keys=10)
+
+        results = [backend.take("k", rate=1.0, burst=3.0) for _ in range(4)]
+
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+        assert 0 < results[-1][1] <= 1.0
+
+    def test_bucket_keys_are_bounded(self):
+        """Least recently used buckets are dropped beyond max_keys"""
+        backend = InMemoryRateLimitBackend(max_keys=2)
+
+        for key in ("a", "b", "c"):
+            backend.take(key, rate=1.0, burst=1.0)
+
+        assert list(backend._buckets) == ["b", "c"]
+
+    def test_backend_without_acquire_fails_on_creation(self):
+        """A backend that doesn't implement acquire can't be created"""
+        class IncompleteBackend(RateLimitBackend):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteBackend()
+
+
+def _take_in_child(path: str, count: int):
+    backend = SharedMemoryRateLimitBackend(path=path, slots=64)
+    for _ in range(count):
+        backend.take("user:1", rate=0.001, burst=5.0)
+
+
+class TestSharedMemoryBuckets:
+    """Test cases for SharedMemoryRateLimitBackend (one budget across worker processes)"""
+
+    def test_budget_is_shared_between_processes(self, tmp_path):
+        path = str(tmp_path / "buckets")
+        child = multiprocessing.get_context("fork").Process(target=_take_in_child, args=(path, 3))
+        child.start()
+        child.join(timeout=10)
+
+        backend = SharedMemoryRateLimitBackend(path=path, slots=64)
+        results = [backend.take("user:1", rate=0.001, burst=5.0)[0] for _ in range(3)]
+
+        assert results == [True, True, False]
+        assert backend.take("user:2", rate=0.001, burst=5.0)[0] is True
+
+    def test_full_window_reuses_least_recently_updated(self, tmp_path):
+        backend = SharedMemoryRateLimitBackend(path=str(tmp_path / "buckets"), slots=SharedMemoryRateLimitBackend.PROBE_WINDOW)
+        assert backend.take("first", rate=0.001, burst=1.0)[0] is True
+        assert backend.take("first", rate=0.001, burst=1.0)[0] is False
+
+        for index in range(SharedMemoryRateLimitBackend.PROBE_WINDOW):
+            backend.take(f"other:{index}", rate=0.001, burst=1.0)
+
+        # "first" was evicted, so it starts over with a full bucket
+        assert backend.take("first", rate=0.001, burst=1.0)[0] is True
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter"""
+
+    @pytest.mark.asyncio
+    async def test_user_and_ip_buckets_are_separate(self, monkeypatch):
+        """Authenticated users are limited per user, anonymous callers per IP"""
+        monkeypatch.setattr(Config, "RATE_LIMIT_PER_USER", {"rate": 0.001, "burst": 1.0})
+        monkeypatch.setattr(Config, "RATE_LIMIT_PER_IP", {"rate": 0.001, "burst": 1.0})
+        limiter = RateLimiter(InMemoryRateLimitBackend())
+
+        assert (await limiter.check(CART, "user-1", "10.0.0.1"))[0] is None
+        assert (await limiter.check(CART, "user-1", "10.0.0.1"))[0] == "user"
+        assert (await limiter.check(CART, "user-2", "10.0.0.1"))[0] is None
+        assert (await limiter.check(CATALOG, None, "10.0.0.1"))[0] is None
+        assert (await limiter.check(CATALOG, None, "10.0.0.1"))[0] == "ip"
+
+    @pytest.mark.asyncio
+    async def test_route_budget_is_shared(self, monkeypatch):
+        """Rate-limit class budget applies across all callers"""
+        monkeypatch.setattr(Config, "RATE_LIMIT_CLASSES", {"checkout": {"rate": 0.001, "burst": 2.0}})
+        limiter = RateLimiter(InMemoryRateLimitBackend())
+        route = RoutePolicy(service_name="order-service", rate_limit_class="checkout")
+
+        kinds = [(await limiter.check(route, f"user-{i}", "ip"))[0] for i in range(3)]
+
+        assert kinds == [None, None, "route"]
+        assert limiter.rejected["route"] == 1
+
+
+class TestRateLimitMiddleware:
+    """Test cases for rate_limit_middleware"""
+
+    def test_ip_limit_returns_429(self, client, mock_upstream, monkeypatch):
+        """Exceeding the per-IP bucket answers 429 with Retry-After"""
+        monkeypatch.setattr(Config, "RATE_LIMIT_PER_IP", {"rate": 0.5, "burst": 1.0})
+        mock_upstream("user-service", lambda request: httpx.Response(200, json={"exists": False}))
+
+        first = client.get("/api/v1/rest/user-service/exists")
+        second = client.get("/api/v1/rest/user-service/exists")
+
+        assert first.status_code == status.HTTP_200_OK
+        assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert second.headers["retry-after"] == "2"
+        assert second.json()["error"]["code"] == "PTCM-E429"
+
+    def test_overload_returns_503(self, client, monkeypatch):
+        """At the in-flight cap the gateway sheds load with 503 once the queue deadline passes"""
+        monkeypatch.setattr(Config, "MAX_IN_FLIGHT_REQUESTS", 0)
+        admission.reset()
+
+        response = client.get("/api/v1/rest/user-service/exists")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["error"]["code"] == "PTCM-E503"
+        assert admission.snapshot()["classes"]["browse"]["shed"]["deadline"] == 1
+        assert admission.in_flight == 0
+
+    def test_health_is_exempt(self, client, monkeypatch):
+        """Health checks are never limited"""
+        monkeypatch.setattr(Config, "MAX_IN_FLIGHT_REQUESTS", 0)
+        admission.reset()
+
+        response = client.get("/api/v1/rest/health")
+
+        assert response.status_code == status.HTTP_200_OK
+
+
+def _request(peer: str, forwarded_for: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 40000)})
+
+
+class TestClientIp:
+    """Test cases for client_ip"""
+
+    def test_forwarded_for_ignored_without_trusted_proxy(self, monkeypatch):
+        """A client can't pick its own IP bucket by sending X-Forwarded-For"""
+        monkeypatch.setattr(Config, "TRUSTED_PROXIES", ())
+
+        assert client_ip(_request("203.0.113.7", "1.2.3.4")) == "203.0.113.7"
+
+    def test_forwarded_for_ignored_from_untrusted_peer(self, monkeypatch):
+        monkeypatch.setattr(Config, "TRUSTED_PROXIES", ("10.0.0.0/8",))
+
+        assert client_ip(_request("203.0.113.7", "1.2.3.4")) == "203.0.113.7"
+
+    def test_right_most_untrusted_hop(self, monkeypatch):
+        """Spoofed left-most values are skipped; the address the trusted proxy saw wins"""
+        monkeypatch.setattr(Config, "TRUSTED_PROXIES", ("10.0.0.0/8",))
+
+        request = _request("10.0.0.2", "1.2.3.4, 198.51.100.9, 10.0.0.1")
+
+        assert client_ip(request) == "198.51.100.9"
+
+    def test_all_hops_trusted(self, monkeypatch):
+        monkeypatch.setattr(Config, "TRUSTED_PROXIES", ("10.0.0.0/8",))
+
+        assert client_ip(_request("10.0.0.2", "10.0.0.9, 10.0.0.1")) == "10.0.0.9"
+        assert client_ip(_request("10.0.0.2")) == "10.0.0.2"
@@ -0,0 +1,195 @@
+"""
+Test cases for WebSocket and Server-Sent Events pass-through
+"""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+import websockets
+from fastapi import status
+from starlette.websockets import WebSocketDisconnect
+
+from config import Config
+from utility.load_balancer import load_balancer
+from utility.metrics import REALTIME_CONNECTIONS, REALTIME_REJECTED, metrics
+from utility.realtime import ConnectionLimitExceeded, ConnectionRegistry, realtime_connections, with_idle_timeout
+
+TRACKING_WS_URL = "/api/v1/rest/delivery-tracking-service/tracking/orders/o1/ws"
+TRACKING_SSE_URL = "/api/v1/rest/delivery-tracking-service/tracking/orders/o1/events"
+
+
+async def _chunks(*chunks, pause: float = 0.0):
+    for chunk in chunks:
+        await asyncio.sleep(pause)
+        yield chunk
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.reset()
+
+
+@pytest.fixture
+def tracking_upstream():
+    """Echoing WebSocket delivery-tracking-service on a local port"""
+    seen = {}
+
+    async def echo(upstream_socket):
+        seen["path"] = upstream_socket.path
+        seen["headers"] = upstream_socket.request_headers
+        async for message in upstream_socket:
+            await upstream_socket.send(message)
+
+    async def start():
+        return await websockets.serve(echo, "127.0.0.1", 0)
+
+    # The server runs on its own loop; the app runs on the TestClient's
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(start(), loop).result(timeout=5)
+    port = server.sockets[0].getsockname()[1]
+    load_balancer.load({"delivery-tracking-service": [f"http://127.0.0.1:{port}"]})
+
+    yield seen
+
+    load_balancer.load()
+    loop.call_soon_threadsafe(server.close)
+    asyncio.run_coroutine_threadsafe(server.wait_closed(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+
+
+class TestConnectionRegistry:
+    """Test cases for connection caps"""
+
+    def test_per_user_cap(self):
+        registry = ConnectionRegistry(max_per_user=2, max_total=10)
+        registry.open("websocket", "delivery-tracking-service", "user-1")
+        registry.open("sse", "delivery-tracking-service", "user-1")
+
+        with pytest.raises(ConnectionLimitExceeded) as exc_info:
+            registry.open("websocket", "delivery-tracking-service", "user-1")
+
+        assert exc_info.value.limit == "user"
+        registry.open("websocket", "delivery-tracking-service", "user-2")
+        assert REALTIME_REJECTED.value("websocket", "user") == 1
+        assert REALTIME_CONNECTIONS.value("websocket", "delivery-tracking-service") == 2
+
+    def test_close_frees_the_slot(self):
+        registry = ConnectionRegistry(max_per_user=1, max_total=1)
+        registry.open("sse", "delivery-tracking-service", "user-1")
+
+        with pytest.raises(ConnectionLimitExceeded) as exc_info:
+            registry.open("sse", "delivery-tracking-service", "user-2")
+        assert exc_info.value.limit == "gateway"
+
+        registry.close("sse", "delivery-tracking-service", "user-1")
+        registry.open("sse", "delivery-tracking-service", "user-2")
+        assert registry.count("user-1") == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_stream_is_ended(self):
+        received = [chunk async for chunk in with_idle_timeout(_chunks(b"a", b"b", pause=0.2), timeout=0.05)]
+
+        assert received == []
+
+
+class TestWebSocketProxy:
+    """Test cases for the WebSocket pass-through"""
+
+    def test_messages_are_relayed_both_ways(self, client, tracking_upstream):
+        with client.websocket_connect(TRACKING_WS_URL + "?since=5") as websocket:
+            websocket.send_text('{"type": "subscribe"}')
+            assert websocket.receive_text() == '{"type": "subscribe"}'
+            websocket.send_bytes(b"\x00\x01")
+            assert websocket.receive_bytes() == b"\x00\x01"
+            assert realtime_connections.count("user-123") == 1
+
+        assert tracking_upstream["path"] == "/api/v1/rest/tracking/orders/o1/ws?since=5"
+        assert tracking_upstream["headers"]["x-user-id"] == "user-123"
+        assert "authorization" in tracking_upstream["headers"]
+
+    def test_spoofed_user_header_is_replaced(self, client, tracking_upstream):
+        with client.websocket_connect(TRACKING_WS_URL, headers={"x-user-id": "someone-else"}) as websocket:
+            websocket.send_text("ping")
+            websocket.receive_text()
+
+        assert tracking_upstream["headers"].get_all("x-user-id") == ["user-123"]
+
+    def test_upgrade_without_token_is_refused(self, anonymous_client, tracking_upstream):
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with anonymous_client.websocket_connect(TRACKING_WS_URL):
+                pass
+
+        assert exc_info.value.code == status.WS_1008_POLICY_VIOLATION
+        assert "path" not in tracking_upstream
+
+    def test_per_user_cap_refuses_upgrade(self, client, tracking_upstream, monkeypatch):
+        monkeypatch.setattr(realtime_connections, "max_per_user", 1)
+        realtime_connections.open("sse", "delivery-tracking-service", "user-123")
+
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(TRACKING_WS_URL):
+                pass
+
+        assert exc_info.value.code == status.WS_1013_TRY_AGAIN_LATER
+
+    def test_idle_connection_is_closed(self, client, tracking_upstream, monkeypatch):
+        monkeypatch.setattr(Config, "REALTIME_IDLE_TIMEOUT", 0.2)
+
+        with client.websocket_connect(TRACKING_WS_URL) as websocket:
+            message = websocket.receive()
+
+        assert message == {"type": "websocket.close", "code": status.WS_1001_GOING_AWAY, "reason": ""}
+        assert realtime_connections.total == 0
+
+    def test_unreachable_upstream_closes_with_bad_gateway(self, client):
+        load_balancer.load({"delivery-tracking-service": ["http://127.0.0.1:1"]})
+        try:
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                with client.websocket_connect(TRACKING_WS_URL):
+                    pass
+        finally:
+            load_balancer.load()
+
+        assert exc_info.value.code == status.WS_1014_BAD_GATEWAY
+        assert realtime_connections.total == 0
+
+
+class TestEventStreamProxy:
+    """Test cases for the Server-Sent Events pass-through"""
+
+    def test_events_are_streamed(self, client, mock_upstream):
+        seen = {}
+
+        def handler(request: httpx.Request):
+            seen["read_timeout"] = request.extensions["timeout"]["read"]
+            return httpx.Response(
+                200,
+                content=_chunks(b"data: picked_up\n\n", b": heartbeat\n\n", b"data: delivered\n\n"),
+                headers={"content-type": "text/event-stream"},
+            )
+
+        mock_upstream("delivery-tracking-service", handler)
+
+        with client.stream("GET", TRACKING_SSE_URL, headers={"accept": "text/event-stream"}) as response:
+            body = b"".join(response.iter_raw())
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["x-accel-buffering"] == "no"
+        assert body == b"data: picked_up\n\n: heartbeat\n\ndata: delivered\n\n"
+        assert seen["read_timeout"] is None
+        assert realtime_connections.total == 0
+
+    def test_per_user_cap_returns_429(self, client, mock_upstream, monkeypatch):
+        monkeypatch.setattr(realtime_connections, "max_per_user", 1)
+        realtime_connections.open("websocket", "delivery-tracking-service", "user-123")
+        mock_upstream("delivery-tracking-service", lambda request: httpx.Response(200))
+
+        response = client.get(TRACKING_SSE_URL, headers={"accept": "text/event-stream"})
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.json()["error"]["name"] == "ConnectionLimitException"
@@ -0,0 +1,214 @@
+"""
+Test cases for the gateway response cache
+"""
+
+import asyncio
+import gc
+import time
+
+import httpx
+import pytest
+from fastapi import status
+
+from config import Config
+from utility.response_cache import CachedResponse, ResponseCache, build_cache_key
+
+
+def _response(body: bytes = b"{}", status_code: int = 200, headers: dict = None) -> CachedResponse:
+    return CachedResponse(status_code=status_code, headers=headers or {}, body=body)
+
+
+def _refuse_connection(request: httpx.Request):
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache"""
+
+    def test_cache_key_normalizes_query_order(self):
+        """Query parameter order does not change the key"""
+        first = build_cache_key("menu-service", "restaurants/1/menus", [("b", "2"), ("a", "1")])
+        second = build_cache_key("menu-service", "/restaurants/1/menus/", [("a", "1"), ("b", "2")])
+
+        assert first == second
+
+    @pytest.mark.asyncio
+    async def test_hit_after_miss(self):
+        """Second lookup within TTL is served from cache"""
+        cache = ResponseCache(max_entries=10, max_bytes=1024, max_entry_bytes=1024)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return _response(b"menus")
+
+        _, first_status = await cache.fetch("k", 60, 0, loader)
+        cached, second_status = await cache.fetch("k", 60, 0, loader)
+
+        assert (first_status, second_status) == ("MISS", "HIT")
+        assert cached.body == b"menus"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_single_flight_coalesces_concurrent_misses(self):
+        """Concurrent misses on a cold key trigger one upstream call"""
+        cache = ResponseCache(max_entries=10, max_bytes=1024, max_entry_bytes=1024)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return _response(b"restaurants")
+
+        results = await asyncio.gather(*[cache.fetch("k", 60, 0, loader) for _ in range(50)])
+
+        assert len(calls) == 1
+        assert all(response.body == b"restaurants" for response, _ in results)
+        assert cache.stats.coalesced == 49
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self):
+        """Expired entry is served stale while one refresh runs in the background"""
+        cache = ResponseCache(max_entries=10, max_bytes=1024, max_entry_bytes=1024)
+        versions = iter([b"v1", b"v2"])
+
+        async def loader():
+            return _response(next(versions))
+
+        await cache.fetch("k", 60, 60, loader)
+        cache._entries["k"].fresh_until = time.monotonic() - 1
+
+        stale, cache_status = await cache.fetch("k", 60, 60, loader)
+        await asyncio.gather(*cache._inflight.values())
+        fresh, fresh_status = await cache.fetch("k", 60, 60, loader)
+
+        assert (stale.body, cache_status) == (b"v1", "STALE")
+        assert (fresh.body, fresh_status) == (b"v2", "HIT")
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_entries_and_bytes(self):
+        """Least recently used entries are evicted when bounds are exceeded"""
+        cache = ResponseCache(max_entries=2, max_bytes=10, max_entry_bytes=10)
+
+        def loader_for(body):
+            async def loader():
+                return _response(body)
+            return loader
+
+        await cache.fetch("a", 60, 0, loader_for(b"aaaa"))
+        await cache.fetch("b", 60, 0, loader_for(b"bbbb"))
+        await cache.fetch("a", 60, 0, loader_for(b"aaaa"))  # a is now most recent
+        await cache.fetch("c", 60, 0, loader_for(b"cccc"))
+
+        assert set(cache._entries) == {"a", "c"}
+        assert cache.stats.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_and_no_store_are_not_cached(self):
+        """Only cacheable 200 responses are stored"""
+        cache = ResponseCache(max_entries=10, max_bytes=1024, max_entry_bytes=1024)
+
+        async def error_loader():
+            return _response(b"oops", status_code=500)
+
+        async def no_store_loader():
+            return _response(b"secret", headers={"cache-control": "no-store"})
+
+        await cache.fetch("error", 60, 0, error_loader)
+        await cache.fetch("no-store", 60, 0, no_store_loader)
+
+        assert len(cache) == 0
+
+
+    @pytest.mark.asyncio
+    async def test_failed_fill_without_waiters_is_retrieved(self):
+        """A fill that fails after every caller went away is not reported as never retrieved"""
+        cache = ResponseCache(max_entries=10, max_bytes=1024, max_entry_bytes=1024)
+        started = asyncio.Event()
+
+        async def loader():
+            started.set()
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream broke")
+
+        caller = asyncio.create_task(cache.fetch("k", 60, 0, loader))
+        await started.wait()
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+        reported = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: reported.append(context))
+        await asyncio.sleep(0.05)
+        gc.collect()
+
+        assert reported == []
+
+
+class TestCachedProxy:
+    """Test cases for cached catalog routes through the gateway"""
+
+    def test_catalog_get_is_cached(self, client, mock_upstream):
+        """Repeated anonymous browse hits the backend once"""
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(request.url)
+            return httpx.Response(200, json={"data": ["r1", "r2"]})
+
+        mock_upstream("restaurant-service", handler)
+
+        first = client.get("/api/v1/rest/restaurant-service/restaurants?page=1&size=10")
+        second = client.get("/api/v1/rest/restaurant-service/restaurants?size=10&page=1")
+
+        assert first.status_code == second.status_code == status.HTTP_200_OK
+        assert first.headers["x-cache"] == "MISS"
+        assert second.headers["x-cache"] == "HIT"
+        assert second.json() == {"data": ["r1", "r2"]}
+        assert len(calls) == 1
+
+    def test_shared_fill_drops_per_caller_headers(self, client, mock_upstream):
+        """The fill doesn't carry one caller's credentials or validators into the shared entry"""
+        received = []
+
+        def handler(request: httpx.Request):
+            received.append(request.headers)
+            return httpx.Response(200, json={"data": ["r1"]})
+
+        mock_upstream("restaurant-service", handler)
+
+        first = client.get(
+            "/api/v1/rest/restaurant-service/restaurants",
+            headers={"If-None-Match": '"abc"', "Cookie": "session=1", "Accept-Language": "ko"},
+        )
+        second = client.get("/api/v1/rest/restaurant-service/restaurants")
+
+        assert first.status_code == second.status_code == status.HTTP_200_OK
+        assert second.json() == {"data": ["r1"]}
+        assert len(received) == 1
+        for header in ("authorization", "if-none-match", "cookie"):
+            assert header not in received[0]
+        assert received[0]["accept-language"] == "ko"
+
+    @pytest.mark.parametrize("upstream", [
+        lambda request: httpx.Response(404, json={"data": None, "error": {"code": "404", "name": "RestaurantNotFound", "message": "없음"}}),
+        lambda request: httpx.Response(503, text="maintenance"),
+        _refuse_connection,
+    ], ids=["not-found", "unavailable", "connect-error"])
+    def test_errors_match_uncached_route(self, client, mock_upstream, monkeypatch, upstream):
+        """Turning on the cache for a route doesn't change what clients see when the backend fails"""
+        mock_upstream("restaurant-service", upstream)
+
+        cached = client.get("/api/v1/rest/restaurant-service/restaurants")
+        monkeypatch.setattr(Config, "RESPONSE_CACHE_ENABLED", False)
+        uncached = client.get("/api/v1/rest/restaurant-service/restaurants")
+
+        assert cached.status_code == uncached.status_code >= 400
+        assert cached.json() == uncached.json()
+
+    def test_cache_stats_endpoint(self, admin_client):
+        """Cache stats are exposed on the gateway"""
+        response = admin_client.get("/api/v1/rest/gateway/cache-stats")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "hit_ratio" in response.json()
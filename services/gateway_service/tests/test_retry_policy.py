@@ -0,0 +1,207 @@
+"""
+Test cases for upstream retries, hedging and the retry budget
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import status
+
+from config import Config
+from utility.load_balancer import load_balancer
+from utility.metrics import UPSTREAM_HEDGES, UPSTREAM_RETRIES, metrics
+from utility.retry_policy import LatencyTracker, RetryBudget, backoff_delay, retry_budget
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(Config, "RETRY_BACKOFF_BASE", 0.001)
+    metrics.reset()
+
+
+@pytest.fixture
+def menu_replicas():
+    load_balancer.load({"menu-service": ["http://menu-1:9110", "http://menu-2:9110"]})
+    yield
+    load_balancer.load()
+
+
+class TestRetryBudget:
+    """Test cases for RetryBudget"""
+
+    def test_floor_then_ratio_of_requests(self):
+        budget = RetryBudget(ratio=0.5, min_per_second=1)
+
+        assert budget.try_spend() is True   # per-second floor
+        assert budget.try_spend() is False
+        budget.deposit()
+        budget.deposit()
+        assert budget.try_spend() is True   # two requests earned one retry
+        assert budget.try_spend() is False
+        assert budget.exhausted == 2
+
+    def test_deposits_are_capped(self):
+        budget = RetryBudget(ratio=0.1, min_per_second=0)
+
+        for _ in range(10 * RetryBudget.WINDOW_REQUESTS):
+            budget.deposit()
+
+        assert budget.tokens == pytest.approx(budget.max_tokens)
+
+
+class TestLatencyTracker:
+    """Test cases for the p95-based hedge delay"""
+
+    def test_default_until_enough_samples(self, monkeypatch):
+        monkeypatch.setattr(Config, "HEDGE_MIN_SAMPLES", 10)
+        tracker = LatencyTracker(window=100)
+
+        for _ in range(9):
+            tracker.observe("menu-service/restaurants", 0.5)
+
+        assert tracker.hedge_delay("menu-service/restaurants") == Config.HEDGE_DEFAULT_DELAY
+
+    def test_p95_of_recent_latencies(self, monkeypatch):
+        monkeypatch.setattr(Config, "HEDGE_MIN_SAMPLES", 10)
+        tracker = LatencyTracker(window=100)
+
+        for index in range(100):
+            tracker.observe("menu-service/restaurants", (index + 1) / 1000)
+
+        assert tracker.hedge_delay("menu-service/restaurants") == pytest.approx(0.096)
+
+    def test_min_delay_floor(self, monkeypatch):
+        monkeypatch.setattr(Config, "HEDGE_MIN_SAMPLES", 1)
+        tracker = LatencyTracker(window=10)
+        tracker.observe("menu-service/restaurants", 0.0001)
+
+        assert tracker.hedge_delay("menu-service/restaurants") == Config.HEDGE_MIN_DELAY
+
+    def test_backoff_is_jittered_and_bounded(self):
+        delays = [backoff_delay(10) for _ in range(50)]
+
+        assert all(0 <= delay <= Config.RETRY_BACKOFF_MAX for delay in delays)
+        assert len(set(delays)) > 1
+
+
+class TestRetries:
+    """Test cases for retrying connection errors"""
+
+    def test_get_is_retried_after_connection_error(self, client, mock_upstream):
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(request.method)
+            if len(calls) == 1:
+                raise httpx.ConnectError("connection refused", request=request)
+            return httpx.Response(200, json={"ok": True})
+
+        mock_upstream("order-service", handler)
+
+        response = client.get("/api/v1/rest/order-service/orders")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(calls) == 2
+        assert UPSTREAM_RETRIES.value("order-service") == 1
+
+    def test_post_is_not_retried(self, client, mock_upstream):
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(request.method)
+            raise httpx.ConnectError("connection refused", request=request)
+
+        mock_upstream("order-service", handler)
+
+        response = client.post("/api/v1/rest/order-service/orders", json={})
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert calls == ["POST"]
+
+    def test_server_errors_and_read_timeouts_are_not_retried(self, client, mock_upstream):
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(request.url.path)
+            if request.url.path.endswith("/slow"):
+                raise httpx.ReadTimeout("read timed out", request=request)
+            return httpx.Response(500, text="boom")
+
+        mock_upstream("order-service", handler)
+
+        assert client.get("/api/v1/rest/order-service/orders").status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert client.get("/api/v1/rest/order-service/orders/slow").status_code == status.HTTP_504_GATEWAY_TIMEOUT
+        assert len(calls) == 2
+
+    def test_empty_budget_stops_retries(self, client, mock_upstream, monkeypatch):
+        monkeypatch.setattr(retry_budget, "min_per_second", 0)
+        monkeypatch.setattr(retry_budget, "ratio", 0)
+        retry_budget.reset()
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(request.method)
+            raise httpx.ConnectError("connection refused", request=request)
+
+        mock_upstream("order-service", handler)
+
+        response = client.get("/api/v1/rest/order-service/orders")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert calls == ["GET"]
+        assert retry_budget.exhausted == 1
+
+
+class TestHedging:
+    """Test cases for hedged requests"""
+
+    def test_slow_replica_is_hedged(self, client, mock_upstream, menu_replicas, monkeypatch):
+        monkeypatch.setattr(Config, "HEDGE_DEFAULT_DELAY", 0.05)
+        hosts = []
+
+        async def handler(request: httpx.Request):
+            hosts.append(request.url.host)
+            if len(hosts) == 1:
+                await asyncio.sleep(2.0)
+            return httpx.Response(200, json={"served_by": request.url.host})
+
+        mock_upstream("menu-service", handler)
+
+        started = time.monotonic()
+        response = client.get("/api/v1/rest/menu-service/restaurants/r1/menus")
+
+        assert time.monotonic() - started < 1.0
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(hosts) == ["menu-1", "menu-2"]
+        assert response.json()["served_by"] == hosts[1]
+        assert UPSTREAM_HEDGES.value("menu-service", "hedge") == 1
+
+    def test_fast_answer_is_not_hedged(self, client, mock_upstream, menu_replicas):
+        hosts = []
+
+        def handler(request: httpx.Request):
+            hosts.append(request.url.host)
+            return httpx.Response(200, json={})
+
+        mock_upstream("menu-service", handler)
+
+        client.get("/api/v1/rest/menu-service/restaurants/r1/menus")
+
+        assert len(hosts) == 1
+
+    def test_routes_without_policy_are_not_hedged(self, client, mock_upstream, menu_replicas, monkeypatch):
+        monkeypatch.setattr(Config, "HEDGE_DEFAULT_DELAY", 0.01)
+        hosts = []
+
+        async def handler(request: httpx.Request):
+            hosts.append(request.url.host)
+            await asyncio.sleep(0.1)
+            return httpx.Response(200, json={})
+
+        mock_upstream("menu-service", handler)
+
+        client.get("/api/v1/rest/menu-service/menus/m1")
+
+        assert len(hosts) == 1
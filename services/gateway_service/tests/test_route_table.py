@@ -0,0 +1,68 @@
+"""
+Test cases for the compiled gateway route table
+"""
+
+from config import Config
+from utility.route_table import RouteTable, route_table
+
+
+class TestRouteTable:
+    """Test cases for RouteTable"""
+
+    def test_service_resolution(self):
+        """Service routes carry the upstream base URL"""
+        route = route_table.match("cart-service/cart/items")
+
+        assert route.service_name == "cart-service"
+        assert route.base_url == Config.SERVICE_ENDPOINTS["cart-service"]
+
+    def test_unknown_service(self):
+        """Unknown services resolve to no upstream"""
+        route = route_table.match("payment-service/payments")
+
+        assert route.base_url is None
+        assert route.public is False
+
+    def test_public_prefix_and_exact_paths(self):
+        """Public prefixes cover sub-paths; exact public paths don't"""
+        assert route_table.match_path("/api/v1/rest/health").public
+        assert route_table.match_path("/api/v1/rest/menu-service/restaurants/r1/menus").public
+        assert route_table.match_path("/api/v1/rest/user-service/exists").public
+        assert not route_table.match_path("/api/v1/rest/user-service/exists/more").public
+        assert not route_table.match_path("/api/v1/rest/user-service/me").public
+        # Segment-wise: a shared string prefix is not enough
+        assert not route_table.match_path("/api/v1/rest/restaurant-service/restaurants-admin").public
+
+    def test_route_policies(self):
+        """Cache TTL, timeout and rate-limit class come from one lookup"""
+        catalog = route_table.match("menu-service/restaurants/r1/menus")
+        orders = route_table.match("order-service/orders/o1")
+
+        assert catalog.cache_ttl == Config.RESPONSE_CACHE_ROUTES["menu-service/restaurants"]["ttl"]
+        assert catalog.timeout.read == Config.ROUTE_TIMEOUTS["menu-service/restaurants"]
+        assert orders.cache_ttl is None
+        assert orders.rate_limit_class == "checkout"
+
+    def test_wildcard_segment(self):
+        """'*' matches one segment and literal segments win over it"""
+        table = RouteTable()
+        table.add("review-service", service_name="review-service")
+        table.add("review-service/restaurants/*/reviews", public=True, cache_ttl=10.0)
+        table.add("review-service/restaurants/featured/reviews", cache_ttl=60.0)
+        table.compile()
+
+        assert table.match("review-service/restaurants/r1/reviews").public
+        assert table.match("review-service/restaurants/r1/reviews").cache_ttl == 10.0
+        assert table.match("review-service/restaurants/featured/reviews").cache_ttl == 60.0
+        assert not table.match("review-service/reviews/1").public
+
+    def test_many_routes_match_in_one_walk(self):
+        """Adding hundreds of routes doesn't change the lookup result"""
+        table = RouteTable()
+        table.add("menu-service", service_name="menu-service")
+        for index in range(200):
+            table.add(f"menu-service/section-{index}", cache_ttl=float(index))
+        table.compile()
+
+        assert table.match("menu-service/section-199/items").cache_ttl == 199.0
+        assert table.match("menu-service/other").cache_ttl is None
@@ -0,0 +1,82 @@
+"""
+Test cases for the streaming pass-through proxy
+"""
+
+import gzip
+
+import httpx
+import pytest
+from fastapi import status
+
+from config import Config
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.fixture(autouse=True)
+def streaming_mode(monkeypatch):
+    monkeypatch.setattr(Config, "PROXY_STREAMING", True)
+
+
+class TestStreamServiceRequest:
+    """Test cases for stream_service_request"""
+
+    def test_response_bytes_pass_through_unchanged(self, client, mock_upstream):
+        """Upstream body, status and content-encoding are forwarded as-is"""
+        payload = gzip.compress(b'{"menus": [1, 2, 3]}')
+
+        def handler(request: httpx.Request):
+            return httpx.Response(
+                200,
+                content=_chunks(payload[:10], payload[10:]),
+                headers={"content-type": "application/json", "content-encoding": "gzip"},
+            )
+
+        mock_upstream("menu-service", handler)
+
+        with client.stream("GET", "/api/v1/rest/menu-service/menus/m1") as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == "gzip"
+        assert raw == payload
+
+    def test_request_body_is_streamed_upstream(self, client, mock_upstream):
+        """POST body reaches the backend intact"""
+        received = {}
+
+        def handler(request: httpx.Request):
+            received["body"] = request.read()
+            received["content-length"] = request.headers.get("content-length")
+            return httpx.Response(201, content=_chunks(b'{"ok": true}'))
+
+        mock_upstream("cart-service", handler)
+
+        response = client.post("/api/v1/rest/cart-service/cart/items", content=b'{"quantity": 2}')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert received["body"] == b'{"quantity": 2}'
+        assert received["content-length"] == "15"
+
+    def test_upstream_error_status_is_passed_through(self, client, mock_upstream):
+        """Error responses keep the original status and body"""
+        mock_upstream("review-service", lambda request: httpx.Response(409, content=_chunks(b"conflict")))
+
+        response = client.get("/api/v1/rest/review-service/reviews/1")
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.text == "conflict"
+
+    def test_upstream_timeout_returns_504(self, client, mock_upstream):
+        """Connection timeouts surface as gateway timeouts"""
+        def handler(request: httpx.Request):
+            raise httpx.ConnectTimeout("timed out", request=request)
+
+        mock_upstream("order-service", handler)
+
+        response = client.get("/api/v1/rest/order-service/orders")
+
+        assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
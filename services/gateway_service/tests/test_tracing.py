@@ -0,0 +1,118 @@
+"""
+Test cases for request IDs and trace context propagation
+"""
+
+import json
+
+import httpx
+import pytest
+from fastapi import status
+
+from config import Config
+from utility.tracing import SPAN_KIND_CLIENT, SPAN_KIND_SERVER, Span, SpanExporter, parse_traceparent, start_request_span
+
+INCOMING_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+INCOMING_TRACEPARENT = f"00-{INCOMING_TRACE_ID}-00f067aa0ba902b7-01"
+
+
+@pytest.fixture
+def recording_upstream(mock_upstream):
+    """menu-service mock remembering the headers of each call"""
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request.headers)
+        return httpx.Response(200, json={"ok": True})
+
+    mock_upstream("menu-service", handler)
+    return calls
+
+
+class TestTraceContext:
+    """Test cases for traceparent parsing and span creation"""
+
+    def test_parse_traceparent(self):
+        assert parse_traceparent(INCOMING_TRACEPARENT) == (INCOMING_TRACE_ID, "00f067aa0ba902b7", True)
+        assert parse_traceparent(f"00-{INCOMING_TRACE_ID}-00f067aa0ba902b7-00")[2] is False
+
+    @pytest.mark.parametrize("value", [
+        None,
+        "garbage",
+        f"01-{INCOMING_TRACE_ID}-00f067aa0ba902b7-01",
+        f"00-{'0' * 32}-00f067aa0ba902b7-01",
+        f"00-{INCOMING_TRACE_ID}-{'0' * 16}-01",
+    ])
+    def test_invalid_traceparent_is_ignored(self, value):
+        assert parse_traceparent(value) is None
+
+    def test_unsafe_request_id_is_replaced(self):
+        span = start_request_span("GET x", None, "bad id\nwith newline")
+
+        assert span.request_id == span.trace_id
+
+    def test_new_traces_follow_sample_ratio(self, monkeypatch):
+        monkeypatch.setattr(Config, "TRACE_SAMPLE_RATIO", 0.0)
+
+        assert start_request_span("GET x", None, None).sampled is False
+        assert start_request_span("GET x", INCOMING_TRACEPARENT, None).sampled is True
+
+
+class TestTracePropagation:
+    """Test cases for headers forwarded to backend services"""
+
+    def test_new_trace_is_started_and_forwarded(self, client, recording_upstream):
+        response = client.get("/api/v1/rest/menu-service/menus/m1")
+
+        assert response.status_code == status.HTTP_200_OK
+        trace_id, _, sampled = parse_traceparent(recording_upstream[0]["traceparent"])
+        assert sampled is True
+        assert recording_upstream[0]["x-request-id"] == trace_id
+        assert response.headers["x-request-id"] == trace_id
+
+    def test_incoming_trace_is_continued(self, client, recording_upstream):
+        response = client.get(
+            "/api/v1/rest/menu-service/menus/m1",
+            headers={"traceparent": INCOMING_TRACEPARENT, "x-request-id": "checkout-42"},
+        )
+
+        trace_id, parent_id, _ = parse_traceparent(recording_upstream[0]["traceparent"])
+        assert trace_id == INCOMING_TRACE_ID
+        assert parent_id != "00f067aa0ba902b7"
+        assert recording_upstream[0].get_list("x-request-id") == ["checkout-42"]
+        assert response.headers["x-request-id"] == "checkout-42"
+
+    def test_rejected_requests_still_get_a_request_id(self, anonymous_client):
+        response = anonymous_client.get("/api/v1/rest/order-service/orders")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.headers["x-request-id"]
+
+
+class TestSpanExporter:
+    """Test cases for the OTLP JSON file sink"""
+
+    def test_spans_are_written_as_otlp_json(self, tmp_path):
+        sink = tmp_path / "spans.jsonl"
+        exporter = SpanExporter(kind="file", file_path=str(sink))
+        span = Span("GET menus", SPAN_KIND_SERVER, INCOMING_TRACE_ID, None, "req-1", True, {"http.status_code": 200})
+        span.end_ns = span.start_ns + 1_000_000
+        child = span.child("GET menu-service", SPAN_KIND_CLIENT)
+        child.end_ns = child.start_ns
+        unsampled = Span("GET menus", SPAN_KIND_SERVER, INCOMING_TRACE_ID, None, "req-2", False)
+
+        for finished in (span, child, unsampled):
+            exporter.export(finished)
+        exporter.flush()
+        exporter.close()
+
+        exported = [
+            exported_span
+            for line in sink.read_text().splitlines()
+            for resource in json.loads(line)["resourceSpans"]
+            for scope in resource["scopeSpans"]
+            for exported_span in scope["spans"]
+        ]
+        assert [exported_span["name"] for exported_span in exported] == ["GET menus", "GET menu-service"]
+        assert exported[1]["parentSpanId"] == span.span_id
+        assert {"key": "http.status_code", "value": {"intValue": "200"}} in exported[0]["attributes"]
+        assert {"key": "request.id", "value": {"stringValue": "req-1"}} in exported[0]["attributes"]
@@ -0,0 +1,154 @@
+"""
+Priority admission control for the gateway
+
+At most Config.MAX_IN_FLIGHT_REQUESTS requests run at once. Requests that
+cannot start right away wait in a bounded FIFO queue for their priority
+class (Config.ADMISSION_CLASSES) and are answered 503 when:
+
+- their class queue is full ("queue_full")
+- they waited longer than the class deadline ("deadline")
+- a higher class needed their place in a full gateway queue ("shed";
+  the newest waiter of the lowest class goes first)
+
+A freed slot goes to the oldest waiter of the highest class. Each class may
+only fill `share` of the slots, so lower classes always leave headroom and
+checkout never queues behind a browse spike.
+"""
+
+import asyncio
+import math
+from collections import deque
+from typing import Dict, List, Optional
+
+from config import Config
+
+SHED_REASONS = ("queue_full", "deadline", "shed")
+
+
+class _PriorityClass:
+    __slots__ = ("name", "priority", "limit", "max_queue", "deadline", "waiters", "admitted", "shed")
+
+    def __init__(self, name: str, spec: dict, capacity: int):
+        self.name = name
+        self.priority = spec["priority"]
+        self.limit = math.floor(capacity * spec.get("share", 1.0))
+        self.max_queue = spec["max_queue"]
+        self.deadline = spec["deadline"]
+        self.waiters: deque = deque()
+        self.admitted = 0
+        self.shed = dict.fromkeys(SHED_REASONS, 0)
+
+
+class AdmissionController:
+    """Shared in-flight slots handed out by priority class"""
+
+    def __init__(self, capacity: int = None, classes: Dict[str, dict] = None, max_queued: int = None):
+        self.capacity = Config.MAX_IN_FLIGHT_REQUESTS if capacity is None else capacity
+        self.max_queued = Config.ADMISSION_MAX_QUEUED if max_queued is None else max_queued
+        specs = classes or Config.ADMISSION_CLASSES
+        self._classes: List[_PriorityClass] = sorted(
+            (_PriorityClass(name, spec, self.capacity) for name, spec in specs.items()),
+            key=lambda priority_class: priority_class.priority,
+        )
+        self._by_name = {priority_class.name: priority_class for priority_class in self._classes}
+        self.in_flight = 0
+
+    def reset(self):
+        self.__init__()
+
+    @property
+    def queued(self) -> int:
+        return sum(len(priority_class.waiters) for priority_class in self._classes)
+
+    async def acquire(self, class_name: str) -> Optional[str]:
+        """
+        Wait for a slot
+
+        Returns:
+            None once admitted (call release() when done), otherwise the shed reason
+        """
+        priority_class = self._by_name[class_name]
+
+        if self.in_flight < priority_class.limit and not self._waiting_at_or_above(priority_class):
+            self._admit(priority_class)
+            return None
+
+        if len(priority_class.waiters) >= priority_class.max_queue:
+            priority_class.shed["queue_full"] += 1
+            return "queue_full"
+        if self.queued >= self.max_queued and not self._shed_lower(priority_class):
+            priority_class.shed["queue_full"] += 1
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        priority_class.waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), priority_class.deadline)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Admitted at the same moment the deadline passed
+                return waiter.result()
+            priority_class.waiters.remove(waiter)
+            waiter.cancel()
+            priority_class.shed["deadline"] += 1
+            return "deadline"
+        except asyncio.CancelledError:
+            # Client went away while waiting
+            if waiter.done() and waiter.result() is None:
+                self.release()
+            elif not waiter.done():
+                priority_class.waiters.remove(waiter)
+                waiter.cancel()
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "capacity": self.capacity,
+            "classes": {
+                priority_class.name: {
+                    "priority": priority_class.priority,
+                    "limit": priority_class.limit,
+                    "queued": len(priority_class.waiters),
+                    "admitted": priority_class.admitted,
+                    "shed": dict(priority_class.shed),
+                }
+                for priority_class in self._classes
+            },
+        }
+
+    def _admit(self, priority_class: _PriorityClass):
+        self.in_flight += 1
+        priority_class.admitted += 1
+
+    def _waiting_at_or_above(self, priority_class: _PriorityClass) -> bool:
+        return any(
+            other.waiters for other in self._classes if other.priority <= priority_class.priority
+        )
+
+    def _shed_lower(self, priority_class: _PriorityClass) -> bool:
+        """Drop the newest waiter of the lowest class below `priority_class`"""
+        for lower in reversed(self._classes):
+            if lower.priority <= priority_class.priority:
+                return False
+            if lower.waiters:
+                lower.waiters.pop().set_result("shed")
+                lower.shed["shed"] += 1
+                return True
+        return False
+
+    def _dispatch(self):
+        for priority_class in self._classes:
+            while priority_class.waiters and self.in_flight < priority_class.limit:
+                self._admit(priority_class)
+                priority_class.waiters.popleft().set_result(None)
+            if priority_class.waiters:
+                # Lower classes never overtake a waiting higher class
+                return
+
+
+admission = AdmissionController()
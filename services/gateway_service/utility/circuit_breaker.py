@@ -0,0 +1,167 @@
+"""
+Per-upstream circuit breaker for the gateway
+
+Trips when the recent error rate or slow-call rate of a service crosses its
+threshold, fails fast while open, and lets a few probe requests through
+(half-open) before closing again. A stalled backend then costs callers a
+503 instead of a full timeout.
+"""
+
+import time
+from collections import deque
+from typing import Dict
+
+from config import Config
+from utility.enums import CircuitState
+from utility.logger import logger
+
+
+class CircuitBreaker:
+    """Sliding-window circuit breaker for one upstream service"""
+
+    def __init__(self, service_name: str, settings: dict):
+        self.service_name = service_name
+        self.window_seconds = settings["window_seconds"]
+        self.min_calls = settings["min_calls"]
+        self.error_rate_threshold = settings["error_rate_threshold"]
+        self.slow_call_seconds = settings["slow_call_seconds"]
+        self.slow_rate_threshold = settings["slow_rate_threshold"]
+        self.open_seconds = settings["open_seconds"]
+        self.half_open_max_calls = settings["half_open_max_calls"]
+
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        # (timestamp, failed, slow) and running counts over the window
+        self._calls = deque()
+        self._failures = 0
+        self._slow = 0
+
+    def allow_request(self) -> bool:
+        """False when the circuit is open (caller should fail fast)"""
+        if self.state is CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self._transition(CircuitState.HALF_OPEN)
+
+        if self.state is CircuitState.HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self._half_open_in_flight += 1
+        return True
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed"""
+        if self.state is not CircuitState.OPEN:
+            return 1.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+
+    def record_success(self, latency: float):
+        self._record(failed=False, latency=latency)
+
+    def record_failure(self, latency: float):
+        self._record(failed=True, latency=latency)
+
+    def record_result(self, status_code: int, latency: float):
+        """5xx responses count as failures, everything else as success"""
+        self._record(failed=status_code >= 500, latency=latency)
+
+    def release(self):
+        """Give back a half-open probe slot without recording an outcome"""
+        if self.state is CircuitState.HALF_OPEN and self._half_open_in_flight > 0:
+            self._half_open_in_flight -= 1
+
+    def snapshot(self) -> dict:
+        failures, slow, total = self._window_counts(time.monotonic())
+        return {
+            "state": self.state.value,
+            "calls": total,
+            "error_rate": failures / total if total else 0.0,
+            "slow_rate": slow / total if total else 0.0,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+    def _record(self, failed: bool, latency: float):
+        slow = latency >= self.slow_call_seconds
+
+        if self.state is CircuitState.HALF_OPEN:
+            self.release()
+            if failed or slow:
+                self._transition(CircuitState.OPEN)
+                return
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.half_open_max_calls:
+                self._transition(CircuitState.CLOSED)
+            return
+
+        now = time.monotonic()
+        self._calls.append((now, failed, slow))
+        self._failures += failed
+        self._slow += slow
+        if self.state is CircuitState.CLOSED and self._should_trip(now):
+            self._transition(CircuitState.OPEN)
+
+    def _should_trip(self, now: float) -> bool:
+        failures, slow, total = self._window_counts(now)
+        if total < self.min_calls:
+            return False
+        return (
+            failures / total >= self.error_rate_threshold
+            or slow / total >= self.slow_rate_threshold
+        )
+
+    def _window_counts(self, now: float):
+        """Drop calls older than the window (amortized O(1) per call)"""
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            _, failed, slow = self._calls.popleft()
+            self._failures -= failed
+            self._slow -= slow
+        return self._failures, self._slow, len(self._calls)
+
+    def _transition(self, state: CircuitState):
+        if state is self.state:
+            return
+        logger.warning("Circuit for %s: %s -> %s", self.service_name, self.state.value, state.value)
+        self.state = state
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        if state is CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+        elif state is CircuitState.CLOSED:
+            self._calls.clear()
+            self._failures = 0
+            self._slow = 0
+
+
+class CircuitBreakerRegistry:
+    """One breaker per entry in Config.SERVICE_ENDPOINTS"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, service_name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(service_name)
+        if breaker is None:
+            settings = {
+                **Config.CIRCUIT_BREAKER,
+                **Config.CIRCUIT_BREAKER_OVERRIDES.get(service_name, {}),
+            }
+            breaker = CircuitBreaker(service_name, settings)
+            self._breakers[service_name] = breaker
+        return breaker
+
+    def reset(self):
+        self._breakers.clear()
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: self.get(name).snapshot() for name in Config.SERVICE_ENDPOINTS}
+
+
+circuit_breakers = CircuitBreakerRegistry()
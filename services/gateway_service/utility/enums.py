@@ -1,2 +1,8 @@
 # enums.py
-# gateway_service용 enum 정의 파일 
\ No newline at end of file
+# gateway_service용 enum 정의 파일
+from enum import Enum
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
@@ -0,0 +1,111 @@
+"""
+Upstream HTTP client registry for the gateway
+
+Keeps one long-lived httpx.AsyncClient per backend service so proxied
+requests reuse keep-alive connections instead of opening a new TCP
+connection (and DNS lookup) on every call.
+"""
+
+from typing import Dict, Optional
+
+import httpx
+from config import Config
+from utility.logger import logger
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class UpstreamClientRegistry:
+    """One pooled AsyncClient per entry in Config.SERVICE_ENDPOINTS"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    async def start(self):
+        """Create clients for every configured service (called from the app lifespan)"""
+        for service_name in Config.SERVICE_ENDPOINTS:
+            self.get(service_name)
+        logger.info("Upstream client pools created for %s services", len(self._clients))
+
+    async def close(self):
+        """Close all pooled connections (called on app shutdown)"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def get(self, service_name: str) -> httpx.AsyncClient:
+        """Return the pooled client for a service, creating it on first use"""
+        client = self._clients.get(service_name)
+        if client is None or client.is_closed:
+            client = self._build_client(service_name)
+            self._clients[service_name] = client
+        return client
+
+    def timeout_for(self, service_name: str) -> httpx.Timeout:
+        """Per-service timeouts, falling back to the gateway defaults"""
+        overrides = Config.SERVICE_TIMEOUTS.get(service_name, {})
+        return httpx.Timeout(
+            connect=overrides.get("connect", Config.CONNECT_TIMEOUT),
+            read=overrides.get("read", Config.REQUEST_TIMEOUT),
+            write=overrides.get("write", Config.REQUEST_TIMEOUT),
+            pool=overrides.get("pool", Config.POOL_TIMEOUT),
+        )
+
+    def _build_client(self, service_name: str) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=Config.POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=Config.POOL_KEEPALIVE_EXPIRY,
+        )
+        http2 = service_name in Config.HTTP2_SERVICES
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 requested for %s but 'h2' is not installed, using HTTP/1.1", service_name)
+            http2 = False
+
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=self.timeout_for(service_name),
+            http2=http2,
+        )
+
+    def pool_stats(self, service_name: Optional[str] = None) -> Dict[str, dict]:
+        """
+        Connection pool statistics per service
+
+        - in_use: connections currently serving a request
+        - idle: open keep-alive connections available for reuse
+        - waiting: requests queued for a free connection
+        """
+        names = [service_name] if service_name else list(Config.SERVICE_ENDPOINTS)
+        stats = {}
+        for name in names:
+            client = self._clients.get(name)
+            stats[name] = self._client_stats(client) if client else {
+                "in_use": 0, "idle": 0, "waiting": 0, "http2": False
+            }
+        return stats
+
+    @staticmethod
+    def _client_stats(client: httpx.AsyncClient) -> dict:
+        # httpx doesn't expose pool state publicly; read it from the httpcore pool
+        pool = getattr(client._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        requests = list(getattr(pool, "_requests", []) or [])
+
+        idle = sum(1 for conn in connections if conn.is_idle())
+        waiting = sum(1 for req in requests if req.is_queued())
+        return {
+            "in_use": len(connections) - idle,
+            "idle": idle,
+            "waiting": waiting,
+            "http2": bool(getattr(pool, "_http2", False)),
+        }
+
+
+upstream_clients = UpstreamClientRegistry()
@@ -0,0 +1,185 @@
+"""
+Building gateway responses from upstream bodies
+
+- Hop-by-hop header filtering for proxied responses
+- Negotiated compression: gzip always, br when the optional 'brotli' package
+  is installed; bodies under Config.COMPRESSION_MIN_BYTES are sent as is
+- Strong ETags for JSON GET responses and 304 Not Modified for a matching
+  If-None-Match
+
+The ETag is a hash of the uncompressed body. Encoded variants get their own
+strong tag ("<hash>-gzip", "<hash>-br") because their bytes differ, but any
+variant of the same body satisfies If-None-Match.
+"""
+
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+import httpx
+from fastapi import Request
+from fastapi.responses import Response
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Hop-by-hop headers must not be forwarded by a proxy (RFC 7230 6.1)
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+# Headers a 304 repeats from the full response (RFC 7232 4.1)
+NOT_MODIFIED_HEADERS = {"cache-control", "content-location", "date", "expires", "vary"}
+
+
+def filter_response_headers(headers: httpx.Headers) -> dict:
+    """
+    Upstream response headers minus hop-by-hop headers
+    """
+    return {
+        key: value
+        for key, value in headers.items()
+        if key.lower() not in HOP_BY_HOP_HEADERS
+    }
+
+
+def supported_encodings() -> tuple:
+    """Content codings the gateway can produce, in order of preference"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the preferred supported coding the client accepts (q > 0), None for identity"""
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in supported_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=Config.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=Config.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def is_compressible(headers: Dict[str, str], body: bytes) -> bool:
+    content_type = _header(headers, "content-type") or ""
+    return (
+        Config.COMPRESSION_ENABLED
+        and len(body) >= Config.COMPRESSION_MIN_BYTES
+        and content_type.startswith(Config.COMPRESSIBLE_CONTENT_TYPES)
+    )
+
+
+def encode_variants(headers: Dict[str, str], body: bytes) -> Dict[str, bytes]:
+    """Every supported encoding of a body, computed once (e.g. when it is cached)"""
+    if not is_compressible(headers, body):
+        return {}
+    return {encoding: compress(body, encoding) for encoding in supported_encodings()}
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def wants_etag(method: str, status_code: int, headers: Dict[str, str]) -> bool:
+    """ETags are generated for successful JSON GETs"""
+    content_type = _header(headers, "content-type") or ""
+    return method in ("GET", "HEAD") and status_code == 200 and content_type.startswith("application/json")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison; encoded variant suffixes are ignored"""
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.strip('"')
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        for encoding in ("gzip", "br"):
+            if tag.endswith(f"-{encoding}"):
+                tag = tag[: -len(encoding) - 1]
+                break
+        if tag == opaque:
+            return True
+    return False
+
+
+def build_response(
+    request: Request,
+    status_code: int,
+    headers: Dict[str, str],
+    body: bytes,
+    etag: Optional[str] = None,
+    variants: Optional[Dict[str, bytes]] = None,
+) -> Response:
+    """
+    Final response for an upstream body: 304, compressed or identity
+
+    `variants` are pre-compressed bodies by encoding (from the cache);
+    otherwise the chosen encoding is computed here.
+    """
+    headers = dict(headers)
+    encoding = None
+    if variants or is_compressible(headers, body):
+        _add_vary(headers, "Accept-Encoding")
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+
+    if etag is not None:
+        headers["etag"] = f'{etag[:-1]}-{encoding}"' if encoding else etag
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            kept = {key: value for key, value in headers.items() if key.lower() in NOT_MODIFIED_HEADERS}
+            return Response(status_code=304, headers={**kept, "etag": headers["etag"]})
+
+    if encoding:
+        body = (variants or {}).get(encoding) or compress(body, encoding)
+        headers["content-encoding"] = encoding
+
+    return Response(content=body, status_code=status_code, headers=headers)
+
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _add_vary(headers: Dict[str, str], value: str):
+    for key, current in headers.items():
+        if key.lower() == "vary":
+            if value.lower() not in current.lower():
+                headers[key] = f"{current}, {value}"
+            return
+    headers["vary"] = value
@@ -0,0 +1,289 @@
+"""
+Client-side load balancing across service replicas
+
+Each service keeps its logical base URL in Config.SERVICE_ENDPOINTS (used
+to build request URLs); the load balancer picks a replica origin per
+request and send_upstream points the request at it. Replicas come from
+the JSON file in Config.UPSTREAMS_FILE:
+
+    {"menu-service": ["http://menu-1:9110", "http://menu-2:9110"]}
+
+The file is re-read when it changes, without a restart. Services not
+listed use the host from SERVICE_ENDPOINTS. Services in
+Config.SINGLE_INSTANCE_SERVICES (cart-service keeps carts in process
+memory) may list only one origin.
+
+- Strategies: round_robin, least_outstanding, p2c (power of two choices)
+- Active health checks: GET <replica><base path>/<health path> (or the
+  OpenAPI schema); anything but 2xx/3xx, or no answer, marks the replica
+  down until a later check passes
+- Passive ejection: consecutive 5xx/timeouts/connection errors eject a
+  replica for a while (longer on repeated ejections)
+- If every replica is down or ejected, all of them are used (panic mode)
+  rather than failing every request
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from config import Config
+from utility.logger import logger
+
+STRATEGIES = ("round_robin", "least_outstanding", "p2c")
+
+
+class Endpoint:
+    """One replica of a service"""
+    __slots__ = ("origin", "url", "outstanding", "healthy", "consecutive_failures", "ejected_until", "ejections")
+
+    def __init__(self, origin: str):
+        self.origin = origin.rstrip("/")
+        self.url = httpx.URL(self.origin)
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+    def apply_to(self, request: httpx.Request):
+        """Point a request built against the logical base URL at this replica"""
+        url = request.url
+        if (url.scheme, url.host, url.port) == (self.url.scheme, self.url.host, self.url.port):
+            return
+        request.url = url.copy_with(scheme=self.url.scheme, host=self.url.host, port=self.url.port)
+        request.headers["Host"] = self.url.netloc.decode("ascii")
+
+    def available(self, now: float) -> bool:
+        return self.healthy and now >= self.ejected_until
+
+    def snapshot(self, now: float) -> dict:
+        return {
+            "origin": self.origin,
+            "healthy": self.healthy,
+            "ejected_for": round(max(0.0, self.ejected_until - now), 3),
+            "outstanding": self.outstanding,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class ServiceEndpoints:
+    """Replicas of one service and the strategy choosing between them"""
+
+    def __init__(self, service_name: str, endpoints: List[Endpoint], strategy: str):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown load balancing strategy '{strategy}' for {service_name}")
+        self.service_name = service_name
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self._counter = itertools.count()
+
+    def pick(self, exclude=()) -> Endpoint:
+        """Choose a replica, avoiding `exclude` (already tried) while others are left"""
+        if len(self.endpoints) == 1:
+            return self.endpoints[0]
+
+        now = time.monotonic()
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.available(now)] or self.endpoints
+        if exclude:
+            candidates = [endpoint for endpoint in candidates if endpoint not in exclude] or candidates
+        if len(candidates) == 1:
+            return candidates[0]
+
+        if self.strategy == "round_robin":
+            return candidates[next(self._counter) % len(candidates)]
+        if self.strategy == "least_outstanding":
+            # Rotate the starting point so ties are spread across replicas
+            offset = next(self._counter) % len(candidates)
+            rotated = candidates[offset:] + candidates[:offset]
+            return min(rotated, key=lambda endpoint: endpoint.outstanding)
+        first, second = random.sample(candidates, 2)
+        return first if first.outstanding <= second.outstanding else second
+
+    def record(self, endpoint: Endpoint, failed: bool):
+        """Passive outlier detection from real traffic"""
+        if not failed:
+            endpoint.consecutive_failures = 0
+            return
+
+        endpoint.consecutive_failures += 1
+        if len(self.endpoints) > 1 and endpoint.consecutive_failures >= Config.OUTLIER_CONSECUTIVE_FAILURES:
+            endpoint.ejections += 1
+            endpoint.consecutive_failures = 0
+            duration = Config.OUTLIER_EJECTION_SECONDS * min(endpoint.ejections, Config.OUTLIER_MAX_EJECTION_MULTIPLIER)
+            endpoint.ejected_until = time.monotonic() + duration
+            logger.warning("Ejected %s replica %s for %.0fs", self.service_name, endpoint.origin, duration)
+
+
+def _validate_origins(service_name: str, origins):
+    """A service's replicas must be a non-empty list of http(s) origin strings (ValueError otherwise)"""
+    if not isinstance(origins, list) or not origins:
+        raise ValueError(f"replicas for '{service_name}' must be a non-empty list of origins")
+    for origin in origins:
+        if not isinstance(origin, str):
+            raise ValueError(f"replica {origin!r} for '{service_name}' is not a string")
+        try:
+            url = httpx.URL(origin)
+        except httpx.InvalidURL as e:
+            raise ValueError(f"replica {origin!r} for '{service_name}': {e}")
+        if url.scheme not in ("http", "https") or not url.host:
+            raise ValueError(f"replica {origin!r} for '{service_name}' is not an http(s) URL")
+    if service_name in Config.SINGLE_INSTANCE_SERVICES and len(origins) > 1:
+        raise ValueError(f"'{service_name}' must run as a single instance, got {len(origins)} replicas")
+
+
+class LoadBalancer:
+    """Replica sets for every service, with health checking and file reload"""
+
+    def __init__(self):
+        self._services: Dict[str, ServiceEndpoints] = {}
+        self._file_mtime: Optional[float] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    def load(self, replicas: Dict[str, List[str]] = None):
+        """
+        (Re)build replica sets from SERVICE_ENDPOINTS plus `replicas`
+
+        Replicas that stay in the list keep their health and in-flight state.
+        """
+        replicas = replicas or {}
+        for service_name, origins in replicas.items():
+            _validate_origins(service_name, origins)
+        previous = {
+            (service_name, endpoint.origin): endpoint
+            for service_name, service in self._services.items()
+            for endpoint in service.endpoints
+        }
+
+        services = {}
+        for service_name, base_url in Config.SERVICE_ENDPOINTS.items():
+            base = httpx.URL(base_url)
+            origins = replicas.get(service_name) or [f"{base.scheme}://{base.netloc.decode('ascii')}"]
+            endpoints = [previous.get((service_name, origin.rstrip("/"))) or Endpoint(origin) for origin in origins]
+            strategy = Config.LOAD_BALANCER_STRATEGIES.get(service_name, Config.LOAD_BALANCER_STRATEGY)
+            services[service_name] = ServiceEndpoints(service_name, endpoints, strategy)
+
+        for service_name in set(replicas) - set(Config.SERVICE_ENDPOINTS):
+            logger.warning("Ignoring replicas for unknown service '%s'", service_name)
+
+        self._services = services
+
+    def reload_if_changed(self) -> bool:
+        """Reload Config.UPSTREAMS_FILE if it changed since the last load"""
+        path = Config.UPSTREAMS_FILE
+        if not path:
+            return False
+        try:
+            mtime = os.stat(path).st_mtime
+            if mtime == self._file_mtime:
+                return False
+            with open(path) as file:
+                replicas = json.load(file)
+            if not isinstance(replicas, dict):
+                raise ValueError("expected an object of service name -> list of origins")
+            self.load(replicas)
+        except (OSError, ValueError) as e:
+            logger.error("Could not load upstreams file %s: %s", path, e)
+            return False
+
+        self._file_mtime = mtime
+        logger.info("Loaded upstream replicas from %s", path)
+        return True
+
+    def acquire(self, service_name: str, exclude=()) -> Optional[Endpoint]:
+        """Pick a replica and count the request against it (None for unknown services)"""
+        service = self._services.get(service_name)
+        if service is None:
+            return None
+        endpoint = service.pick(exclude)
+        endpoint.outstanding += 1
+        return endpoint
+
+    def replica_count(self, service_name: str) -> int:
+        service = self._services.get(service_name)
+        return len(service.endpoints) if service else 0
+
+    def release(self, service_name: str, endpoint: Optional[Endpoint], failed: Optional[bool]):
+        """
+        Finish a request on a replica
+
+        failed=None means no verdict (e.g. the client went away).
+        """
+        if endpoint is None:
+            return
+        endpoint.outstanding -= 1
+        service = self._services.get(service_name)
+        if service is not None and failed is not None:
+            service.record(endpoint, failed)
+
+    async def start(self, get_client: Callable[[str], httpx.AsyncClient]):
+        """Load replicas and start the background health checker (app lifespan)"""
+        self._file_mtime = None
+        self.load()
+        self.reload_if_changed()
+        self._health_task = asyncio.create_task(self._health_loop(get_client))
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    async def check_health(self, get_client: Callable[[str], httpx.AsyncClient]):
+        """Probe every replica of services that have more than one"""
+        checks = [
+            self._check_endpoint(service_name, endpoint, get_client(service_name))
+            for service_name, service in self._services.items()
+            if len(service.endpoints) > 1
+            for endpoint in service.endpoints
+        ]
+        await asyncio.gather(*checks)
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            service_name: {
+                "strategy": service.strategy,
+                "endpoints": [endpoint.snapshot(now) for endpoint in service.endpoints],
+            }
+            for service_name, service in self._services.items()
+        }
+
+    async def _health_loop(self, get_client: Callable[[str], httpx.AsyncClient]):
+        while True:
+            await asyncio.sleep(Config.HEALTH_CHECK_INTERVAL)
+            try:
+                self.reload_if_changed()
+                await self.check_health(get_client)
+            except Exception as e:
+                logger.error("Upstream health check failed: %s", e)
+
+    async def _check_endpoint(self, service_name: str, endpoint: Endpoint, client: httpx.AsyncClient):
+        health_path = Config.HEALTH_CHECK_PATHS.get(service_name, Config.HEALTH_CHECK_DEFAULT_PATH)
+        if health_path.startswith("/"):
+            url = f"{endpoint.origin}{health_path}"
+        else:
+            base_path = httpx.URL(Config.SERVICE_ENDPOINTS[service_name]).path.rstrip("/")
+            url = f"{endpoint.origin}{base_path}/{health_path}"
+        try:
+            response = await client.get(url, timeout=Config.HEALTH_CHECK_TIMEOUT)
+            # 4xx means something else is answering there (wrong base path or another service)
+            healthy = 200 <= response.status_code < 400
+        except httpx.HTTPError:
+            healthy = False
+
+        if healthy != endpoint.healthy:
+            logger.warning("%s replica %s is now %s", service_name, endpoint.origin, "healthy" if healthy else "unhealthy")
+        endpoint.healthy = healthy
+
+
+load_balancer = LoadBalancer()
+load_balancer.load()
@@ -1,14 +1,129 @@
+"""
+Gateway logging pipeline
+
+Request handlers only put records on a bounded queue; a background thread
+formats and writes them to stdout. A slow or blocked stdout therefore never
+stalls the event loop: when the queue is full, records are dropped and
+counted instead.
+
+- Lazy formatting: use %-style arguments (logger.info("... %s", value));
+  the message is rendered on the writer thread, so pass values that are
+  not mutated afterwards
+- Sampling: INFO records are kept 1 in LOG_INFO_SAMPLE_EVERY per message
+  template (WARNING and above are always kept)
+- Output: one JSON object per line (LOG_FORMAT=json) or plain text
+- Correlation: records logged while handling a request carry its
+  trace_id and request_id (JSON output)
+"""
+
+import atexit
+import json
 import logging
+import queue
 import sys
+import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+
 from config import Config
+from utility.tracing import TraceLogFilter
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes; anything else on a record came in through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; `extra=` fields are included as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep every Nth INFO record per message template"""
+
+    def __init__(self, every: int, max_templates: int = 1024):
+        super().__init__()
+        self.every = max(1, every)
+        self.max_templates = max_templates
+        self.sampled_out = 0
+        # Least recently logged templates are forgotten first (bounds pre-formatted messages)
+        self._seen: "OrderedDict[tuple, int]" = OrderedDict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or record.levelno != logging.INFO:
+            return True
+        key = (record.name, record.msg)
+        seen = self._seen.pop(key, 0)
+        self._seen[key] = seen + 1
+        if len(self._seen) > self.max_templates:
+            self._seen.popitem(last=False)
+        if seen % self.every == 0:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Enqueue without blocking; a full queue drops the record and counts it"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is left to the writer thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogWriter(QueueListener):
+    """Background thread draining the log queue into the output handler"""
+
+    def enqueue_sentinel(self):
+        # Block on shutdown so queued records are flushed before exit
+        self.queue.put(self._sentinel)
+
+
+def _output_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if Config.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+log_queue: queue.Queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+queue_handler = DroppingQueueHandler(log_queue)
+sampling_filter = SamplingFilter(Config.LOG_INFO_SAMPLE_EVERY)
+queue_handler.addFilter(sampling_filter)
+# trace_id / request_id of the current request (read on the caller's task, before queueing)
+queue_handler.addFilter(TraceLogFilter())
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO if Config.DEBUG else logging.WARNING,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[queue_handler]
 )
 
-logger = logging.getLogger("gateway_service")
\ No newline at end of file
+log_writer = LogWriter(log_queue, _output_handler())
+log_writer.start()
+atexit.register(log_writer.stop)
+
+logger = logging.getLogger("gateway_service")
@@ -0,0 +1,259 @@
+"""
+Gateway metrics in Prometheus text exposition format
+
+Counters, gauges and histograms keyed by label-value tuples. Everything is
+updated from the single event loop, so recording is a dict lookup and an
+add (plus one bisect for histograms) with no locks. Values owned by other
+components (cache, connection pools) are read by collectors at scrape time
+instead of being pushed on the hot path.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from utility.admission import admission
+from utility.http_client import upstream_clients
+from utility.load_balancer import load_balancer
+from utility.logger import queue_handler, sampling_filter
+from utility.response_cache import response_cache
+from utility.retry_policy import retry_budget
+
+# Seconds; tuned for gateway -> backend calls on one network
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]:
+        ...
+
+    def _labels(self, labelvalues: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labelvalues)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        values = self._values
+        values[labelvalues] = values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def _samples(self):
+        for labelvalues, value in self._values.items():
+            yield f"{self.name}{self._labels(labelvalues)} {_format(value)}"
+
+
+class Gauge(Counter):
+    """Value that goes up and down"""
+    kind = "gauge"
+
+    def dec(self, *labelvalues, amount: float = 1.0):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value: float, *labelvalues):
+        self._values[labelvalues] = value
+
+
+class Histogram(_Metric):
+    """Bucketed distribution; buckets are stored non-cumulative and summed at render time"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labelvalues -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues):
+        series = self._values.get(labelvalues)
+        if series is None:
+            series = self._values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labelvalues) -> int:
+        series = self._values.get(labelvalues)
+        return sum(series[:-1]) if series else 0
+
+    def _samples(self):
+        bounds = [_format(bound) for bound in self.buckets] + ["+Inf"]
+        for labelvalues, series in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, series):
+                cumulative += bucket_count
+                le = 'le="' + bound + '"'
+                yield f"{self.name}_bucket{self._labels(labelvalues, le)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(labelvalues)} {_format(series[-1])}"
+            yield f"{self.name}_count{self._labels(labelvalues)} {cumulative}"
+
+
+Collector = Callable[[], Iterable[_Metric]]
+
+
+class MetricsRegistry:
+    """Registered metrics plus scrape-time collectors"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Collector):
+        """collector() returns metrics built fresh for each scrape"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric._values.clear()
+
+    def _register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+metrics = MetricsRegistry()
+
+REQUESTS = metrics.counter(
+    "gateway_requests_total", "Requests handled by the gateway", ("service", "route", "method", "status"))
+REQUEST_DURATION = metrics.histogram(
+    "gateway_request_duration_seconds", "Time to response headers, gateway side", ("service", "route", "status"))
+IN_FLIGHT = metrics.gauge(
+    "gateway_in_flight_requests", "Requests currently being handled")
+UPSTREAM_DURATION = metrics.histogram(
+    "gateway_upstream_duration_seconds", "Upstream call latency to response headers", ("service", "route", "status"))
+POOL_WAIT = metrics.histogram(
+    "gateway_pool_wait_seconds", "Time spent waiting for an upstream connection from the pool", ("service",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+UPSTREAM_RETRIES = metrics.counter(
+    "gateway_upstream_retries_total", "Upstream attempts retried after a connection error", ("service",))
+UPSTREAM_HEDGES = metrics.counter(
+    "gateway_upstream_hedges_total", "Hedged second attempts by which attempt answered first", ("service", "winner"))
+AUTH_FAILURES = metrics.counter(
+    "gateway_auth_failures_total", "Rejected authentication attempts", ("reason",))
+REALTIME_CONNECTIONS = metrics.gauge(
+    "gateway_realtime_connections", "Open WebSocket / SSE connections", ("kind", "service"))
+REALTIME_REJECTED = metrics.counter(
+    "gateway_realtime_rejected_total", "WebSocket / SSE connections refused by a connection cap", ("kind", "limit"))
+
+
+def _cache_metrics():
+    stats = response_cache.stats
+    lookups = Counter("gateway_cache_lookups_total", "Response cache lookups by result", ("result",))
+    for result, value in (("hit", stats.hits), ("stale", stats.stale_hits), ("miss", stats.misses)):
+        lookups.inc(result, amount=value)
+    hit_ratio = Gauge("gateway_cache_hit_ratio", "Fresh and stale hits over all lookups")
+    hit_ratio.set(stats.as_dict()["hit_ratio"])
+    entries = Gauge("gateway_cache_entries", "Responses currently cached")
+    entries.set(len(response_cache))
+    return lookups, hit_ratio, entries
+
+
+def _pool_metrics():
+    connections = Gauge("gateway_pool_connections", "Upstream pool connections by state", ("service", "state"))
+    for service_name, stats in upstream_clients.pool_stats().items():
+        for state in ("in_use", "idle", "waiting"):
+            connections.set(stats[state], service_name, state)
+    return (connections,)
+
+
+def _upstream_metrics():
+    endpoints = Gauge("gateway_upstream_endpoints", "Service replicas by state", ("service", "state"))
+    for service_name, service in load_balancer.snapshot().items():
+        available = sum(1 for endpoint in service["endpoints"] if endpoint["healthy"] and not endpoint["ejected_for"])
+        endpoints.set(available, service_name, "available")
+        endpoints.set(len(service["endpoints"]) - available, service_name, "unavailable")
+    return (endpoints,)
+
+
+def _retry_budget_metrics():
+    tokens = Gauge("gateway_retry_budget_tokens", "Retries/hedges currently allowed by the budget")
+    tokens.set(retry_budget.tokens)
+    exhausted = Counter("gateway_retry_budget_exhausted_total", "Retries/hedges skipped because the budget was empty")
+    exhausted.inc(amount=retry_budget.exhausted)
+    return tokens, exhausted
+
+
+def _admission_metrics():
+    in_flight = Gauge("gateway_admission_in_flight", "Requests holding an admission slot")
+    in_flight.set(admission.in_flight)
+    queued = Gauge("gateway_admission_queue_depth", "Requests waiting for admission by priority class", ("class",))
+    admitted = Counter("gateway_admission_admitted_total", "Requests admitted by priority class", ("class",))
+    shed = Counter("gateway_admission_shed_total", "Requests shed with 503 by priority class and reason", ("class", "reason"))
+    for class_name, stats in admission.snapshot()["classes"].items():
+        queued.set(stats["queued"], class_name)
+        admitted.inc(class_name, amount=stats["admitted"])
+        for reason, count in stats["shed"].items():
+            shed.inc(class_name, reason, amount=count)
+    return in_flight, queued, admitted, shed
+
+
+def _log_metrics():
+    dropped = Counter("gateway_log_records_dropped_total", "Log records dropped because the log queue was full")
+    dropped.inc(amount=queue_handler.dropped)
+    sampled = Counter("gateway_log_records_sampled_out_total", "INFO log records skipped by sampling")
+    sampled.inc(amount=sampling_filter.sampled_out)
+    return dropped, sampled
+
+
+metrics.add_collector(_cache_metrics)
+metrics.add_collector(_pool_metrics)
+metrics.add_collector(_upstream_metrics)
+metrics.add_collector(_retry_budget_metrics)
+metrics.add_collector(_admission_metrics)
+metrics.add_collector(_log_metrics)
@@ -0,0 +1,233 @@
+"""
+Token-bucket rate limiting for the gateway
+
+Buckets live in a pluggable backend: in-process by default, a shared-memory
+table so the worker processes of one host enforce one budget, or a shared
+Redis backend so several gateway replicas do.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import Config
+from utility.logger import logger
+from utility.route_table import RoutePolicy
+
+
+class RateLimitBackend(ABC):
+    """Backend interface: take `cost` tokens from bucket `key`"""
+
+    @abstractmethod
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Returns:
+            (allowed, retry_after_seconds)
+        """
+
+    async def close(self):
+        pass
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets, bounded to max_keys (least recently used are dropped)"""
+
+    def __init__(self, max_keys: int = None):
+        self.max_keys = max_keys or Config.RATE_LIMIT_MAX_KEYS
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        return self.take(key, rate, burst, cost)
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [burst, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            tokens, updated_at = bucket
+            bucket[0] = min(burst, tokens + (now - updated_at) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return True, 0.0
+        return False, (cost - bucket[0]) / rate
+
+
+class SharedMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Buckets shared by the gateway worker processes on one host
+
+    A fixed table of (key hash, tokens, updated_at) slots in a memory-mapped
+    file. A key lives in the PROBE_WINDOW slots starting at its hash; the
+    window is held under a byte-range lock (fcntl) while its bucket is
+    updated. When the window is full, the least recently updated bucket is
+    reused, like the in-memory LRU.
+    """
+
+    SLOT = struct.Struct("<Qdd")
+    PROBE_WINDOW = 8
+
+    def __init__(self, path: str = None, slots: int = None):
+        import fcntl
+
+        self._fcntl = fcntl
+        self.path = path or Config.RATE_LIMIT_SHARED_PATH
+        self.slots = max(slots or Config.RATE_LIMIT_SHARED_SLOTS, self.PROBE_WINDOW)
+        size = self.slots * self.SLOT.size
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._table = mmap.mmap(self._fd, size)
+
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        return self.take(key, rate, burst, cost)
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        first = key_hash % (self.slots - self.PROBE_WINDOW + 1)
+        window = (self.PROBE_WINDOW * self.SLOT.size, first * self.SLOT.size)
+
+        self._fcntl.lockf(self._fd, self._fcntl.LOCK_EX, *window)
+        try:
+            now = time.monotonic()
+            slot, tokens, reused = None, burst, None
+            for index in range(first, first + self.PROBE_WINDOW):
+                slot_hash, slot_tokens, updated_at = self.SLOT.unpack_from(self._table, index * self.SLOT.size)
+                if slot_hash == key_hash:
+                    slot, tokens = index, min(burst, slot_tokens + (now - updated_at) * rate)
+                    break
+                # Empty slots (hash 0, updated_at 0.0) are the oldest
+                if reused is None or updated_at < reused[1]:
+                    reused = (index, updated_at)
+            if slot is None:
+                slot = reused[0]
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self.SLOT.pack_into(self._table, slot * self.SLOT.size, key_hash, tokens, now)
+        finally:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_UN, *window)
+
+        if allowed:
+            return True, 0.0
+        return False, (cost - tokens) / rate
+
+    async def close(self):
+        self._table.close()
+        os.close(self._fd)
+
+
+# Atomic token bucket: KEYS[1]=bucket, ARGV=rate, burst, now, cost
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Shared buckets in Redis for multi-replica gateways (requires the 'redis' package)"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        allowed, retry_after = await self._script(
+            keys=[f"gateway:ratelimit:{key}"],
+            args=[rate, burst, time.time(), cost],
+        )
+        return bool(int(allowed)), float(retry_after)
+
+    async def close(self):
+        await self._redis.close()
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    """Backend from Config.RATE_LIMIT_BACKEND, falling back to in-process buckets"""
+    if Config.RATE_LIMIT_BACKEND == "shared":
+        try:
+            return SharedMemoryRateLimitBackend()
+        except (ImportError, OSError) as e:
+            logger.warning("RATE_LIMIT_BACKEND=shared unavailable (%s), using in-memory buckets", e)
+    if Config.RATE_LIMIT_BACKEND == "redis":
+        try:
+            return RedisRateLimitBackend(Config.RATE_LIMIT_REDIS_URL)
+        except ImportError:
+            logger.warning("RATE_LIMIT_BACKEND=redis but 'redis' is not installed, using in-memory buckets")
+    return InMemoryRateLimitBackend()
+
+
+class RateLimiter:
+    """
+    Gateway rate limiter
+
+    - per-user buckets (x-user-id) for authenticated requests
+    - per-IP buckets for anonymous / public requests
+    - per-route budgets (rate-limit class) shared by all callers
+
+    Concurrency limits and load shedding are in utility.admission.
+    """
+
+    def __init__(self, backend: RateLimitBackend = None):
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.rejected: Dict[str, int] = {"user": 0, "ip": 0, "route": 0}
+
+    async def check(self, route: RoutePolicy, user_id: Optional[str], client_ip: str) -> Tuple[Optional[str], float]:
+        """
+        Returns:
+            (None, 0) if allowed, otherwise (limit_kind, retry_after_seconds)
+        """
+        if route.rate_limit_class:
+            budget = Config.RATE_LIMIT_CLASSES[route.rate_limit_class]
+            allowed, retry_after = await self.backend.acquire(f"class:{route.rate_limit_class}", budget["rate"], budget["burst"])
+            if not allowed:
+                self.rejected["route"] += 1
+                return "route", retry_after
+
+        if user_id:
+            kind, key, budget = "user", f"user:{user_id}", Config.RATE_LIMIT_PER_USER
+        else:
+            kind, key, budget = "ip", f"ip:{client_ip}", Config.RATE_LIMIT_PER_IP
+
+        allowed, retry_after = await self.backend.acquire(key, budget["rate"], budget["burst"])
+        if not allowed:
+            self.rejected[kind] += 1
+            return kind, retry_after
+        return None, 0.0
+
+    def snapshot(self) -> dict:
+        return {"rejected": dict(self.rejected)}
+
+
+rate_limiter = RateLimiter()
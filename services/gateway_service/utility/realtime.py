@@ -0,0 +1,110 @@
+"""
+Bookkeeping for long-lived client connections (WebSocket, Server-Sent Events)
+
+- Open connections are capped per user (per client IP when anonymous) and
+  gateway-wide; a connection over either cap is refused before upstream is
+  contacted
+- Open connections are exported as a gauge by kind and service
+- Idle timeout: a connection that carries no messages for
+  Config.REALTIME_IDLE_TIMEOUT seconds is closed (protocol pings do not
+  count, so quiet clients need an application heartbeat)
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Dict
+
+from config import Config
+from utility.logger import logger
+from utility.metrics import REALTIME_CONNECTIONS, REALTIME_REJECTED
+
+
+class ConnectionLimitExceeded(Exception):
+    """Refused by a connection cap; `limit` is "user" or "gateway\""""
+
+    def __init__(self, limit: str):
+        super().__init__(f"{limit} connection limit reached")
+        self.limit = limit
+
+
+class ConnectionRegistry:
+    """Counts of open long-lived connections per user and in total"""
+
+    def __init__(self, max_per_user: int = None, max_total: int = None):
+        self.max_per_user = max_per_user or Config.REALTIME_MAX_CONNECTIONS_PER_USER
+        self.max_total = max_total or Config.REALTIME_MAX_CONNECTIONS
+        self.reset()
+
+    def reset(self):
+        self._per_user: Dict[str, int] = {}
+        self.total = 0
+
+    def open(self, kind: str, service_name: str, owner: str):
+        """Register a new connection; raises ConnectionLimitExceeded when over a cap"""
+        if self.total >= self.max_total:
+            REALTIME_REJECTED.inc(kind, "gateway")
+            raise ConnectionLimitExceeded("gateway")
+        if self._per_user.get(owner, 0) >= self.max_per_user:
+            REALTIME_REJECTED.inc(kind, "user")
+            raise ConnectionLimitExceeded("user")
+
+        self._per_user[owner] = self._per_user.get(owner, 0) + 1
+        self.total += 1
+        REALTIME_CONNECTIONS.inc(kind, service_name)
+
+    def close(self, kind: str, service_name: str, owner: str):
+        remaining = self._per_user.get(owner, 0) - 1
+        if remaining > 0:
+            self._per_user[owner] = remaining
+        else:
+            self._per_user.pop(owner, None)
+        self.total -= 1
+        REALTIME_CONNECTIONS.dec(kind, service_name)
+
+    def count(self, owner: str) -> int:
+        return self._per_user.get(owner, 0)
+
+    def snapshot(self) -> dict:
+        return {
+            "open": self.total,
+            "users": len(self._per_user),
+            "max_per_user": self.max_per_user,
+            "max_total": self.max_total,
+        }
+
+
+class Activity:
+    """Time of the last message on a connection, in either direction"""
+    __slots__ = ("last",)
+
+    def __init__(self):
+        self.last = time.monotonic()
+
+    def touch(self):
+        self.last = time.monotonic()
+
+
+async def idle_watchdog(activity: Activity, timeout: float):
+    """Returns once `timeout` seconds pass without activity"""
+    while True:
+        remaining = activity.last + timeout - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(remaining)
+
+
+async def with_idle_timeout(chunks: AsyncIterator[bytes], timeout: float) -> AsyncIterator[bytes]:
+    """Pass chunks through, ending the stream when none arrives within `timeout`"""
+    iterator = chunks.__aiter__()
+    while True:
+        try:
+            chunk = await asyncio.wait_for(iterator.__anext__(), timeout)
+        except StopAsyncIteration:
+            return
+        except asyncio.TimeoutError:
+            logger.info("Closing idle event stream after %.0fs", timeout)
+            return
+        yield chunk
+
+
+realtime_connections = ConnectionRegistry()
@@ -0,0 +1,173 @@
+"""
+In-gateway response cache for public catalog GETs
+
+- Per-route TTL with stale-while-revalidate window (from the route table)
+- Size-bounded LRU eviction (entry count and total bytes)
+- Single-flight: concurrent misses on one key share a single upstream call
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from config import Config
+from utility.logger import logger
+
+
+@dataclass
+class CachedResponse:
+    """Upstream response stored in the cache"""
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    fresh_until: float = 0.0
+    stale_until: float = 0.0
+    # Strong ETag of the body and its pre-compressed variants by content coding
+    etag: Optional[str] = None
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(variant) for variant in self.variants.values())
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+
+def build_cache_key(service_name: str, path: str, query_items) -> str:
+    """Cache key from service, path and normalized (sorted) query"""
+    query = urlencode(sorted(query_items))
+    return f"{service_name}/{path.strip('/')}?{query}"
+
+
+Loader = Callable[[], Awaitable[CachedResponse]]
+
+
+class ResponseCache:
+    """LRU response cache with stale-while-revalidate and single-flight loading"""
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None, max_entry_bytes: int = None):
+        self.max_entries = max_entries or Config.RESPONSE_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or Config.RESPONSE_CACHE_MAX_BYTES
+        self.max_entry_bytes = max_entry_bytes or Config.RESPONSE_CACHE_MAX_ENTRY_BYTES
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._total_bytes = 0
+        # key -> running fill task (single-flight); also keeps tasks referenced
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def fetch(self, key: str, ttl: float, stale_while_revalidate: float, loader: Loader) -> Tuple[CachedResponse, str]:
+        """
+        Return (response, cache_status) where cache_status is HIT, STALE or MISS
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            if now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry, "HIT"
+            if now < entry.stale_until:
+                # Serve stale immediately and refresh once in the background
+                self._entries.move_to_end(key)
+                self.stats.stale_hits += 1
+                if key not in self._inflight:
+                    fill = self._start_fill(key, ttl, stale_while_revalidate, loader)
+                    fill.add_done_callback(self._refresh_done)
+                return entry, "STALE"
+
+        self.stats.misses += 1
+        fill = self._inflight.get(key)
+        if fill is not None:
+            self.stats.coalesced += 1
+        else:
+            fill = self._start_fill(key, ttl, stale_while_revalidate, loader)
+        # A cancelled caller must not cancel the fill other callers share
+        return await asyncio.shield(fill), "MISS"
+
+    def invalidate(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+
+    def clear(self):
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            **self.stats.as_dict(),
+        }
+
+    def _start_fill(self, key: str, ttl: float, stale_while_revalidate: float, loader: Loader) -> asyncio.Task:
+        fill = asyncio.create_task(self._fill(key, ttl, stale_while_revalidate, loader))
+        self._inflight[key] = fill
+        fill.add_done_callback(lambda task: self._fill_done(key, task))
+        return fill
+
+    def _fill_done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Callers await the fill through shield(); if they all went away, a failure
+        # would otherwise be reported as "exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def _fill(self, key: str, ttl: float, stale_while_revalidate: float, loader: Loader) -> CachedResponse:
+        response = await loader()
+        if self._is_cacheable(response):
+            now = time.monotonic()
+            response.fresh_until = now + ttl
+            response.stale_until = now + ttl + stale_while_revalidate
+            self._store(key, response)
+        return response
+
+    def _is_cacheable(self, response: CachedResponse) -> bool:
+        if response.status_code != 200 or response.size > self.max_entry_bytes:
+            return False
+        cache_control = response.headers.get("cache-control", "").lower()
+        return "no-store" not in cache_control and "private" not in cache_control
+
+    def _store(self, key: str, response: CachedResponse):
+        self.invalidate(key)
+        self._entries[key] = response
+        self._total_bytes += response.size
+
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted.size
+            self.stats.evictions += 1
+
+    def _refresh_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background cache refresh failed: %s", task.exception())
+
+
+response_cache = ResponseCache()
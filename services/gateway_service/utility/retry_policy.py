@@ -0,0 +1,111 @@
+"""
+Retry and hedging policy for upstream calls
+
+- RetryBudget: retries and hedges together may add at most a fixed
+  fraction of the request volume (plus a small per-second floor), so an
+  outage cannot multiply upstream load
+- LatencyTracker: rolling per-route latency window; its p95 is the delay
+  after which a hedged request sends a second attempt
+- backoff_delay: exponential backoff with full jitter
+"""
+
+import random
+import time
+from collections import deque
+from typing import Dict
+
+from config import Config
+
+# Methods safe to send twice
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Safe to race against each other (no side effects at all)
+HEDGEABLE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class RetryBudget:
+    """Token budget shared by all retries and hedges in the gateway"""
+
+    # Deposits older than this many requests' worth are not kept
+    WINDOW_REQUESTS = 1000
+
+    def __init__(self, ratio: float = None, min_per_second: float = None):
+        self.ratio = Config.RETRY_BUDGET_RATIO if ratio is None else ratio
+        self.min_per_second = Config.RETRY_BUDGET_MIN_PER_SECOND if min_per_second is None else min_per_second
+        self.max_tokens = self.ratio * self.WINDOW_REQUESTS
+        self.reset()
+
+    def reset(self):
+        self.tokens = 0.0
+        self.exhausted = 0
+        self._reserve = self.min_per_second
+        self._reserve_updated = time.monotonic()
+
+    def deposit(self):
+        """Called once per original request"""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry/hedge from the budget"""
+        now = time.monotonic()
+        self._reserve = min(self.min_per_second, self._reserve + (now - self._reserve_updated) * self.min_per_second)
+        self._reserve_updated = now
+
+        if self._reserve >= 1.0:
+            self._reserve -= 1.0
+            return True
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.exhausted += 1
+        return False
+
+    def snapshot(self) -> dict:
+        return {"tokens": round(self.tokens, 2), "max_tokens": self.max_tokens, "exhausted": self.exhausted}
+
+
+class LatencyTracker:
+    """Recent upstream latencies per route and the derived hedge delay"""
+
+    # Percentile is recomputed after this many new samples
+    RECOMPUTE_EVERY = 16
+
+    def __init__(self, window: int = None):
+        self.window = window or Config.HEDGE_LATENCY_WINDOW
+        self._samples: Dict[str, deque] = {}
+        self._pending: Dict[str, int] = {}
+        self._delays: Dict[str, float] = {}
+
+    def observe(self, route_name: str, latency: float):
+        samples = self._samples.get(route_name)
+        if samples is None:
+            samples = self._samples[route_name] = deque(maxlen=self.window)
+        samples.append(latency)
+        self._pending[route_name] = self._pending.get(route_name, 0) + 1
+
+    def hedge_delay(self, route_name: str) -> float:
+        """p95 (HEDGE_DELAY_PERCENTILE) latency of the route, HEDGE_DEFAULT_DELAY until there are enough samples"""
+        samples = self._samples.get(route_name)
+        if samples is None or len(samples) < Config.HEDGE_MIN_SAMPLES:
+            return Config.HEDGE_DEFAULT_DELAY
+
+        if route_name not in self._delays or self._pending.get(route_name, 0) >= self.RECOMPUTE_EVERY:
+            ordered = sorted(samples)
+            index = min(len(ordered) - 1, int(len(ordered) * Config.HEDGE_DELAY_PERCENTILE))
+            self._delays[route_name] = max(Config.HEDGE_MIN_DELAY, ordered[index])
+            self._pending[route_name] = 0
+        return self._delays[route_name]
+
+    def clear(self):
+        self._samples.clear()
+        self._pending.clear()
+        self._delays.clear()
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)"""
+    ceiling = min(Config.RETRY_BACKOFF_MAX, Config.RETRY_BACKOFF_BASE * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+retry_budget = RetryBudget()
+latency_tracker = LatencyTracker()
@@ -0,0 +1,192 @@
+"""
+Compiled gateway route table
+
+A segment trie built once at startup from Config. Every node carries a
+fully resolved RoutePolicy (public/private/ops, upstream base URL, cache TTL,
+timeout, rate-limit and admission classes, hedging), so one walk over the path segments decides
+everything for a request and matching cost does not grow with the number
+of configured routes.
+
+Routes are "service/path" strings relative to /api/v1/rest/. A "*" segment
+matches any single segment; literal segments are preferred over "*".
+"""
+
+from dataclasses import dataclass, fields
+from typing import Dict, Optional
+
+import httpx
+from fastapi import Request
+from config import Config
+from utility.http_client import upstream_clients
+
+API_PREFIX = "/api/v1/rest/"
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """Resolved per-route policy"""
+    service_name: Optional[str] = None
+    base_url: Optional[str] = None
+    public: bool = False
+    # Gateway operational endpoint: internal networks or an admin role only
+    ops: bool = False
+    cache_ttl: Optional[float] = None
+    stale_while_revalidate: float = 0.0
+    timeout: Optional[httpx.Timeout] = None
+    rate_limit_class: Optional[str] = None
+    admission_class: Optional[str] = None
+    hedge: bool = False
+    # Configured route this policy comes from (bounded label for metrics)
+    name: Optional[str] = None
+
+
+POLICY_FIELDS = {field.name for field in fields(RoutePolicy)} - {"name"}
+
+
+class _Node:
+    __slots__ = ("children", "prefix_fields", "exact_fields", "prefix_policy", "exact_policy")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # Fields applying to this node and everything below it
+        self.prefix_fields: dict = {}
+        # Fields applying only when the path ends exactly here
+        self.exact_fields: dict = {}
+        self.prefix_policy: Optional[RoutePolicy] = None
+        self.exact_policy: Optional[RoutePolicy] = None
+
+
+class RouteTable:
+    """Segment trie of route policies"""
+
+    def __init__(self):
+        self._root = _Node()
+        self._compiled = False
+        # Gateway paths outside /api/v1/rest/ (exact match)
+        self._local: Dict[str, RoutePolicy] = {}
+
+    def add(self, route: str, exact: bool = False, **policy_fields):
+        """Attach policy fields to a route prefix (or exact route)"""
+        unknown = set(policy_fields) - POLICY_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown route policy fields: {unknown}")
+
+        node = self._root
+        for segment in _split(route):
+            node = node.children.setdefault(segment, _Node())
+        (node.exact_fields if exact else node.prefix_fields).update(policy_fields)
+        self._compiled = False
+
+    def compile(self):
+        """Resolve inherited fields into one RoutePolicy per node"""
+        self._compile_node(self._root, {}, ())
+        self._compiled = True
+
+    def match(self, route: str) -> RoutePolicy:
+        """Policy for a "service/path" route (relative to /api/v1/rest/)"""
+        if not self._compiled:
+            self.compile()
+
+        node = self._root
+        for segment in _split(route):
+            child = node.children.get(segment) or node.children.get("*")
+            if child is None:
+                return node.prefix_policy
+            node = child
+        return node.exact_policy
+
+    def match_path(self, path: str) -> RoutePolicy:
+        """Policy for a full request path (/api/v1/rest/...)"""
+        if not path.startswith(API_PREFIX):
+            return self._local.get(path) or RoutePolicy()
+        return self.match(path[len(API_PREFIX):])
+
+    def load(self):
+        """(Re)build the table from Config"""
+        self._root = _Node()
+
+        # Gateway-local endpoints (stats and /metrics are operational, not public)
+        self._local = {Config.METRICS_PATH: RoutePolicy(ops=True, name="metrics")}
+        self.add("health", public=True)
+        self.add("gateway", ops=True)
+        self.add("bff", public=True)
+
+        # Upstream services: base URL and service-level timeouts
+        for service_name, base_url in Config.SERVICE_ENDPOINTS.items():
+            self.add(
+                service_name,
+                service_name=service_name,
+                base_url=base_url,
+                timeout=upstream_clients.timeout_for(service_name),
+            )
+
+        # Public routes (exact paths and prefixes)
+        for path in Config.PUBLIC_ENDPOINTS:
+            self.add(path[len(API_PREFIX):] if path.startswith(API_PREFIX) else path, exact=True, public=True)
+        for prefix in Config.PUBLIC_PREFIXES:
+            self.add(prefix, public=True)
+
+        # Response cache
+        for prefix, policy in Config.RESPONSE_CACHE_ROUTES.items():
+            self.add(
+                prefix,
+                cache_ttl=policy["ttl"],
+                stale_while_revalidate=policy.get("stale_while_revalidate", 0.0),
+            )
+
+        # Per-route read timeouts
+        for prefix, read_timeout in Config.ROUTE_TIMEOUTS.items():
+            self.add(prefix, timeout=_route_timeout(_split(prefix)[0], read_timeout))
+
+        # Hedged routes
+        for prefix in Config.HEDGED_ROUTES:
+            self.add(prefix, hedge=True)
+
+        # Rate-limit classes
+        for prefix, rate_limit_class in Config.RATE_LIMIT_ROUTES.items():
+            self.add(prefix, rate_limit_class=rate_limit_class)
+
+        # Admission (priority) classes
+        for prefix, admission_class in Config.ADMISSION_ROUTES.items():
+            self.add(prefix, admission_class=admission_class)
+
+        self.compile()
+
+    def _compile_node(self, node: _Node, inherited: dict, segments: tuple):
+        merged = {**inherited, **node.prefix_fields}
+        if node.prefix_fields:
+            merged["name"] = "/".join(segments)
+        node.prefix_policy = RoutePolicy(**merged)
+        node.exact_policy = (
+            RoutePolicy(**{**merged, **node.exact_fields, "name": "/".join(segments)})
+            if node.exact_fields else node.prefix_policy
+        )
+        for segment, child in node.children.items():
+            self._compile_node(child, merged, segments + (segment,))
+
+
+def _split(route: str):
+    return [segment for segment in route.strip("/").split("/") if segment]
+
+
+def _route_timeout(service_name: str, read_timeout: float) -> httpx.Timeout:
+    service_timeout = upstream_clients.timeout_for(service_name)
+    return httpx.Timeout(
+        connect=service_timeout.connect,
+        read=read_timeout,
+        write=service_timeout.write,
+        pool=service_timeout.pool,
+    )
+
+
+route_table = RouteTable()
+route_table.load()
+
+
+def get_route(request: Request) -> RoutePolicy:
+    """Route policy for a request, looked up once and kept on request.state"""
+    route = getattr(request.state, "route", None)
+    if route is None:
+        route = route_table.match_path(request.url.path)
+        request.state.route = route
+    return route
@@ -0,0 +1,43 @@
+"""
+Bounded LRU cache whose entries expire at an absolute (epoch) time
+
+Used by the auth middleware to remember verified tokens until their `exp`
+and to negative-cache rejected tokens for a short while.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class ExpiringLRUCache:
+    """LRU cache with per-entry absolute expiry (seconds since epoch)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, expires_at: float):
+        if expires_at <= time.time():
+            return
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
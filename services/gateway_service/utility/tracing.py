@@ -0,0 +1,253 @@
+"""
+Request IDs and W3C trace context for the gateway
+
+Every request gets a `traceparent` (https://www.w3.org/TR/trace-context/)
+and an `x-request-id`, which are forwarded to the backend services so their
+spans and log lines join the gateway's:
+
+- server span: one per client request (trace middleware), continuing a
+  valid incoming traceparent or starting a new trace
+- client span: one per upstream attempt; the backend's server span is its
+  child, so retries and hedges show up as separate calls
+
+Finished spans are put on a bounded queue and a background thread exports
+them as OTLP JSON (Config.TRACE_EXPORTER): appended to a file, one export
+request per line (readable by the collector's otlpjsonfile receiver), or
+POSTed to a collector's /v1/traces. Nothing is exported for unsampled
+traces, and a full queue drops spans instead of blocking.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from config import Config
+
+SERVICE_NAME = "gateway-service"
+
+# OTLP span kinds
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+# Client request IDs are kept if they are short and safe to log
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+# Set by the gateway on the way in; client values are replaced
+TRACE_HEADERS = {b"traceparent", b"x-request-id"}
+
+logger = logging.getLogger("gateway_service")
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent span_id, sampled) from a version 00 traceparent, None if invalid"""
+    if not value:
+        return None
+    match = TRACEPARENT_PATTERN.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 0x01)
+
+
+class Span:
+    """One timed operation; end() hands it to the exporter"""
+
+    __slots__ = (
+        "name", "kind", "trace_id", "span_id", "parent_id", "request_id", "sampled",
+        "attributes", "error", "start_ns", "end_ns",
+    )
+
+    def __init__(self, name: str, kind: int, trace_id: str, parent_id: Optional[str], request_id: str, sampled: bool, attributes: dict = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.request_id = request_id
+        self.sampled = sampled
+        self.attributes = attributes or {}
+        self.error = False
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def child(self, name: str, kind: int, attributes: dict = None) -> "Span":
+        return Span(name, kind, self.trace_id, self.span_id, self.request_id, self.sampled, attributes)
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            span_exporter.export(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes({**self.attributes, "request.id": self.request_id}),
+            "status": {"code": 2 if self.error else 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+# Span of the request being handled (inherited by tasks it starts)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def start_request_span(name: str, traceparent: Optional[str], request_id: Optional[str], attributes: dict = None) -> Span:
+    """Server span continuing the caller's trace, or the root of a new one"""
+    parent = parse_traceparent(traceparent)
+    if parent is None:
+        trace_id, parent_id = secrets.token_hex(16), None
+        sampled = random.random() < Config.TRACE_SAMPLE_RATIO
+    else:
+        trace_id, parent_id, sampled = parent
+    if not request_id or not REQUEST_ID_PATTERN.match(request_id):
+        request_id = trace_id
+    return Span(name, SPAN_KIND_SERVER, trace_id, parent_id, request_id, sampled, attributes)
+
+
+def start_client_span(name: str, attributes: dict = None) -> Optional[Span]:
+    """Child of the current span for an outgoing call (None outside a request)"""
+    parent = current_span.get()
+    if parent is None:
+        return None
+    return parent.child(name, SPAN_KIND_CLIENT, attributes)
+
+
+class TraceLogFilter(logging.Filter):
+    """Adds trace_id / request_id of the current request to log records"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = current_span.get()
+        if span is not None:
+            record.trace_id = span.trace_id
+            record.request_id = span.request_id
+        return True
+
+
+class SpanExporter:
+    """Bounded queue drained by a background thread into the OTLP sink"""
+
+    def __init__(self, kind: str = None, file_path: str = None, endpoint: str = None):
+        self.kind = kind or Config.TRACE_EXPORTER
+        self.file_path = file_path or Config.TRACE_FILE_PATH
+        self.endpoint = endpoint or Config.TRACE_OTLP_ENDPOINT
+        self.dropped = 0
+        self.failed = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=Config.TRACE_QUEUE_SIZE)
+        self._thread = None
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    @property
+    def enabled(self) -> bool:
+        return self.kind in ("file", "otlp")
+
+    def export(self, span: Span):
+        if not (self.enabled and span.sampled):
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Block until every queued span has been written"""
+        if self.enabled:
+            self._queue.join()
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < Config.TRACE_EXPORT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [span for span in batch if span is not None]
+            try:
+                if spans:
+                    self._write(spans)
+            except Exception as e:
+                self.failed += len(spans)
+                logger.warning("Span export to %s failed: %s", self.kind, str(e))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(spans) < len(batch):
+                return
+
+    def _write(self, spans: List[Span]):
+        payload = json.dumps(otlp_request(spans), separators=(",", ":"))
+        if self.kind == "file":
+            os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+            with open(self.file_path, "a", encoding="utf-8") as sink:
+                sink.write(payload + "\n")
+        else:
+            request = urllib.request.Request(
+                self.endpoint, data=payload.encode(), headers={"Content-Type": "application/json"}, method="POST"
+            )
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+
+
+def otlp_request(spans: List[Span]) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of spans"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [span.to_otlp() for span in spans]}],
+        }]
+    }
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    values = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        values.append({"key": key, "value": typed})
+    return values
+
+
+span_exporter = SpanExporter()
+atexit.register(span_exporter.close)
@@ -6,6 +6,7 @@ from fastapi import FastAPI, Request
 from utility.db import Base, engine
 
 from utility.logger import logger
+from utility.tracing import tracing_middleware
 
 # API router import
 from api.v1.rest.menu_router import router as menu_router
@@ -17,6 +18,9 @@ def main():
         description="Delivery App Menu Management Service",
         version="1.0.0"
     )
+
+    # Request tracing (traceparent / x-request-id, handler span)
+    app.middleware("http")(tracing_middleware)
     
     # Register API router
     app.include_router(menu_router, prefix="/api/v1/rest")
@@ -6,6 +6,7 @@ from fastapi import FastAPI, Request
 from utility.db import Base, engine
 
 from utility.logger import logger
+from utility.tracing import tracing_middleware
 
 # API 라우터 import
 from api.v1.rest.review_router import router as review_router
@@ -17,6 +18,9 @@ def main():
         description="배달 앱 리뷰 관리 서비스",
         version="1.0.0"
     )
+
+    # 요청 추적 (traceparent / x-request-id, handler span)
+    app.middleware("http")(tracing_middleware)
     
     # API 라우터 등록
     app.include_router(review_router, prefix="/api/v1/rest")
@@ -4,8 +4,11 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from config import SQLALCHEMY_DATABASE_URL
+from utility.tracing import instrument_engine
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# 쿼리마다 DB span 기록
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
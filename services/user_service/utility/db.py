@@ -3,6 +3,7 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import SQLALCHEMY_DATABASE_URL
+from utility.tracing import instrument_engine
 from utility.logger import logger
 
 # 스키마 생성 함수
@@ -18,6 +19,8 @@ def create_schema_if_not_exists():
         raise
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# 쿼리마다 DB span 기록
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()